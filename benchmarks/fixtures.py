@@ -0,0 +1,106 @@
+"""Fixtures pro benchmarky SK Spot.
+
+Syntetické řady cen (96/192 slotů a dny přechodu času) jsou deterministické,
+XLSX se generují ve stejném tvaru jako report OKTE (sloupec A = den dodávky,
+sloupec K = cena). Nahrané reporty OKTE se berou z benchmarks/samples/*.xlsx.
+"""
+from datetime import date, timedelta
+import importlib
+import io
+import math
+from pathlib import Path
+import random
+import sys
+import types
+
+ROOT = Path(__file__).resolve().parent.parent
+PACKAGE_DIR = ROOT / "custom_components" / "sk_spot"
+SAMPLES_DIR = Path(__file__).resolve().parent / "samples"
+
+# Běžný den, den přechodu na letní čas (92 slotů) a na zimní čas (100 slotů)
+REGULAR_DAY = date(2025, 10, 15)
+DST_SPRING_DAY = date(2025, 3, 30)
+DST_AUTUMN_DAY = date(2025, 10, 26)
+
+
+def load_module(name):
+    """Načti modul integrace bez __init__.py (ten vyžaduje Home Assistant)."""
+    if "sk_spot" not in sys.modules:
+        package = types.ModuleType("sk_spot")
+        package.__path__ = [str(PACKAGE_DIR)]
+        sys.modules["sk_spot"] = package
+    return importlib.import_module(f"sk_spot.{name}")
+
+
+def synthetic_day(day, seed=None):
+    """Deterministická řada cen dne {index: cena} s denním profilem a šumem."""
+    timeline = load_module("timeline")
+    rng = random.Random(seed if seed is not None else day.toordinal())
+    count = timeline.slot_count(day)
+
+    prices = {}
+    for idx in range(count):
+        hour = idx / 4
+        # Ranní a večerní špička, polední propad (solár)
+        profile = (
+            90
+            + 40 * math.exp(-((hour - 8) ** 2) / 4)
+            + 60 * math.exp(-((hour - 19) ** 2) / 5)
+            - 70 * math.exp(-((hour - 13) ** 2) / 6)
+        )
+        prices[idx] = round(profile + rng.gauss(0, 12), 4)
+    return prices
+
+
+def synthetic_analytics(today, tomorrow=None, version=1):
+    """Snapshot analýz pro syntetické ceny dneška (a zítřka)."""
+    from zoneinfo import ZoneInfo
+
+    analytics = load_module("analytics")
+    timeline = load_module("timeline")
+    render_tz = ZoneInfo(timeline.OKTE_TIME_ZONE)
+    tomorrow_day = tomorrow or today + timedelta(days=1)
+
+    return analytics.build_price_analytics(
+        version,
+        synthetic_day(today),
+        synthetic_day(tomorrow) if tomorrow else {},
+        timeline.build_day_timeline(today, render_tz),
+        timeline.build_day_timeline(tomorrow_day, render_tz),
+    )
+
+
+def synthetic_xlsx(days, partial_rows=0):
+    """XLSX ve tvaru reportu OKTE pro dané dny (partial_rows = jen prvních N řádků dne)."""
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Deň dodávky", "Perióda"] + [f"Stĺpec {col}" for col in range(3, 11)] + ["Cena SK"])
+    for day in days:
+        prices = list(synthetic_day(day).items())
+        if partial_rows:
+            prices = prices[:partial_rows]
+        for idx, price in prices:
+            sheet.append([day.strftime("%d.%m.%Y"), idx + 1] + [0] * 8 + [price])
+
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def recorded_samples():
+    """Nahrané reporty OKTE: [(název, obsah, den od, den do)].
+
+    Soubory se jmenují okte_YYYY-MM-DD.xlsx nebo okte_YYYY-MM-DD_YYYY-MM-DD.xlsx.
+    """
+    samples = []
+    for path in sorted(SAMPLES_DIR.glob("okte_*.xlsx")):
+        parts = path.stem.split("_")[1:]
+        try:
+            date_from = date.fromisoformat(parts[0])
+            date_to = date.fromisoformat(parts[-1])
+        except (IndexError, ValueError):
+            continue
+        samples.append((path.name, path.read_bytes(), date_from, date_to))
+    return samples
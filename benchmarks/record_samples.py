@@ -0,0 +1,43 @@
+"""Stáhni reporty OKTE do benchmarks/samples pro reprodukovatelné benchmarky parsování.
+
+Použití:
+    python benchmarks/record_samples.py 2025-10-15 2025-10-26
+    python benchmarks/record_samples.py 2025-10-15 --to 2025-10-16
+"""
+import argparse
+from datetime import date
+import urllib.request
+
+from fixtures import SAMPLES_DIR
+
+URL = (
+    "https://isot.okte.sk/api/v1/dam/report/detailed"
+    "?lang=sk-SK&deliverydayfrom={day_from}&deliverydayto={day_to}&format=xlsx"
+)
+
+
+def main():
+    """Stáhni zadané dny (nebo rozsah) a ulož je jako okte_*.xlsx."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("days", nargs="+", type=date.fromisoformat, help="den dodávky YYYY-MM-DD")
+    parser.add_argument("--to", type=date.fromisoformat, help="konec rozsahu pro jeden request")
+    args = parser.parse_args()
+
+    SAMPLES_DIR.mkdir(exist_ok=True)
+    ranges = [(args.days[0], args.to)] if args.to else [(day, day) for day in args.days]
+
+    for day_from, day_to in ranges:
+        url = URL.format(day_from=day_from.isoformat(), day_to=day_to.isoformat())
+        with urllib.request.urlopen(url, timeout=60) as response:
+            content = response.read()
+
+        name = f"okte_{day_from.isoformat()}"
+        if day_to != day_from:
+            name += f"_{day_to.isoformat()}"
+        path = SAMPLES_DIR / f"{name}.xlsx"
+        path.write_bytes(content)
+        print(f"{path} ({len(content)} bytů)")
+
+
+if __name__ == "__main__":
+    main()
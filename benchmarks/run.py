@@ -0,0 +1,263 @@
+"""Benchmarky horkých cest SK Spot (analýzy cen, časová osa, parsování XLSX).
+
+Použití:
+    python benchmarks/run.py                       # všechny benchmarky
+    python benchmarks/run.py -k block              # jen operace obsahující "block"
+    python benchmarks/run.py --json baseline.json  # ulož výsledky
+    python benchmarks/run.py --compare baseline.json --threshold 1.3
+    python benchmarks/run.py --xlsx report.xlsx --from 2025-10-15 --to 2025-10-16
+
+Pro každou operaci se měří latence jednoho volání (timeit, nejlepší a medián
+z opakování) a alokace jednoho volání (tracemalloc: špička a počet bloků).
+"""
+import argparse
+from array import array
+from datetime import date, timedelta
+import json
+import math
+import statistics
+import sys
+import timeit
+import tracemalloc
+from zoneinfo import ZoneInfo
+
+from fixtures import (
+    DST_AUTUMN_DAY,
+    DST_SPRING_DAY,
+    REGULAR_DAY,
+    load_module,
+    recorded_samples,
+    synthetic_analytics,
+    synthetic_day,
+    synthetic_xlsx,
+)
+
+REPEAT = 5
+
+
+def analytics_benchmarks():
+    """Sestavení snapshotu, hledání bloků, pořadí a atributy."""
+    analytics = load_module("analytics")
+    timeline = load_module("timeline")
+    render_tz = ZoneInfo(timeline.OKTE_TIME_ZONE)
+
+    today = REGULAR_DAY
+    tomorrow = today + timedelta(days=1)
+    today_prices = synthetic_day(today)
+    tomorrow_prices = synthetic_day(tomorrow)
+    today_timeline = timeline.build_day_timeline(today, render_tz)
+    tomorrow_timeline = timeline.build_day_timeline(tomorrow, render_tz)
+
+    snapshot = synthetic_analytics(today, tomorrow)
+    merged = snapshot.timeline
+    slots = list(merged)
+
+    def build(prices_today, prices_tomorrow, timeline_today, timeline_tomorrow):
+        return lambda: analytics.build_price_analytics(
+            1, prices_today, prices_tomorrow, timeline_today, timeline_tomorrow
+        )
+
+    def fresh_block(block_size):
+        # Memoizovaný výsledek by měřil jen lookup v cache
+        return lambda: analytics.cheapest_window(
+            snapshot.timeline_indices, snapshot.prefix_sums, block_size
+        )
+
+    def ranks():
+        for idx in slots:
+            snapshot.rank(idx)
+
+    spring = synthetic_analytics(DST_SPRING_DAY)
+    autumn = synthetic_analytics(DST_AUTUMN_DAY)
+
+    yield "analytics.build 96", build(today_prices, {}, today_timeline, tomorrow_timeline)
+    yield "analytics.build 192", build(today_prices, tomorrow_prices, today_timeline, tomorrow_timeline)
+    yield "analytics.build dst 92", build(
+        spring.today.prices, {}, spring.today_timeline, spring.tomorrow_timeline
+    )
+    yield "analytics.build dst 100", build(
+        autumn.today.prices, {}, autumn.today_timeline, autumn.tomorrow_timeline
+    )
+    for block_size in (4, 8, 16, 96):
+        yield f"cheapest_window k={block_size} n=192", fresh_block(block_size)
+    yield "find_cheapest_block k=8 n=192", lambda: analytics.find_cheapest_block(merged, 8)
+    yield "cheapest_block memoized k=8", lambda: snapshot.cheapest_block(8)
+    yield "window_index build k=8 n=192", lambda: analytics.WindowIndex(
+        snapshot.timeline_indices, snapshot.prefix_sums, 8
+    )
+    snapshot.window_index(8)
+    yield "window query k=8 22:00-06:00", lambda: snapshot.cheapest_window_between(8, 88, 120)
+    yield "cheapest_slots k=16 n=192", lambda: analytics.cheapest_slots(merged, slots, 16)
+    yield "rank lookup x192", ranks
+    battery = load_module("battery")
+    for capacity in (10, 100):
+        params = battery.BatteryParams(capacity, 5, 0.9)
+        yield f"battery plan {capacity} kWh n=192", lambda params=params: battery.optimize_battery(merged, params)
+    yield "aggregate_prices 60 min 96", lambda: analytics.aggregate_prices(snapshot.today.prices, 4)
+    tariff = load_module("tariff")
+    tariff_params = tariff.TariffParams(10, 50, 20, (("22:00", "06:00"),), 30, 23)
+    yield "tariff final_prices 96", lambda: tariff.final_prices(
+        snapshot.today.prices, snapshot.today_timeline, tariff_params
+    )
+
+    def fresh_events():
+        # Memoizovaný výsledek by měřil jen lookup v cache
+        return synthetic_analytics(today, tomorrow).price_events(
+            (4, 8), (("top", 5), ("bottom", 10), ("pct", 0, 25))
+        )
+
+    yield "price_events (incl. snapshot) n=192", fresh_events
+    yield "price_attributes 96", lambda: analytics.price_attributes(snapshot, False)
+    yield "price_attributes 192 kwh", lambda: analytics.price_attributes(snapshot, True, 1000)
+    yield "ranking_attributes 192", lambda: analytics.ranking_attributes(snapshot, True)
+
+
+def timeline_benchmarks():
+    """Stavění časové osy dne a vyhledání slotu."""
+    timeline = load_module("timeline")
+    render_tz = ZoneInfo(timeline.OKTE_TIME_ZONE)
+    day_timeline = timeline.build_day_timeline(REGULAR_DAY, render_tz)
+    moment = day_timeline.starts[57]
+
+    yield "timeline.build 96", lambda: timeline.build_day_timeline(REGULAR_DAY, render_tz)
+    yield "timeline.build dst 100", lambda: timeline.build_day_timeline(DST_AUTUMN_DAY, render_tz)
+    yield "timeline.index_at", lambda: day_timeline.index_at(moment)
+
+
+def forecast_benchmarks():
+    """Odhad dvou dnů z 28 dnů historie."""
+    forecast = load_module("forecast")
+    timeline = load_module("timeline")
+    render_tz = ZoneInfo(timeline.OKTE_TIME_ZONE)
+
+    first, last = forecast.history_range(REGULAR_DAY)
+    history = {}
+    day = first
+    while day <= last:
+        values = array("d", [math.nan]) * 100
+        for idx, price in synthetic_day(day).items():
+            values[idx] = price
+        history[day] = values
+        day += timedelta(days=1)
+    targets = (REGULAR_DAY + timedelta(days=2), DST_AUTUMN_DAY)
+    timelines = {target: timeline.build_day_timeline(target, render_tz) for target in targets}
+
+    yield "forecast 2 days history 29", lambda: forecast.forecast_days(history, targets, timelines)
+
+
+def parser_benchmarks(extra_xlsx=()):
+    """Parsování syntetických a nahraných XLSX reportů."""
+    parser = load_module("parser")
+
+    def parse(content, date_from, date_to):
+        return lambda: parser.parse_range_prices(content, date_from, date_to)
+
+    one_day = synthetic_xlsx([REGULAR_DAY])
+    two_days = synthetic_xlsx([REGULAR_DAY, REGULAR_DAY + timedelta(days=1)])
+    dst_day = synthetic_xlsx([DST_AUTUMN_DAY])
+
+    yield "parse synthetic 1 day", parse(one_day, REGULAR_DAY, REGULAR_DAY)
+    yield "parse synthetic 2 days", parse(two_days, REGULAR_DAY, REGULAR_DAY + timedelta(days=1))
+    yield "parse synthetic dst 100", parse(dst_day, DST_AUTUMN_DAY, DST_AUTUMN_DAY)
+
+    for name, content, date_from, date_to in [*recorded_samples(), *extra_xlsx]:
+        yield f"parse {name}", parse(content, date_from, date_to)
+
+
+def measure(func):
+    """Latence (s/volání) a alokace jednoho volání."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    runs = [total / number for total in timer.repeat(repeat=REPEAT, number=number)]
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    del result
+
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+    return {
+        "best": min(runs),
+        "median": statistics.median(runs),
+        "peak_bytes": peak,
+        "blocks": blocks,
+    }
+
+
+def format_time(seconds):
+    """Čitelná latence."""
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:9.1f} µs"
+    return f"{seconds * 1e3:9.2f} ms"
+
+
+def main():
+    """Spusť benchmarky a vypiš (případně ulož a porovnej) výsledky."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", dest="keyword", help="spusť jen operace obsahující text")
+    parser.add_argument("--json", dest="json_path", help="ulož výsledky do JSON")
+    parser.add_argument("--compare", help="porovnej s dříve uloženým JSON")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="poměr mediánů, nad kterým se operace hlásí jako regrese")
+    parser.add_argument("--xlsx", action="append", default=[], help="další XLSX report k parsování")
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat, default=REGULAR_DAY,
+                        help="první den dodávky v --xlsx")
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat,
+                        help="poslední den dodávky v --xlsx")
+    args = parser.parse_args()
+
+    extra = []
+    for path in args.xlsx:
+        with open(path, "rb") as file:
+            extra.append((path, file.read(), args.date_from, args.date_to or args.date_from))
+
+    benchmarks = [
+        *analytics_benchmarks(),
+        *timeline_benchmarks(),
+        *forecast_benchmarks(),
+        *parser_benchmarks(extra),
+    ]
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+
+    results = {}
+    regressions = []
+    print(f"{'operace':36} {'nejlepší':>12} {'medián':>12} {'špička':>10} {'bloky':>7}")
+    for name, func in benchmarks:
+        if args.keyword and args.keyword not in name:
+            continue
+        stats = measure(func)
+        results[name] = stats
+
+        line = (
+            f"{name:36} {format_time(stats['best'])} {format_time(stats['median'])} "
+            f"{stats['peak_bytes'] / 1024:8.1f} KiB {stats['blocks']:7d}"
+        )
+        if name in baseline:
+            ratio = stats["median"] / baseline[name]["median"]
+            line += f"  x{ratio:.2f}"
+            if ratio > args.threshold:
+                regressions.append(name)
+                line += " REGRESE"
+        print(line)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as file:
+            json.dump({"python": sys.version.split()[0], "results": results}, file, indent=2)
+
+    if regressions:
+        print(f"\nRegrese nad x{args.threshold}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
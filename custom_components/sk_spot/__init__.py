@@ -1,34 +1,104 @@
 """SK Spot integrace."""
+import asyncio
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.const import Platform
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import config_validation as cv
 
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    DATA_COORDINATOR,
+    DATA_ENTRIES,
+    DATA_LOCK,
+    CONF_RANGE_FETCH,
+    DEFAULT_RANGE_FETCH,
+    CONF_BASE_URL,
+    DEFAULT_BASE_URL,
+)
 from .coordinator import SKSpotCoordinator
+from .services import async_setup_services
+
+PLATFORMS = [Platform.SENSOR, Platform.BINARY_SENSOR, Platform.CALENDAR]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: dict) -> bool:
+    """Setup integrace (služby nezávislé na config entries)."""
+    async_setup_services(hass)
+    return True
 
-PLATFORMS = [Platform.SENSOR, Platform.BINARY_SENSOR]
+
+async def _async_create_coordinator(hass: HomeAssistant, entry: ConfigEntry) -> SKSpotCoordinator:
+    """Vytvoř sdílený coordinator (jedno stahování a jedna kopie dat pro všechny entries)."""
+    coordinator = SKSpotCoordinator(
+        hass,
+        range_fetch=entry.options.get(CONF_RANGE_FETCH, DEFAULT_RANGE_FETCH),
+        base_url=entry.options.get(CONF_BASE_URL, DEFAULT_BASE_URL),
+    )
+    if await coordinator.async_load_cache():
+        # Entity naběhnou hned z cache, chybějící data se dotáhnou na pozadí
+        coordinator.async_set_updated_data(coordinator.build_data())
+        hass.async_create_background_task(coordinator.async_refresh(), f"{DOMAIN}_refresh")
+    else:
+        await coordinator.async_refresh()
+        if not coordinator.last_update_success:
+            raise ConfigEntryNotReady(str(coordinator.last_exception))
+
+    # Naplánuj automatické aktualizace a čtvrthodinový tick
+    coordinator.schedule_next_update()
+    coordinator.start_quarter_hour_tick()
+    return coordinator
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Setup z config entry."""
-    hass.data.setdefault(DOMAIN, {})
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    lock = domain_data.setdefault(DATA_LOCK, asyncio.Lock())
 
-    # Vytvoř sdílený coordinator
-    coordinator = SKSpotCoordinator(hass)
-    await coordinator.async_config_entry_first_refresh()
+    # Entries (např. EUR/MWh a EUR/kWh) sdílí jeden coordinator, jednotka je věc entit
+    async with lock:
+        coordinator = domain_data.get(DATA_COORDINATOR)
+        if coordinator is None:
+            coordinator = await _async_create_coordinator(hass, entry)
+            domain_data[DATA_COORDINATOR] = coordinator
+            domain_data[DATA_ENTRIES] = set()
+        else:
+            coordinator.configure(
+                entry.options.get(CONF_RANGE_FETCH, DEFAULT_RANGE_FETCH),
+                entry.options.get(CONF_BASE_URL, DEFAULT_BASE_URL),
+            )
+        domain_data[DATA_ENTRIES].add(entry.entry_id)
 
     # Ulož coordinator do hass.data
-    hass.data[DOMAIN][entry.entry_id] = coordinator
+    domain_data[entry.entry_id] = coordinator
 
     # Nastav platformy
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
-    # Naplánuj automatické aktualizace
-    coordinator.schedule_next_update()
+    # Při změně options znovu načti entry (nové bloky = nové entity)
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     return True
 
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload config entry po změně options."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload config entry."""
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        domain_data = hass.data[DOMAIN]
+        coordinator = domain_data.pop(entry.entry_id)
+        domain_data[DATA_ENTRIES].discard(entry.entry_id)
+        # Poslední entry zastaví sdílený coordinator
+        if not domain_data[DATA_ENTRIES]:
+            domain_data.pop(DATA_COORDINATOR)
+            domain_data.pop(DATA_ENTRIES)
+            await coordinator.async_shutdown()
+    return unload_ok
@@ -0,0 +1,572 @@
+"""Předpočítané analýzy cen pro SK Spot.
+
+Snapshot se staví jednou za verzi dat v coordinatoru a všechny entity
+z něj pouze čtou, takže zápis stavu nestojí žádné přepočítávání.
+"""
+from dataclasses import dataclass, field
+from bisect import bisect_left
+from datetime import timedelta
+import heapq
+from itertools import accumulate
+
+from .battery import optimize_battery
+from .tariff import final_prices
+from .timeline import SLOT_DURATION, aggregate_timeline
+
+# Výchozí offset indexů zítřejších cen ve sloučené časové ose dnes+zítra
+# (skutečný offset je počet slotů dneška, 92/96/100)
+TOMORROW_OFFSET = 96
+
+# Druhy pásem ranku
+RANK_BAND_TOP = "top"
+RANK_BAND_BOTTOM = "bottom"
+RANK_BAND_PERCENTILE = "pct"
+
+# Druhy událostí kalendáře
+EVENT_CHEAPEST_BLOCK = "cheapest_block"
+EVENT_RANK_BAND = "rank_band"
+EVENT_NEGATIVE_PRICE = "negative_price"
+
+
+def cheapest_window(indices, prefix_sums, block_size):
+    """
+    Najdi nejlevnější souvislé okno jedním průchodem přes prefixové součty.
+
+    Args:
+        indices: Vzestupně seřazené indexy bloků
+        prefix_sums: prefix_sums[i] = součet cen prvních i bloků
+        block_size: Velikost okna (počet 15min intervalů)
+
+    Returns:
+        tuple: (start_index, end_index, avg_price) nebo None
+    """
+    if block_size < 1 or len(indices) < block_size:
+        return None
+
+    best_block = None
+    best_sum = float('inf')
+    span = block_size - 1
+
+    for i in range(len(indices) - span):
+        # Indexy rostou po jedné, takže okno je souvislé právě když
+        # rozdíl krajních indexů odpovídá délce okna
+        if indices[i + span] - indices[i] != span:
+            continue
+
+        # Zaokrouhlení odstraní šum prefixových součtů při shodě cen
+        block_sum = round(prefix_sums[i + block_size] - prefix_sums[i], 6)
+
+        if block_sum < best_sum:
+            best_sum = block_sum
+            best_block = (indices[i], indices[i + span], best_sum / block_size)
+
+    return best_block
+
+
+def rank_band_limits(band, count):
+    """
+    Rozsah ranků (od, do) pásma pro den s `count` bloky.
+
+    Args:
+        band: ["top", N] (N nejdražších), ["bottom", N] (N nejlevnějších)
+            nebo ["pct", od, do] (percentil ceny v %, 0 = nejlevnější)
+    """
+    kind = band[0]
+    if kind == RANK_BAND_TOP:
+        return count - band[1] + 1, count
+    if kind == RANK_BAND_BOTTOM:
+        return 1, band[1]
+    # Hranice percentilu se zaokrouhlují ven, takže pásmo pokryje aspoň jeden rank
+    return band[1] * count // 100 + 1, -(-band[2] * count // 100)
+
+
+def aggregate_prices(prices, group):
+    """Průměr cen po `group` po sobě jdoucích slotech dne {index agregovaného slotu: cena}."""
+    sums = {}
+    counts = {}
+    for idx, price in prices.items():
+        slot = idx // group
+        sums[slot] = sums.get(slot, 0) + price
+        counts[slot] = counts.get(slot, 0) + 1
+    return {slot: round(total / counts[slot], 4) for slot, total in sums.items()}
+
+
+def _runs(indices):
+    """Souvislé úseky seřazených indexů [(první, poslední), ...]."""
+    runs = []
+    for idx in indices:
+        if runs and runs[-1][1] == idx - 1:
+            runs[-1][1] = idx
+        else:
+            runs.append([idx, idx])
+    return runs
+
+
+@dataclass(frozen=True)
+class PriceEvent:
+    """Cenová událost (nejlevnější blok, úsek pásma ranku, záporné ceny) v UTC."""
+
+    start: object
+    end: object
+    kind: str
+    # Velikost bloku nebo pásmo ranku (u záporných cen None)
+    key: object
+    average: float
+
+
+def find_cheapest_block(prices_dict, block_size):
+    """
+    Najdi nejlevnější souvislý blok dané velikosti.
+
+    Args:
+        prices_dict: Slovník {index: cena}
+        block_size: Velikost bloku (počet 15min intervalů)
+
+    Returns:
+        tuple: (start_index, end_index, avg_price) nebo None
+    """
+    if not prices_dict or len(prices_dict) < block_size:
+        return None
+
+    indices = sorted(prices_dict)
+    prefix_sums = list(accumulate((prices_dict[idx] for idx in indices), initial=0.0))
+    return cheapest_window(indices, prefix_sums, block_size)
+
+
+class WindowIndex:
+    """
+    Sparse table nad součty souvislých oken jedné délky.
+
+    Postaví se jednou za verzi dat v O(n log n), nejlevnější okno se začátkem
+    v libovolném rozsahu pozic pak najde v O(1). Při shodě vyhrává dřívější okno.
+    """
+
+    def __init__(self, indices, prefix_sums, block_size) -> None:
+        """Init."""
+        self.block_size = block_size
+        self._indices = indices
+        self._span = block_size - 1
+        count = max(len(indices) - self._span, 0) if block_size >= 1 else 0
+
+        # Součet okna od pozice i, nesouvislá okna (mezery v datech) jsou nekonečně drahá
+        sums = []
+        for i in range(count):
+            if indices[i + self._span] - indices[i] == self._span:
+                sums.append(round(prefix_sums[i + block_size] - prefix_sums[i], 6))
+            else:
+                sums.append(float('inf'))
+        self._sums = sums
+
+        # table[k][i] = pozice nejlevnějšího okna mezi pozicemi i .. i + 2^k - 1
+        table = [list(range(count))]
+        width = 1
+        while width * 2 <= count:
+            previous = table[-1]
+            table.append([
+                left if sums[left] <= sums[right] else right
+                for left, right in zip(previous, previous[width:])
+            ])
+            width *= 2
+        self._table = table
+
+    def query(self, lo, hi):
+        """
+        Nejlevnější okno se začátkem na pozici v [lo, hi).
+
+        Returns:
+            tuple: (start_index, end_index, avg_price) nebo None
+        """
+        lo = max(lo, 0)
+        hi = min(hi, len(self._sums))
+        if lo >= hi:
+            return None
+
+        level = (hi - lo).bit_length() - 1
+        left = self._table[level][lo]
+        right = self._table[level][hi - (1 << level)]
+        best = left if self._sums[left] <= self._sums[right] else right
+        if self._sums[best] == float('inf'):
+            return None
+        return (
+            self._indices[best],
+            self._indices[best + self._span],
+            self._sums[best] / self.block_size,
+        )
+
+
+def cheapest_slots(prices, indices, count):
+    """
+    Vyber count nejlevnějších (ne nutně sousedních) bloků haldou v O(n log k).
+
+    Args:
+        prices: {index: cena}
+        indices: Indexy bloků, ze kterých se vybírá
+        count: Počet bloků (pokud je k dispozici méně bloků, vyberou se všechny)
+
+    Returns:
+        tuple: (vzestupně seřazené indexy, avg_price) nebo None
+    """
+    if count < 1:
+        return None
+    chosen = heapq.nsmallest(count, indices, key=prices.__getitem__)
+    if not chosen:
+        return None
+    chosen.sort()
+    return tuple(chosen), sum(prices[idx] for idx in chosen) / len(chosen)
+
+
+@dataclass(frozen=True)
+class DayAnalytics:
+    """Statistiky cen jednoho dne."""
+
+    prices: dict
+    # Indexy seřazené podle ceny (vzestupně, při shodě podle indexu)
+    order: tuple
+    # Standard ranking: {index: počet levnějších bloků + 1}
+    ranks: dict
+    min_price: float
+    min_index: int
+    max_price: float
+    max_index: int
+    avg_price: float
+
+    @property
+    def count(self) -> int:
+        """Počet bloků s cenou."""
+        return len(self.prices)
+
+
+def build_day_analytics(prices) -> DayAnalytics | None:
+    """Spočítej statistiky dne jedním seřazením (O(n log n))."""
+    if not prices:
+        return None
+
+    order = tuple(sorted(prices, key=lambda idx: (prices[idx], idx)))
+
+    # Standard ranking: bloky se stejnou cenou sdílí rank první z nich
+    rank_by_idx = {}
+    previous_price = None
+    rank = 0
+    for position, idx in enumerate(order, start=1):
+        price = prices[idx]
+        if price != previous_price:
+            rank = position
+            previous_price = price
+        rank_by_idx[idx] = rank
+    # Zachovej pořadí podle indexu (pořadí atributů)
+    ranks = {idx: rank_by_idx[idx] for idx in prices}
+
+    # Maximum - první (nejnižší) index s maximální cenou
+    max_index = order[rank_by_idx[order[-1]] - 1]
+
+    return DayAnalytics(
+        prices=prices,
+        order=order,
+        ranks=ranks,
+        min_price=prices[order[0]],
+        min_index=order[0],
+        max_price=prices[max_index],
+        max_index=max_index,
+        avg_price=sum(prices.values()) / len(prices),
+    )
+
+
+@dataclass(frozen=True)
+class PriceAnalytics:
+    """Neměnný snapshot analýz pro jednu verzi dat coordinatoru."""
+
+    version: int
+    today: DayAnalytics | None
+    tomorrow: DayAnalytics | None
+    # Časové osy slotů (DayTimeline) dneška a zítřka
+    today_timeline: object
+    tomorrow_timeline: object
+    # Zítřejší index ve sloučené ose = index + tomorrow_offset (počet slotů dneška)
+    tomorrow_offset: int
+    # Sloučená časová osa dnes+zítra {index: cena}
+    timeline: dict
+    timeline_indices: tuple
+    # prefix_sums[i] = součet cen prvních i bloků časové osy
+    prefix_sums: tuple
+    _cache: dict = field(default_factory=dict, repr=False, compare=False)
+
+    @property
+    def slot_duration(self):
+        """Délka slotu osy (15 min, u agregovaného snapshotu víc)."""
+        if self.today_timeline is None:
+            return SLOT_DURATION
+        return self.today_timeline.slot_duration
+
+    def index_at(self, moment):
+        """Index slotu ve sloučené ose dnes+zítra pro daný okamžik nebo None."""
+        if self.today_timeline is not None:
+            idx = self.today_timeline.index_at(moment)
+            if idx is not None:
+                return idx
+        if self.tomorrow_timeline is not None:
+            idx = self.tomorrow_timeline.index_at(moment)
+            if idx is not None:
+                return idx + self.tomorrow_offset
+        return None
+
+    def window_bounds(self, start, end):
+        """Rozsah indexů sloučené osy [first, last) slotů začínajících v intervalu [start, end)."""
+        if self.today_timeline is None or not self.today_timeline.starts:
+            return 0, 0
+        origin = self.today_timeline.starts[0]
+        total = self.tomorrow_offset + (
+            self.tomorrow_timeline.slot_count if self.tomorrow_timeline is not None else 0
+        )
+        # Sloučená osa je souvislá, index = počet slotů od začátku dneška (zaokrouhleno nahoru)
+        duration = self.slot_duration
+        first = -((origin - start) // duration)
+        last = -((origin - end) // duration)
+        return min(max(first, 0), total), min(max(last, 0), total)
+
+    def slot_timeline(self, idx):
+        """Časová osa a index v rámci dne pro index sloučené osy."""
+        if idx < self.tomorrow_offset:
+            return self.today_timeline, idx
+        return self.tomorrow_timeline, idx - self.tomorrow_offset
+
+    def slot_start(self, idx):
+        """UTC začátek slotu sloučené osy."""
+        timeline, day_idx = self.slot_timeline(idx)
+        return timeline.starts[day_idx]
+
+    def slot_end(self, idx):
+        """UTC konec slotu sloučené osy."""
+        timeline, day_idx = self.slot_timeline(idx)
+        return timeline.ends[day_idx]
+
+    def iso_start(self, idx):
+        """ISO začátek slotu sloučené osy."""
+        timeline, day_idx = self.slot_timeline(idx)
+        return timeline.iso_starts[day_idx]
+
+    def iso_end(self, idx):
+        """ISO konec slotu sloučené osy."""
+        timeline, day_idx = self.slot_timeline(idx)
+        return timeline.iso_ends[day_idx]
+
+    def rank(self, idx):
+        """Rank dnešního bloku nebo None."""
+        if self.today is None:
+            return None
+        return self.today.ranks.get(idx)
+
+    def rank_band(self, low, high):
+        """Dnešní indexy s rankem v [low, high], jednou za verzi dat (sdílí všechny sensory pásma)."""
+        key = ("rank_band", low, high)
+        if key not in self._cache:
+            ranks = self.today.ranks if self.today is not None else {}
+            self._cache[key] = frozenset(idx for idx, rank in ranks.items() if low <= rank <= high)
+        return self._cache[key]
+
+    def rank_changes(self):
+        """UTC začátky dnešních slotů, ve kterých se mění rank, a konec dneška."""
+        key = ("rank_changes",)
+        if key not in self._cache:
+            times = []
+            if self.today is not None and self.today.ranks:
+                ranks = self.today.ranks
+                previous = None
+                for idx in sorted(ranks):
+                    if ranks[idx] != previous:
+                        times.append(self.slot_start(idx))
+                        previous = ranks[idx]
+                times.append(self.slot_end(max(ranks)))
+            self._cache[key] = tuple(times)
+        return self._cache[key]
+
+    def price_events(self, block_sizes, bands):
+        """
+        Seřazené cenové události dnes+zítra, jednou za verzi dat a nastavení.
+
+        Nejlevnější blok každé velikosti pro každý den, souvislé úseky každého
+        pásma ranku (rank se počítá zvlášť pro každý den) a úseky záporných cen.
+        """
+        key = ("price_events", tuple(block_sizes), tuple(tuple(band) for band in bands))
+        if key in self._cache:
+            return self._cache[key]
+
+        days = [(0, self.today)]
+        if self.tomorrow is not None:
+            days.append((self.tomorrow_offset, self.tomorrow))
+
+        def event(first, last, kind, event_key):
+            average = sum(self.timeline[idx] for idx in range(first, last + 1)) / (last - first + 1)
+            return PriceEvent(self.slot_start(first), self.slot_end(last), kind, event_key, average)
+
+        events = []
+        for offset, day in days:
+            if day is None:
+                continue
+            for size in block_sizes:
+                block = self.cheapest_window_between(size, offset, offset + day.count)
+                if block:
+                    events.append(event(block[0], block[1], EVENT_CHEAPEST_BLOCK, size))
+            for band in bands:
+                low, high = rank_band_limits(band, day.count)
+                members = sorted(idx + offset for idx, rank in day.ranks.items() if low <= rank <= high)
+                events.extend(
+                    event(first, last, EVENT_RANK_BAND, tuple(band)) for first, last in _runs(members)
+                )
+        negative = [idx for idx in self.timeline_indices if self.timeline[idx] < 0]
+        events.extend(event(first, last, EVENT_NEGATIVE_PRICE, None) for first, last in _runs(negative))
+
+        events.sort(key=lambda item: (item.start, item.end))
+        self._cache[key] = tuple(events)
+        return self._cache[key]
+
+    def cheapest_block(self, block_size, tomorrow_only=False):
+        """Nejlevnější souvislý blok, spočítaný jednou za verzi dat."""
+        key = ("cheapest_block", block_size, tomorrow_only)
+        if key not in self._cache:
+            if tomorrow_only:
+                prices = self.tomorrow.prices if self.tomorrow else {}
+                self._cache[key] = find_cheapest_block(prices, block_size)
+            else:
+                self._cache[key] = cheapest_window(
+                    self.timeline_indices, self.prefix_sums, block_size
+                )
+        return self._cache[key]
+
+    def cheapest_slots(self, count, first, last):
+        """
+        Nejlevnější sloty v rozsahu [first, last) sloučené osy, jednou za verzi dat.
+
+        Returns:
+            tuple: (indexy, avg_price, complete) nebo None; complete = všechny sloty rozsahu mají cenu
+        """
+        key = ("cheapest_slots", count, first, last)
+        if key not in self._cache:
+            available = [idx for idx in range(first, last) if idx in self.timeline]
+            result = cheapest_slots(self.timeline, available, count)
+            self._cache[key] = (
+                None if result is None else (*result, len(available) == last - first)
+            )
+        return self._cache[key]
+
+    def cheapest_window_between(self, block_size, first, last):
+        """Nejlevnější souvislé okno ležící celé v rozsahu [first, last) sloučené osy v O(1)."""
+        if block_size < 1:
+            return None
+        lo = bisect_left(self.timeline_indices, first)
+        hi = bisect_left(self.timeline_indices, last)
+        # Okno začínající na pozici i končí na pozici i + block_size - 1 < hi
+        return self.window_index(block_size).query(lo, hi - block_size + 1)
+
+    def window_index(self, block_size):
+        """Index oken dané délky, postavený jednou za verzi dat."""
+        key = ("window_index", block_size)
+        if key not in self._cache:
+            self._cache[key] = WindowIndex(self.timeline_indices, self.prefix_sums, block_size)
+        return self._cache[key]
+
+    def with_tariff(self, params):
+        """Snapshot nad koncovými cenami (TariffParams), jednou za verzi dat a tarif."""
+        key = ("tariff", params)
+        if key not in self._cache:
+            self._cache[key] = build_price_analytics(
+                self.version,
+                final_prices(self.today.prices, self.today_timeline, params) if self.today else {},
+                final_prices(self.tomorrow.prices, self.tomorrow_timeline, params) if self.tomorrow else {},
+                self.today_timeline,
+                self.tomorrow_timeline,
+            )
+        return self._cache[key]
+
+    def with_resolution(self, minutes):
+        """Snapshot nad průměry cen po `minutes` minutách, jednou za verzi dat (15 = tento)."""
+        group = timedelta(minutes=minutes) // self.slot_duration
+        if group <= 1 or self.today_timeline is None:
+            return self
+        key = ("resolution", group)
+        if key not in self._cache:
+            self._cache[key] = build_price_analytics(
+                self.version,
+                aggregate_prices(self.today.prices, group) if self.today else {},
+                aggregate_prices(self.tomorrow.prices, group) if self.tomorrow else {},
+                aggregate_timeline(self.today_timeline, group),
+                aggregate_timeline(self.tomorrow_timeline, group) if self.tomorrow_timeline else None,
+            )
+        return self._cache[key]
+
+    def battery_plan(self, params):
+        """Plán baterie (BatteryPlan) pro parametry, jednou za verzi dat."""
+        key = ("battery_plan", params)
+        if key not in self._cache:
+            self._cache[key] = optimize_battery(
+                self.timeline, params, self.slot_duration / timedelta(hours=1)
+            )
+        return self._cache[key]
+
+
+def build_price_analytics(
+    version, today_prices, tomorrow_prices, today_timeline=None, tomorrow_timeline=None
+) -> PriceAnalytics:
+    """Postav snapshot z dnešních a (dostupných) zítřejších cen."""
+    tomorrow_offset = today_timeline.slot_count if today_timeline is not None else TOMORROW_OFFSET
+
+    timeline = dict(today_prices)
+    for idx, price in tomorrow_prices.items():
+        timeline[idx + tomorrow_offset] = price
+
+    timeline_indices = tuple(sorted(timeline))
+    prefix_sums = tuple(
+        accumulate((timeline[idx] for idx in timeline_indices), initial=0.0)
+    )
+
+    return PriceAnalytics(
+        version=version,
+        today=build_day_analytics(today_prices),
+        tomorrow=build_day_analytics(tomorrow_prices),
+        today_timeline=today_timeline,
+        tomorrow_timeline=tomorrow_timeline,
+        tomorrow_offset=tomorrow_offset,
+        timeline=timeline,
+        timeline_indices=timeline_indices,
+        prefix_sums=prefix_sums,
+    )
+
+
+def price_attributes(analytics, include_tomorrow, divisor=1):
+    """Slovník ISO čas -> cena (zaokrouhlená na 2 místa) pro dnes a zítřek."""
+    all_prices = {}
+
+    days = [(analytics.today, analytics.today_timeline)]
+    if include_tomorrow:
+        days.append((analytics.tomorrow, analytics.tomorrow_timeline))
+
+    for day, timeline in days:
+        if day is None:
+            continue
+        iso_starts = timeline.iso_starts
+        prices = day.prices
+        for idx in range(len(iso_starts)):
+            if idx in prices:
+                all_prices[iso_starts[idx]] = round(prices[idx] / divisor, 2)
+
+    return all_prices
+
+
+def ranking_attributes(analytics, include_tomorrow):
+    """Rankingy všech bloků jako {"today_rankings": {ISO čas: rank}, ...}."""
+    attrs = {}
+
+    # Rankingy pro dnes
+    if analytics.today is not None:
+        iso_starts = analytics.today_timeline.iso_starts
+        attrs["today_rankings"] = {
+            iso_starts[idx]: rank for idx, rank in analytics.today.ranks.items()
+        }
+
+    # Rankingy pro zítra (pokud jsou dostupné)
+    if include_tomorrow and analytics.tomorrow is not None:
+        iso_starts = analytics.tomorrow_timeline.iso_starts
+        attrs["tomorrow_rankings"] = {
+            iso_starts[idx]: rank for idx, rank in analytics.tomorrow.ranks.items()
+        }
+
+    return attrs
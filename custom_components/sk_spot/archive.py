@@ -0,0 +1,170 @@
+"""Kompaktní archiv historických cen SK Spot.
+
+Archiv je jeden append-only soubor záznamů pevné délky:
+
+    int32 ordinal dne | uint32 počet slotů | SLOTS_PER_RECORD * float64
+
+Chybějící sloty jsou NaN. Pevná délka záznamu umožňuje číst dny přímo
+z memory-mapped souboru bez parsování. Opravený den se zapíše jako nový
+záznam a index ukazuje na ten poslední.
+
+Metody jsou synchronní (souborové I/O), coordinator je volá v executoru.
+"""
+from array import array
+from datetime import date, timedelta
+import logging
+import math
+import mmap
+import os
+import struct
+
+_LOGGER = logging.getLogger(__name__)
+
+# 100 slotů pokryje i den přechodu na zimní čas
+SLOTS_PER_RECORD = 100
+_HEADER = struct.Struct("<iI")
+RECORD_SIZE = _HEADER.size + SLOTS_PER_RECORD * 8
+
+
+class PriceArchive:
+    """Append-only archiv čtvrthodinových cen."""
+
+    def __init__(self, path) -> None:
+        """Init."""
+        self._path = path
+        # {ordinal dne: offset záznamu v souboru}
+        self._index = {}
+        # Zvyšuje se s každým zápisem (pro invalidaci odvozených statistik)
+        self.generation = 0
+
+    def load(self):
+        """Načti index záznamů ze souboru."""
+        self._index = {}
+        if not os.path.exists(self._path):
+            return
+
+        size = os.path.getsize(self._path)
+        if size % RECORD_SIZE:
+            # Neúplný poslední záznam (přerušený zápis) ignoruj
+            _LOGGER.warning("Archiv %s končí neúplným záznamem", self._path)
+
+        with open(self._path, "rb") as archive_file:
+            for offset in range(0, size - size % RECORD_SIZE, RECORD_SIZE):
+                archive_file.seek(offset)
+                ordinal, _ = _HEADER.unpack(archive_file.read(_HEADER.size))
+                self._index[ordinal] = offset
+
+        _LOGGER.debug("Archiv cen obsahuje %d dnů", len(self._index))
+
+    def __contains__(self, day) -> bool:
+        """Je den v archivu."""
+        return day.toordinal() in self._index
+
+    def __len__(self) -> int:
+        """Počet archivovaných dnů."""
+        return len(self._index)
+
+    def days(self):
+        """Seřazené archivované dny."""
+        return [date.fromordinal(ordinal) for ordinal in sorted(self._index)]
+
+    def append_day(self, day, prices) -> bool:
+        """Připiš den do archivu. Vrátí False pokud je uložen beze změny."""
+        values = array("d", [math.nan]) * SLOTS_PER_RECORD
+        for idx, price in prices.items():
+            if 0 <= idx < SLOTS_PER_RECORD:
+                values[idx] = price
+
+        if day in self and self._read_values(day) == _comparable(values):
+            return False
+
+        os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+        with open(self._path, "ab") as archive_file:
+            offset = archive_file.tell()
+            # Zarovnej případný neúplný záznam z přerušeného zápisu
+            if offset % RECORD_SIZE:
+                archive_file.truncate(offset - offset % RECORD_SIZE)
+                offset -= offset % RECORD_SIZE
+                archive_file.seek(offset)
+            archive_file.write(_HEADER.pack(day.toordinal(), len(prices)))
+            archive_file.write(values.tobytes())
+
+        self._index[day.toordinal()] = offset
+        self.generation += 1
+        return True
+
+    def get_day(self, day):
+        """Vrať ceny dne jako array('d') (chybějící sloty = NaN) nebo None."""
+        offset = self._index.get(day.toordinal())
+        if offset is None:
+            return None
+        with open(self._path, "rb") as archive_file, mmap.mmap(
+            archive_file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mapped:
+            start = offset + _HEADER.size
+            values = array("d")
+            values.frombytes(mapped[start:start + SLOTS_PER_RECORD * 8])
+        return values
+
+    def get_range(self, first_day, last_day):
+        """Vrať {date: array('d')} pro archivované dny v rozsahu (včetně)."""
+        wanted = [
+            (ordinal, offset)
+            for ordinal, offset in sorted(self._index.items())
+            if first_day.toordinal() <= ordinal <= last_day.toordinal()
+        ]
+        if not wanted:
+            return {}
+
+        result = {}
+        with open(self._path, "rb") as archive_file, mmap.mmap(
+            archive_file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mapped:
+            for ordinal, offset in wanted:
+                start = offset + _HEADER.size
+                values = array("d")
+                values.frombytes(mapped[start:start + SLOTS_PER_RECORD * 8])
+                result[date.fromordinal(ordinal)] = values
+        return result
+
+    def rolling_stats(self, last_day, days):
+        """Statistiky cen za posledních `days` dnů končících dnem last_day."""
+        first_day = last_day - timedelta(days=days - 1)
+        total = 0.0
+        count = 0
+        minimum = math.inf
+        maximum = -math.inf
+        day_count = 0
+
+        for values in self.get_range(first_day, last_day).values():
+            day_count += 1
+            for price in values:
+                if price != price:  # NaN = chybějící slot
+                    continue
+                total += price
+                count += 1
+                if price < minimum:
+                    minimum = price
+                if price > maximum:
+                    maximum = price
+
+        if not count:
+            return None
+
+        return {
+            "average": total / count,
+            "min": minimum,
+            "max": maximum,
+            "days": day_count,
+            "records": count,
+        }
+
+    def _read_values(self, day):
+        """Hodnoty dne ve formě porovnatelné přes NaN."""
+        values = self.get_day(day)
+        return None if values is None else _comparable(values)
+
+
+def _comparable(values):
+    """NaN != NaN, pro porovnání záznamů je nahraď None."""
+    return [None if value != value else value for value in values]
@@ -0,0 +1,142 @@
+"""Optimalizace nabíjení a vybíjení baterie podle spotových cen.
+
+Dynamické programování přes diskretizovaný stav nabití (SoC) na sloučené
+časové ose dnes+zítra. Nákup i prodej se počítá spotovou cenou, ztráty
+účinnosti se dělí rovným dílem na nabíjení a vybíjení.
+"""
+from dataclasses import dataclass
+import logging
+import math
+
+_LOGGER = logging.getLogger(__name__)
+
+ACTION_CHARGE = "charge"
+ACTION_DISCHARGE = "discharge"
+ACTION_IDLE = "idle"
+
+# Délka slotu v hodinách
+SLOT_HOURS = 0.25
+# Jemnost kroku: plný výkon za slot = 4 kroky SoC (umožní i částečný výkon)
+STEPS_PER_SLOT = 4
+# Horní mez počtu úrovní SoC (drží výpočet v jednotkách ms)
+MAX_LEVELS = 200
+
+
+@dataclass(frozen=True)
+class BatteryParams:
+    """Parametry baterie."""
+
+    capacity_kwh: float
+    power_kw: float
+    # Účinnost nabití i vybití dohromady (0-1)
+    efficiency: float
+
+
+@dataclass(frozen=True)
+class BatteryPlan:
+    """Plán pro každý slot sloučené osy: {index: (akce, výkon kW, SoC po slotu kWh)}."""
+
+    slots: dict
+    profit: float
+
+
+def _grid(params, slot_hours):
+    """
+    Krok SoC (kWh), počet úrovní a nejvyšší změna úrovní za slot, nebo None.
+
+    Energie za slot je vždy celý násobek kroku, takže plán může využít plný výkon.
+    """
+    slot_energy = params.power_kw * slot_hours
+    steps = STEPS_PER_SLOT
+    if params.capacity_kwh * steps > slot_energy * MAX_LEVELS:
+        # Velká kapacita vůči výkonu: méně kroků na slot, nejméně jeden
+        steps = int(slot_energy * MAX_LEVELS / params.capacity_kwh + 1e-9)
+        if steps < 1:
+            return None
+    elif params.capacity_kwh * steps < slot_energy:
+        # Malá kapacita vůči výkonu: jemnější krok, aby se do baterie vešla aspoň jedna úroveň
+        steps = math.ceil(slot_energy / params.capacity_kwh - 1e-9)
+    delta = slot_energy / steps
+    levels = int(params.capacity_kwh / delta + 1e-9)
+    return delta, levels, min(levels, steps)
+
+
+def optimize_battery(prices, params, slot_hours=SLOT_HOURS) -> BatteryPlan | None:
+    """
+    Najdi plán s nejvyšším ziskem z arbitráže.
+
+    Args:
+        prices: {index sloučené osy: cena EUR/MWh}
+        params: BatteryParams
+        slot_hours: délka slotu v hodinách (0.25, u agregovaných cen víc)
+
+    Returns:
+        BatteryPlan nebo None (bez cen nebo neplatné parametry). Baterie začíná
+        prázdná na začátku osy, energie zbylá na konci se neoceňuje.
+    """
+    if not prices or params.capacity_kwh <= 0 or params.power_kw <= 0 or params.efficiency <= 0:
+        return None
+
+    grid = _grid(params, slot_hours)
+    if grid is None:
+        _LOGGER.warning(
+            "Plán baterie nelze spočítat: kapacita %s kWh je vůči výkonu %s kW příliš velká",
+            params.capacity_kwh, params.power_kw,
+        )
+        return None
+    delta, levels, max_move = grid
+
+    leg_efficiency = math.sqrt(min(params.efficiency, 1.0))
+    indices = sorted(prices)
+    moves = range(-max_move, max_move + 1)
+
+    # Zisk (EUR) změny o `move` úrovní v daném slotu; nabíjení bere ze sítě víc, vybíjení dodá míň
+    def gains(price):
+        per_kwh = price / 1000
+        return {
+            move: (
+                -move * delta / leg_efficiency * per_kwh if move > 0
+                else -move * delta * leg_efficiency * per_kwh
+            )
+            for move in moves
+        }
+
+    # Zpětný průchod: value[s] = nejlepší zisk od slotu dál při úrovni s
+    value = [0.0] * (levels + 1)
+    choices = []
+    for idx in reversed(indices):
+        gain = gains(prices[idx])
+        new_value = [0.0] * (levels + 1)
+        choice = [0] * (levels + 1)
+        for level in range(levels + 1):
+            # Nečinnost má přednost při shodném zisku (žádné zbytečné cyklování)
+            best_move = 0
+            best = value[level]
+            for move in range(max(-max_move, -level), min(max_move, levels - level) + 1):
+                if move == 0:
+                    continue
+                candidate = gain[move] + value[level + move]
+                if candidate > best + 1e-9:
+                    best = candidate
+                    best_move = move
+            new_value[level] = best
+            choice[level] = best_move
+        value = new_value
+        choices.append(choice)
+    choices.reverse()
+
+    # Dopředný průchod od prázdné baterie
+    slots = {}
+    level = 0
+    for idx, choice in zip(indices, choices):
+        move = choice[level]
+        level += move
+        if move > 0:
+            action = ACTION_CHARGE
+        elif move < 0:
+            action = ACTION_DISCHARGE
+        else:
+            action = ACTION_IDLE
+        slots[idx] = (action, round(abs(move) * delta / slot_hours, 3), round(level * delta, 3))
+
+    return BatteryPlan(slots=slots, profit=value[0])
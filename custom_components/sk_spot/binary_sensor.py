@@ -1,6 +1,6 @@
 """SK Spot binary sensors."""
-import logging
 from datetime import datetime, timedelta
+import logging
 
 from homeassistant.components.binary_sensor import (
     BinarySensorEntity,
@@ -9,10 +9,21 @@ from homeassistant.components.binary_sensor import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN
+from .analytics import RANK_BAND_BOTTOM, RANK_BAND_TOP, rank_band_limits
+from .entity import SKSpotTransitionEntity
+from .const import (
+    DOMAIN,
+    CONF_BLOCK_SIZES,
+    DEFAULT_BLOCK_SIZES,
+    CONF_CHARGING_PLANS,
+    DEFAULT_CHARGING_PLANS,
+    CONF_RANK_BANDS,
+    DEFAULT_RANK_BANDS,
+    CONF_WINDOW_BLOCKS,
+    DEFAULT_WINDOW_BLOCKS,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,31 +35,52 @@ async def async_setup_entry(
 ) -> None:
     """Setup binary sensorů."""
     coordinator = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities([
-        SKSpotTomorrowDataSensor(coordinator, entry),
-        SKSpotCheapest4BlockSensor(coordinator, entry),
-        SKSpotCheapest8BlockSensor(coordinator, entry),
-        SKSpotCheapest4BlockTomorrowSensor(coordinator, entry),
-        SKSpotCheapest8BlockTomorrowSensor(coordinator, entry),
-        # Ranking binary sensors
-        SKSpotInTop5ExpensiveSensor(coordinator, entry),
-        SKSpotInTop10ExpensiveSensor(coordinator, entry),
-        SKSpotInBottom5CheapSensor(coordinator, entry),
-        SKSpotInBottom10CheapSensor(coordinator, entry),
-    ])
-
-
-class SKSpotTomorrowDataSensor(CoordinatorEntity, BinarySensorEntity):
+    block_sizes = entry.options.get(CONF_BLOCK_SIZES, DEFAULT_BLOCK_SIZES)
+
+    entities = [SKSpotTomorrowDataSensor(coordinator, entry)]
+    # Nejlevnější bloky podle nastavení (výchozí 4 a 8 intervalů)
+    entities.extend(
+        SKSpotCheapestBlockSensor(coordinator, entry, size) for size in block_sizes
+    )
+    entities.extend(
+        SKSpotCheapestBlockTomorrowSensor(coordinator, entry, size) for size in block_sizes
+    )
+    # Nejlevnější bloky v časovém okně (např. 22:00-06:00)
+    entities.extend(
+        SKSpotWindowBlockSensor(coordinator, entry, size, start, end)
+        for size, start, end in entry.options.get(CONF_WINDOW_BLOCKS, DEFAULT_WINDOW_BLOCKS)
+    )
+    # Nabíjecí plány: K nejlevnějších slotů do termínu
+    entities.extend(
+        SKSpotChargingSlotsSensor(coordinator, entry, count, deadline)
+        for count, deadline in entry.options.get(CONF_CHARGING_PLANS, DEFAULT_CHARGING_PLANS)
+    )
+    # Pásma ranku (top N, bottom N, percentil) nad sdíleným rankem dneška
+    entities.extend(
+        SKSpotRankBandSensor(coordinator, entry, band)
+        for band in entry.options.get(CONF_RANK_BANDS, DEFAULT_RANK_BANDS)
+    )
+    async_add_entities(entities)
+
+
+class SKSpotTomorrowDataSensor(SKSpotTransitionEntity, BinarySensorEntity):
     """Binary sensor pro indikaci dostupnosti zítřejších dat."""
 
     _attr_device_class = BinarySensorDeviceClass.CONNECTIVITY
 
     def __init__(self, coordinator, entry: ConfigEntry) -> None:
         """Init."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, entry)
         self._attr_name = "SK Spot Tomorrow Data"
         self._attr_unique_id = f"{entry.entry_id}_tomorrow_data"
 
+    def _state_fingerprint(self):
+        """Mění se jen se zítřejšími daty."""
+        return (
+            self.coordinator.data.get("tomorrow_available", False),
+            len(self.coordinator.data.get("tomorrow_prices", {})),
+        )
+
     @property
     def is_on(self) -> bool:
         """Vrať True pokud máme zítřejší data."""
@@ -63,10 +95,14 @@ class SKSpotTomorrowDataSensor(CoordinatorEntity, BinarySensorEntity):
             return {}
 
         tomorrow_prices = self.coordinator.data.get("tomorrow_prices", {})
+        # Počet záznamů z reportu - vždy 15min sloty bez ohledu na rozlišení entit
+        analytics = self.coordinator.data.get("analytics")
+        # Dny přechodu času mají 92 nebo 100 záznamů
+        expected_records = analytics.tomorrow_timeline.slot_count if analytics is not None else 96
         return {
             "tomorrow_records_count": len(tomorrow_prices),
-            "expected_records": 96,
-            "data_complete": len(tomorrow_prices) >= 90,
+            "expected_records": expected_records,
+            "data_complete": len(tomorrow_prices) >= expected_records - 6,
         }
 
     @property
@@ -77,97 +113,50 @@ class SKSpotTomorrowDataSensor(CoordinatorEntity, BinarySensorEntity):
         return "mdi:calendar-remove"
 
 
-def find_cheapest_block(prices_dict, block_size):
-    """
-    Najdi nejlevnější souvislý blok dané velikosti.
-
-    Args:
-        prices_dict: Slovník {index: cena}
-        block_size: Velikost bloku (počet 15min intervalů)
-
-    Returns:
-        tuple: (start_index, end_index, avg_price) nebo None
-    """
-    if not prices_dict or len(prices_dict) < block_size:
-        return None
-
-    # Seřaď indexy
-    sorted_indices = sorted(prices_dict.keys())
-
-    # Najdi všechny možné souvislé bloky
-    best_block = None
-    best_sum = float('inf')
-
-    for i in range(len(sorted_indices) - block_size + 1):
-        # Zkontroluj, zda je blok souvislý (indexy jdou po sobě)
-        is_continuous = True
-        for j in range(block_size - 1):
-            if sorted_indices[i + j + 1] != sorted_indices[i + j] + 1:
-                is_continuous = False
-                break
-
-        if not is_continuous:
-            continue
-
-        # Vypočítej celkovou cenu bloku
-        block_sum = sum(prices_dict[sorted_indices[i + j]] for j in range(block_size))
+class SKSpotCheapestBlockSensor(SKSpotTransitionEntity, BinarySensorEntity):
+    """Binary sensor pro indikaci nejlevnějšího souvislého bloku (dnes+zítra)."""
 
-        if block_sum < best_sum:
-            best_sum = block_sum
-            start_idx = sorted_indices[i]
-            end_idx = sorted_indices[i + block_size - 1]
-            best_block = (start_idx, end_idx, best_sum / block_size)
-
-    return best_block
-
-
-class SKSpotCheapest4BlockSensor(CoordinatorEntity, BinarySensorEntity):
-    """Binary sensor pro indikaci nejlevnějšího bloku 4 intervalů (1 hodina)."""
-
-    def __init__(self, coordinator, entry: ConfigEntry) -> None:
+    def __init__(self, coordinator, entry: ConfigEntry, block_size: int) -> None:
         """Init."""
-        super().__init__(coordinator)
-        self._attr_name = "SK Spot Cheapest 4 Block"
-        self._attr_unique_id = f"{entry.entry_id}_cheapest_4_block"
+        super().__init__(coordinator, entry)
+        self._block_size = block_size
+        self._attr_name = f"SK Spot Cheapest {block_size} Block"
+        self._attr_unique_id = f"{entry.entry_id}_cheapest_{block_size}_block"
+
+    def _state_fingerprint(self):
+        """Blok se mění s verzí dat, stav s aktuálním intervalem."""
+        return (self._data_version(), self.is_on)
+
+    def _transition_times(self):
+        """Začátek a konec nejlevnějšího bloku."""
+        analytics = self._analytics()
+        cheapest = analytics.cheapest_block(self._block_size) if analytics is not None else None
+        if not cheapest:
+            return ()
+        return (analytics.slot_start(cheapest[0]), analytics.slot_end(cheapest[1]))
 
     @property
     def is_on(self) -> bool:
-        """Vrať True pokud jsme v nejlevnějším 4-intervalovém bloku."""
+        """Vrať True pokud jsme v nejlevnějším bloku."""
         if self.coordinator.data is None:
             return False
 
-        today_prices = self.coordinator.data.get("today_prices", {})
-        tomorrow_prices = self.coordinator.data.get("tomorrow_prices", {})
-        tomorrow_available = self.coordinator.data.get("tomorrow_available", False)
-
-        # Slouč dnešní a zítřejší ceny do jednoho slovníku
-        all_prices = today_prices.copy()
-        if tomorrow_available:
-            # Přidej zítřejší ceny s offsetem 96
-            for idx, price in tomorrow_prices.items():
-                all_prices[idx + 96] = price
-
-        if not all_prices:
+        analytics = self._analytics()
+        if analytics is None:
             return False
 
-        # Najdi nejlevnější blok 4 intervalů
-        cheapest = find_cheapest_block(all_prices, 4)
+        # Nejlevnější blok ze sloučené časové osy dnes+zítra
+        cheapest = analytics.cheapest_block(self._block_size)
         if not cheapest:
             return False
 
         start_idx, end_idx, _ = cheapest
 
-        # Zjisti aktuální index
-        now = dt_util.now()
-        current_hour = now.hour
-        current_minute = now.minute
-        current_idx = (current_hour * 4) + (current_minute // 15)
-
-        # Pokud jsme zítra (po půlnoci a máme zítřejší data)
-        today = now.date()
-        if self.coordinator._last_download_date and self.coordinator._last_download_date < today:
-            # Jsme v novém dni, ale data se ještě neposunula
-            current_idx += 96
+        # Index aktuálního slotu ve sloučené ose dnes+zítra
+        # (po půlnoci před posunem dat ukazuje do zítřejší části)
+        current_idx = self._now_index()
+        if current_idx is None:
+            return False
 
         # Zkontroluj, zda jsme v bloku
         return start_idx <= current_idx <= end_idx
@@ -178,168 +167,22 @@ class SKSpotCheapest4BlockSensor(CoordinatorEntity, BinarySensorEntity):
         if self.coordinator.data is None:
             return {}
 
-        today_prices = self.coordinator.data.get("today_prices", {})
-        tomorrow_prices = self.coordinator.data.get("tomorrow_prices", {})
-        tomorrow_available = self.coordinator.data.get("tomorrow_available", False)
-
-        all_prices = today_prices.copy()
-        if tomorrow_available:
-            for idx, price in tomorrow_prices.items():
-                all_prices[idx + 96] = price
-
-        cheapest = find_cheapest_block(all_prices, 4)
-        if not cheapest:
-            return {}
-
-        start_idx, end_idx, avg_price = cheapest
-
-        # Převeď indexy na časy
-        now = dt_util.now()
-        today = now.date()
-
-        # Start čas
-        if start_idx < 96:
-            start_day = today
-            start_hour = start_idx // 4
-            start_minute = (start_idx % 4) * 15
-        else:
-            start_day = today + timedelta(days=1)
-            actual_idx = start_idx - 96
-            start_hour = actual_idx // 4
-            start_minute = (actual_idx % 4) * 15
-
-        start_time = datetime.combine(start_day, datetime.min.time().replace(hour=start_hour, minute=start_minute))
-        start_time = dt_util.as_local(dt_util.as_utc(start_time))
-
-        # End čas
-        if end_idx < 96:
-            end_day = today
-            end_hour = end_idx // 4
-            end_minute = (end_idx % 4) * 15
-        else:
-            end_day = today + timedelta(days=1)
-            actual_idx = end_idx - 96
-            end_hour = actual_idx // 4
-            end_minute = (actual_idx % 4) * 15
-
-        # Přičti 15 minut k end času (konec intervalu)
-        end_time = datetime.combine(end_day, datetime.min.time().replace(hour=end_hour, minute=end_minute))
-        end_time = dt_util.as_local(dt_util.as_utc(end_time)) + timedelta(minutes=15)
-
-        return {
-            "start_time": start_time.isoformat(),
-            "end_time": end_time.isoformat(),
-            "average_price": round(avg_price, 4),
-            "duration_minutes": 60,
-        }
-
-    @property
-    def icon(self):
-        """Ikona."""
-        if self.is_on:
-            return "mdi:lightning-bolt"
-        return "mdi:lightning-bolt-outline"
-
-
-class SKSpotCheapest8BlockSensor(CoordinatorEntity, BinarySensorEntity):
-    """Binary sensor pro indikaci nejlevnějšího bloku 8 intervalů (2 hodiny)."""
-
-    def __init__(self, coordinator, entry: ConfigEntry) -> None:
-        """Init."""
-        super().__init__(coordinator)
-        self._attr_name = "SK Spot Cheapest 8 Block"
-        self._attr_unique_id = f"{entry.entry_id}_cheapest_8_block"
-
-    @property
-    def is_on(self) -> bool:
-        """Vrať True pokud jsme v nejlevnějším 8-intervalovém bloku."""
-        if self.coordinator.data is None:
-            return False
-
-        today_prices = self.coordinator.data.get("today_prices", {})
-        tomorrow_prices = self.coordinator.data.get("tomorrow_prices", {})
-        tomorrow_available = self.coordinator.data.get("tomorrow_available", False)
-
-        all_prices = today_prices.copy()
-        if tomorrow_available:
-            for idx, price in tomorrow_prices.items():
-                all_prices[idx + 96] = price
-
-        if not all_prices:
-            return False
-
-        cheapest = find_cheapest_block(all_prices, 8)
-        if not cheapest:
-            return False
-
-        start_idx, end_idx, _ = cheapest
-
-        now = dt_util.now()
-        current_hour = now.hour
-        current_minute = now.minute
-        current_idx = (current_hour * 4) + (current_minute // 15)
-
-        today = now.date()
-        if self.coordinator._last_download_date and self.coordinator._last_download_date < today:
-            current_idx += 96
-
-        return start_idx <= current_idx <= end_idx
-
-    @property
-    def extra_state_attributes(self):
-        """Atributy."""
-        if self.coordinator.data is None:
+        analytics = self._analytics()
+        if analytics is None:
             return {}
 
-        today_prices = self.coordinator.data.get("today_prices", {})
-        tomorrow_prices = self.coordinator.data.get("tomorrow_prices", {})
-        tomorrow_available = self.coordinator.data.get("tomorrow_available", False)
-
-        all_prices = today_prices.copy()
-        if tomorrow_available:
-            for idx, price in tomorrow_prices.items():
-                all_prices[idx + 96] = price
-
-        cheapest = find_cheapest_block(all_prices, 8)
+        cheapest = analytics.cheapest_block(self._block_size)
         if not cheapest:
             return {}
 
         start_idx, end_idx, avg_price = cheapest
 
-        now = dt_util.now()
-        today = now.date()
-
-        if start_idx < 96:
-            start_day = today
-            start_hour = start_idx // 4
-            start_minute = (start_idx % 4) * 15
-        else:
-            start_day = today + timedelta(days=1)
-            actual_idx = start_idx - 96
-            start_hour = actual_idx // 4
-            start_minute = (actual_idx % 4) * 15
-
-        start_time = datetime.combine(start_day, datetime.min.time().replace(hour=start_hour, minute=start_minute))
-        start_time = dt_util.as_local(dt_util.as_utc(start_time))
-
-        if end_idx < 96:
-            end_day = today
-            end_hour = end_idx // 4
-            end_minute = (end_idx % 4) * 15
-        else:
-            end_day = today + timedelta(days=1)
-            actual_idx = end_idx - 96
-            end_hour = actual_idx // 4
-            end_minute = (actual_idx % 4) * 15
-
-        end_time = datetime.combine(end_day, datetime.min.time().replace(hour=end_hour, minute=end_minute))
-        end_time = dt_util.as_local(dt_util.as_utc(end_time)) + timedelta(minutes=15)
-
+        # Časy jsou předrenderované v časové ose (správně i pro dny přechodu času)
         return {
-            "start_time": start_time.isoformat(),
-            "end_time": end_time.isoformat(),
+            "start_time": analytics.iso_start(start_idx),
+            "end_time": analytics.iso_end(end_idx),
             "average_price": round(avg_price, 4),
-            "duration_minutes": 120,
+            "duration_minutes": self._block_size * analytics.slot_duration // timedelta(minutes=1),
         }
 
     @property
@@ -350,48 +193,56 @@ class SKSpotCheapest8BlockSensor(CoordinatorEntity, BinarySensorEntity):
         return "mdi:lightning-bolt-outline"
 
 
-class SKSpotCheapest4BlockTomorrowSensor(CoordinatorEntity, BinarySensorEntity):
-    """Binary sensor pro indikaci nejlevnějšího bloku 4 intervalů (1 hodina) pouze pro zítřek."""
+class SKSpotCheapestBlockTomorrowSensor(SKSpotTransitionEntity, BinarySensorEntity):
+    """Binary sensor pro indikaci nejlevnějšího souvislého bloku pouze pro zítřek."""
 
-    def __init__(self, coordinator, entry: ConfigEntry) -> None:
+    def __init__(self, coordinator, entry: ConfigEntry, block_size: int) -> None:
         """Init."""
-        super().__init__(coordinator)
-        self._attr_name = "SK Spot Cheapest 4 Block Tomorrow"
-        self._attr_unique_id = f"{entry.entry_id}_cheapest_4_block_tomorrow"
+        super().__init__(coordinator, entry)
+        self._block_size = block_size
+        self._attr_name = f"SK Spot Cheapest {block_size} Block Tomorrow"
+        self._attr_unique_id = f"{entry.entry_id}_cheapest_{block_size}_block_tomorrow"
+
+    def _state_fingerprint(self):
+        """Blok se mění s verzí dat, stav s aktuálním intervalem."""
+        return (self._data_version(), self.is_on)
+
+    def _transition_times(self):
+        """Začátek a konec nejlevnějšího bloku zítřka."""
+        analytics = self._analytics()
+        if analytics is None or analytics.tomorrow is None:
+            return ()
+        cheapest = analytics.cheapest_block(self._block_size, tomorrow_only=True)
+        if not cheapest:
+            return ()
+        offset = analytics.tomorrow_offset
+        return (analytics.slot_start(cheapest[0] + offset), analytics.slot_end(cheapest[1] + offset))
 
     @property
     def is_on(self) -> bool:
-        """Vrať True pokud jsme v nejlevnějším 4-intervalovém bloku zítřka."""
+        """Vrať True pokud jsme v nejlevnějším bloku zítřka."""
         if self.coordinator.data is None:
             return False
 
-        tomorrow_prices = self.coordinator.data.get("tomorrow_prices", {})
-        tomorrow_available = self.coordinator.data.get("tomorrow_available", False)
-
-        if not tomorrow_available or not tomorrow_prices:
+        analytics = self._analytics()
+        if analytics is None or analytics.tomorrow is None:
             return False
 
-        # Najdi nejlevnější blok 4 intervalů pouze v zítřejších datech
-        cheapest = find_cheapest_block(tomorrow_prices, 4)
+        # Nejlevnější blok pouze v zítřejších datech
+        cheapest = analytics.cheapest_block(self._block_size, tomorrow_only=True)
         if not cheapest:
             return False
 
         start_idx, end_idx, _ = cheapest
 
-        # Zjisti aktuální index
-        now = dt_util.now()
-        current_hour = now.hour
-        current_minute = now.minute
-        current_idx = (current_hour * 4) + (current_minute // 15)
-
         # Pokud jsme dnes, nejsme v zítřejším bloku
-        today = now.date()
-        if self.coordinator._last_download_date and self.coordinator._last_download_date >= today:
+        current_idx = self._now_index()
+        if current_idx is None or current_idx < analytics.tomorrow_offset:
             return False
 
         # Jsme v novém dni (po půlnoci), ale data se ještě neposunula
         # Zítřejší data jsou teď vlastně dnešní
-        return start_idx <= current_idx <= end_idx
+        return start_idx <= current_idx - analytics.tomorrow_offset <= end_idx
 
     @property
     def extra_state_attributes(self):
@@ -399,38 +250,23 @@ class SKSpotCheapest4BlockTomorrowSensor(CoordinatorEntity, BinarySensorEntity):
         if self.coordinator.data is None:
             return {}
 
-        tomorrow_prices = self.coordinator.data.get("tomorrow_prices", {})
-        tomorrow_available = self.coordinator.data.get("tomorrow_available", False)
-
-        if not tomorrow_available or not tomorrow_prices:
+        analytics = self._analytics()
+        if analytics is None or analytics.tomorrow is None:
             return {}
 
-        cheapest = find_cheapest_block(tomorrow_prices, 4)
+        cheapest = analytics.cheapest_block(self._block_size, tomorrow_only=True)
         if not cheapest:
             return {}
 
         start_idx, end_idx, avg_price = cheapest
 
-        # Převeď indexy na časy (zítřejší den)
-        now = dt_util.now()
-        tomorrow_date = now.date() + timedelta(days=1)
-
-        start_hour = start_idx // 4
-        start_minute = (start_idx % 4) * 15
-        end_hour = end_idx // 4
-        end_minute = (end_idx % 4) * 15
-
-        start_time = datetime.combine(tomorrow_date, datetime.min.time().replace(hour=start_hour, minute=start_minute))
-        start_time = dt_util.as_local(dt_util.as_utc(start_time))
-
-        end_time = datetime.combine(tomorrow_date, datetime.min.time().replace(hour=end_hour, minute=end_minute))
-        end_time = dt_util.as_local(dt_util.as_utc(end_time)) + timedelta(minutes=15)
-
+        # Časy ze zítřejší časové osy
+        timeline = analytics.tomorrow_timeline
         return {
-            "start_time": start_time.isoformat(),
-            "end_time": end_time.isoformat(),
+            "start_time": timeline.iso_starts[start_idx],
+            "end_time": timeline.iso_ends[end_idx],
             "average_price": round(avg_price, 4),
-            "duration_minutes": 60,
+            "duration_minutes": self._block_size * analytics.slot_duration // timedelta(minutes=1),
         }
 
     @property
@@ -441,292 +277,347 @@ class SKSpotCheapest4BlockTomorrowSensor(CoordinatorEntity, BinarySensorEntity):
         return "mdi:calendar-outline"
 
 
-class SKSpotCheapest8BlockTomorrowSensor(CoordinatorEntity, BinarySensorEntity):
-    """Binary sensor pro indikaci nejlevnějšího bloku 8 intervalů (2 hodiny) pouze pro zítřek."""
+class SKSpotWindowBlockSensor(SKSpotTransitionEntity, BinarySensorEntity):
+    """Binary sensor - nejlevnější souvislý blok uvnitř denního časového okna.
 
-    def __init__(self, coordinator, entry: ConfigEntry) -> None:
+    Okno může přecházet přes půlnoc (22:00-06:00). Hledá se v aktuálním, případně
+    nejbližším budoucím výskytu okna, dotaz jde přes index oken v O(1).
+    """
+
+    def __init__(self, coordinator, entry: ConfigEntry, block_size: int, start: str, end: str) -> None:
         """Init."""
-        super().__init__(coordinator)
-        self._attr_name = "SK Spot Cheapest 8 Block Tomorrow"
-        self._attr_unique_id = f"{entry.entry_id}_cheapest_8_block_tomorrow"
+        super().__init__(coordinator, entry)
+        self._block_size = block_size
+        self._start = datetime.strptime(start, "%H:%M").time()
+        self._end = datetime.strptime(end, "%H:%M").time()
+        self._attr_name = f"SK Spot Cheapest {block_size} Block {start}-{end}"
+        self._attr_unique_id = (
+            f"{entry.entry_id}_cheapest_{block_size}_block_"
+            f"{start.replace(':', '')}_{end.replace(':', '')}"
+        )
+
+    def _occurrence(self):
+        """Aktuální nebo nejbližší výskyt okna (začátek, konec) v místním čase."""
+        now = dt_util.now()
+        # Okno přes půlnoc končí následující den (stejné časy = celý den)
+        end_offset = timedelta(days=1) if self._end <= self._start else timedelta()
+        for day_offset in (-1, 0, 1):
+            day = now.date() + timedelta(days=day_offset)
+            start = datetime.combine(day, self._start, tzinfo=now.tzinfo)
+            end = datetime.combine(day + end_offset, self._end, tzinfo=now.tzinfo)
+            if end > now:
+                return start, end
+        return None
 
-    @property
-    def is_on(self) -> bool:
-        """Vrať True pokud jsme v nejlevnějším 8-intervalovém bloku zítřka."""
+    def _block(self):
+        """(výskyt okna, nejlevnější blok v něm) nebo None."""
         if self.coordinator.data is None:
-            return False
+            return None
+        analytics = self._analytics()
+        occurrence = self._occurrence()
+        if analytics is None or occurrence is None:
+            return None
+        first, last = analytics.window_bounds(*occurrence)
+        return occurrence, analytics.cheapest_window_between(self._block_size, first, last)
+
+    def _state_fingerprint(self):
+        """Blok se mění s verzí dat a výskytem okna, stav s aktuálním intervalem."""
+        block = self._block()
+        return (self._data_version(), block[0] if block else None, self.is_on)
+
+    def _transition_times(self):
+        """Začátek a konec bloku a konec výskytu okna (pak se hledá v dalším výskytu)."""
+        block = self._block()
+        if block is None:
+            return ()
+        (_, window_end), cheapest = block
+        times = [dt_util.as_utc(window_end)]
+        if cheapest is not None:
+            analytics = self._analytics()
+            times.extend((analytics.slot_start(cheapest[0]), analytics.slot_end(cheapest[1])))
+        return sorted(times)
 
-        tomorrow_prices = self.coordinator.data.get("tomorrow_prices", {})
-        tomorrow_available = self.coordinator.data.get("tomorrow_available", False)
-
-        if not tomorrow_available or not tomorrow_prices:
-            return False
-
-        cheapest = find_cheapest_block(tomorrow_prices, 8)
-        if not cheapest:
-            return False
-
-        start_idx, end_idx, _ = cheapest
-
-        now = dt_util.now()
-        current_hour = now.hour
-        current_minute = now.minute
-        current_idx = (current_hour * 4) + (current_minute // 15)
-
-        today = now.date()
-        if self.coordinator._last_download_date and self.coordinator._last_download_date >= today:
+    @property
+    def is_on(self) -> bool:
+        """Vrať True pokud jsme v nejlevnějším bloku okna."""
+        block = self._block()
+        if block is None or block[1] is None:
             return False
-
-        return start_idx <= current_idx <= end_idx
+        start_idx, end_idx, _ = block[1]
+        current_idx = self._now_index()
+        return current_idx is not None and start_idx <= current_idx <= end_idx
 
     @property
     def extra_state_attributes(self):
         """Atributy."""
-        if self.coordinator.data is None:
+        block = self._block()
+        if block is None:
             return {}
 
-        tomorrow_prices = self.coordinator.data.get("tomorrow_prices", {})
-        tomorrow_available = self.coordinator.data.get("tomorrow_available", False)
-
-        if not tomorrow_available or not tomorrow_prices:
-            return {}
-
-        cheapest = find_cheapest_block(tomorrow_prices, 8)
-        if not cheapest:
-            return {}
+        (window_start, window_end), cheapest = block
+        analytics = self._analytics()
+        attrs = {
+            "window_start": window_start.isoformat(),
+            "window_end": window_end.isoformat(),
+            "duration_minutes": self._block_size * analytics.slot_duration // timedelta(minutes=1),
+        }
+        if cheapest is None:
+            # Okno ještě nemá ceny (např. zítřek nezveřejněn)
+            return attrs
 
         start_idx, end_idx, avg_price = cheapest
-
-        now = dt_util.now()
-        tomorrow_date = now.date() + timedelta(days=1)
-
-        start_hour = start_idx // 4
-        start_minute = (start_idx % 4) * 15
-        end_hour = end_idx // 4
-        end_minute = (end_idx % 4) * 15
-
-        start_time = datetime.combine(tomorrow_date, datetime.min.time().replace(hour=start_hour, minute=start_minute))
-        start_time = dt_util.as_local(dt_util.as_utc(start_time))
-
-        end_time = datetime.combine(tomorrow_date, datetime.min.time().replace(hour=end_hour, minute=end_minute))
-        end_time = dt_util.as_local(dt_util.as_utc(end_time)) + timedelta(minutes=15)
-
         return {
-            "start_time": start_time.isoformat(),
-            "end_time": end_time.isoformat(),
+            "start_time": analytics.iso_start(start_idx),
+            "end_time": analytics.iso_end(end_idx),
             "average_price": round(avg_price, 4),
-            "duration_minutes": 120,
+            **attrs,
         }
 
     @property
     def icon(self):
         """Ikona."""
         if self.is_on:
-            return "mdi:calendar-arrow-right"
-        return "mdi:calendar-outline"
-
-
-def get_current_rank(coordinator):
-    """Pomocná funkce pro získání aktuálního ranku."""
-    if coordinator.data is None:
-        return None
-
-    today_prices = coordinator.data.get("today_prices", {})
-    if not today_prices:
-        return None
-
-    # Zjisti aktuální index
-    now = dt_util.now()
-    current_hour = now.hour
-    current_minute = now.minute
-    current_idx = (current_hour * 4) + (current_minute // 15)
-
-    if current_idx not in today_prices:
-        return None
-
-    current_price = today_prices[current_idx]
+            return "mdi:lightning-bolt"
+        return "mdi:clock-time-eight-outline"
 
-    # Spočítej kolik bloků má nižší cenu (standard ranking)
-    # Pokud je více bloků se stejnou cenou, všechny mají stejný rank
-    lower_count = sum(1 for price in today_prices.values() if price < current_price)
 
-    # Rank je počet bloků s nižší cenou + 1
-    return lower_count + 1
+class SKSpotChargingSlotsSensor(SKSpotTransitionEntity, BinarySensorEntity):
+    """Binary sensor - právě probíhá jeden z K nejlevnějších slotů před termínem.
 
+    Sloty nemusí jít po sobě (přerušitelné zátěže jako nabíjení EV nebo baterie).
+    Vybírá se jen z aktuálního a dalších slotů před nejbližším termínem. Sloty
+    výběru, které už proběhly, zůstávají ve výběru a nová data (např. zveřejněný
+    zítřek) rozdělí jen zbylý počet slotů.
+    """
 
-class SKSpotInTop5ExpensiveSensor(CoordinatorEntity, BinarySensorEntity):
-    """Binary sensor - jsme v top 5 nejdražších blocích."""
+    # Seznam vybraných slotů se do recorderu neukládá
+    _unrecorded_attributes = frozenset({"slots"})
 
-    def __init__(self, coordinator, entry: ConfigEntry) -> None:
+    def __init__(self, coordinator, entry: ConfigEntry, count: int, deadline: str) -> None:
         """Init."""
-        super().__init__(coordinator)
-        self._attr_name = "SK Spot In Top 5 Expensive"
-        self._attr_unique_id = f"{entry.entry_id}_in_top_5_expensive"
+        super().__init__(coordinator, entry)
+        self._count = count
+        self._deadline = datetime.strptime(deadline, "%H:%M").time()
+        self._attr_name = f"SK Spot Charging {count} Slots {deadline}"
+        self._attr_unique_id = f"{entry.entry_id}_charging_{count}_slots_{deadline.replace(':', '')}"
+        # Výběr pro (verzi dat, termín)
+        self._selection_key = None
+        self._selection_result = None
+        self._attributes_key = None
+        self._attributes = {}
+
+    def _next_deadline(self):
+        """Nejbližší budoucí termín v místním čase."""
+        now = dt_util.now()
+        deadline = datetime.combine(now.date(), self._deadline, tzinfo=now.tzinfo)
+        if deadline <= now:
+            deadline = datetime.combine(
+                now.date() + timedelta(days=1), self._deadline, tzinfo=now.tzinfo
+            )
+        return deadline
+
+    def _selection(self):
+        """(termín, sloty, avg_price, complete) nebo None; slot = (UTC začátek, UTC konec, atributy)."""
+        if self.coordinator.data is None:
+            return None
+        analytics = self._analytics()
+        if analytics is None:
+            return None
+
+        deadline = self._next_deadline()
+        key = (analytics.version, deadline)
+        if key != self._selection_key:
+            self._selection_result = self._select(analytics, deadline)
+            self._selection_key = key
+        return self._selection_result
+
+    def _select(self, analytics, deadline):
+        """Nový výběr pro termín, proběhlé sloty předchozího výběru se zachovají."""
+        now = dt_util.utcnow()
+        now_idx = analytics.index_at(now)
+        now_start = analytics.slot_start(now_idx) if now_idx is not None else now
+
+        served = ()
+        previous = self._selection_result
+        if previous is not None and previous[0] == deadline:
+            served = tuple(slot for slot in previous[1] if slot[1] <= now_start)
+
+        first, last = analytics.window_bounds(now_start, deadline)
+        remaining = self._count - len(served)
+        result = analytics.cheapest_slots(remaining, first, last) if remaining > 0 else None
+        chosen = result[0] if result is not None else ()
+        slots = served + tuple(
+            (
+                analytics.slot_start(idx),
+                analytics.slot_end(idx),
+                {
+                    "start": analytics.iso_start(idx),
+                    "end": analytics.iso_end(idx),
+                    "price": analytics.timeline[idx],
+                },
+            )
+            for idx in chosen
+        )
+        if not slots:
+            return deadline, (), None, False
+
+        avg_price = sum(slot[2]["price"] for slot in slots) / len(slots)
+        # Bez zbývajících slotů je výběr hotový, jinak záleží na cenách zbytku okna
+        complete = result[2] if result is not None else remaining <= 0
+        return deadline, slots, avg_price, complete
+
+    @staticmethod
+    def _remaining(slots):
+        """Vybrané sloty, které ještě neskončily."""
+        now = dt_util.utcnow()
+        return [slot for slot in slots if slot[1] > now]
+
+    def _state_fingerprint(self):
+        """Výběr se mění s verzí dat a termínem, stav a zbývající sloty s časem."""
+        selection = self._selection()
+        if selection is None:
+            return (self._data_version(), None, False, 0)
+        return (self._data_version(), selection[0], self.is_on, len(self._remaining(selection[1])))
+
+    def _transition_times(self):
+        """Hranice všech vybraných slotů (mění se `remaining_slots`/`next_slot`) a termín."""
+        selection = self._selection()
+        if selection is None:
+            return ()
+        deadline, slots = selection[0], selection[1]
+        return sorted(
+            {dt_util.as_utc(deadline)} | {slot[0] for slot in slots} | {slot[1] for slot in slots}
+        )
 
     @property
     def is_on(self) -> bool:
-        """Vrať True pokud jsme v top 5 nejdražších."""
-        rank = get_current_rank(self.coordinator)
-        if rank is None:
+        """Vrať True pokud je aktuální interval mezi vybranými sloty."""
+        selection = self._selection()
+        if selection is None:
             return False
-
-        today_prices = self.coordinator.data.get("today_prices", {})
-        total_blocks = len(today_prices)
-
-        # Top 5 = ranky od (total - 4) do total
-        return rank >= (total_blocks - 4)
+        now = dt_util.utcnow()
+        return any(start <= now < end for start, end, _ in selection[1])
 
     @property
     def extra_state_attributes(self):
-        """Atributy."""
-        rank = get_current_rank(self.coordinator)
-        if rank is None:
+        """Atributy (staví se jednou za výběr)."""
+        selection = self._selection()
+        if selection is None or not selection[1]:
             return {}
 
-        today_prices = self.coordinator.data.get("today_prices", {})
-        total_blocks = len(today_prices)
-
+        deadline, slots, avg_price, complete = selection
+        if selection is not self._attributes_key:
+            self._attributes = {
+                "deadline": deadline.isoformat(),
+                "slots_requested": self._count,
+                "slots_selected": len(slots),
+                "average_price": round(avg_price, 4),
+                # False = část okna ještě nemá ceny (např. zítřek nezveřejněn), výběr se může změnit
+                "complete": complete,
+                "slots": [slot[2] for slot in slots],
+            }
+            self._attributes_key = selection
+
+        remaining = self._remaining(slots)
         return {
-            "current_rank": rank,
-            "total_blocks": total_blocks,
-            "threshold_rank": total_blocks - 4,
+            **self._attributes,
+            "remaining_slots": len(remaining),
+            "next_slot": remaining[0][2]["start"] if remaining else None,
         }
 
     @property
     def icon(self):
         """Ikona."""
         if self.is_on:
-            return "mdi:currency-eur-off"
-        return "mdi:currency-eur"
-
+            return "mdi:battery-charging"
+        return "mdi:battery-clock-outline"
 
-class SKSpotInTop10ExpensiveSensor(CoordinatorEntity, BinarySensorEntity):
-    """Binary sensor - jsme v top 10 nejdražších blocích."""
-
-    def __init__(self, coordinator, entry: ConfigEntry) -> None:
-        """Init."""
-        super().__init__(coordinator)
-        self._attr_name = "SK Spot In Top 10 Expensive"
-        self._attr_unique_id = f"{entry.entry_id}_in_top_10_expensive"
 
-    @property
-    def is_on(self) -> bool:
-        """Vrať True pokud jsme v top 10 nejdražších."""
-        rank = get_current_rank(self.coordinator)
-        if rank is None:
-            return False
-
-        today_prices = self.coordinator.data.get("today_prices", {})
-        total_blocks = len(today_prices)
-
-        # Top 10 = ranky od (total - 9) do total
-        return rank >= (total_blocks - 9)
-
-    @property
-    def extra_state_attributes(self):
-        """Atributy."""
-        rank = get_current_rank(self.coordinator)
-        if rank is None:
-            return {}
+def get_current_rank(analytics):
+    """Pomocná funkce pro získání aktuálního ranku."""
+    if analytics is None:
+        return None
 
-        today_prices = self.coordinator.data.get("today_prices", {})
-        total_blocks = len(today_prices)
+    # Standard ranking je předpočítaný ve snapshotu, slot podle skutečného času
+    return analytics.rank(analytics.index_at(dt_util.utcnow()))
 
-        return {
-            "current_rank": rank,
-            "total_blocks": total_blocks,
-            "threshold_rank": total_blocks - 9,
-        }
 
-    @property
-    def icon(self):
-        """Ikona."""
-        if self.is_on:
-            return "mdi:currency-eur-off"
-        return "mdi:currency-eur"
+def get_total_blocks(analytics):
+    """Počet dnešních bloků ze snapshotu analýz."""
+    if analytics is None or analytics.today is None:
+        return 0
+    return analytics.today.count
 
 
-class SKSpotInBottom5CheapSensor(CoordinatorEntity, BinarySensorEntity):
-    """Binary sensor - jsme v bottom 5 nejlevnějších blocích."""
+class SKSpotRankBandSensor(SKSpotTransitionEntity, BinarySensorEntity):
+    """Binary sensor - aktuální blok je v pásmu ranku (top N, bottom N, percentil)."""
 
-    def __init__(self, coordinator, entry: ConfigEntry) -> None:
+    def __init__(self, coordinator, entry: ConfigEntry, band) -> None:
         """Init."""
-        super().__init__(coordinator)
-        self._attr_name = "SK Spot In Bottom 5 Cheap"
-        self._attr_unique_id = f"{entry.entry_id}_in_bottom_5_cheap"
-
-    @property
-    def is_on(self) -> bool:
-        """Vrať True pokud jsme v bottom 5 nejlevnějších."""
-        rank = get_current_rank(self.coordinator)
-        if rank is None:
-            return False
-
-        # Bottom 5 = ranky 1-5
-        return rank <= 5
-
-    @property
-    def extra_state_attributes(self):
-        """Atributy."""
-        rank = get_current_rank(self.coordinator)
-        if rank is None:
-            return {}
-
-        today_prices = self.coordinator.data.get("today_prices", {})
-        total_blocks = len(today_prices)
-
-        return {
-            "current_rank": rank,
-            "total_blocks": total_blocks,
-            "threshold_rank": 5,
-        }
-
-    @property
-    def icon(self):
-        """Ikona."""
-        if self.is_on:
-            return "mdi:sale"
-        return "mdi:tag-outline"
+        super().__init__(coordinator, entry)
+        self._band = tuple(band)
+        kind = band[0]
+        # Pásma top/bottom drží unique_id dřívějších pevných sensorů
+        if kind == RANK_BAND_TOP:
+            self._attr_name = f"SK Spot In Top {band[1]} Expensive"
+            self._attr_unique_id = f"{entry.entry_id}_in_top_{band[1]}_expensive"
+        elif kind == RANK_BAND_BOTTOM:
+            self._attr_name = f"SK Spot In Bottom {band[1]} Cheap"
+            self._attr_unique_id = f"{entry.entry_id}_in_bottom_{band[1]}_cheap"
+        else:
+            self._attr_name = f"SK Spot In Price Percentile {band[1]}-{band[2]}"
+            self._attr_unique_id = f"{entry.entry_id}_in_price_percentile_{band[1]}_{band[2]}"
 
+    def _limits(self):
+        """Rozsah ranků pásma pro dnešní počet bloků."""
+        return rank_band_limits(self._band, get_total_blocks(self._analytics()))
 
-class SKSpotInBottom10CheapSensor(CoordinatorEntity, BinarySensorEntity):
-    """Binary sensor - jsme v bottom 10 nejlevnějších blocích."""
+    def _state_fingerprint(self):
+        """Mění se s rankem aktuálního intervalu."""
+        return (self._data_version(), get_current_rank(self._analytics()))
 
-    def __init__(self, coordinator, entry: ConfigEntry) -> None:
-        """Init."""
-        super().__init__(coordinator)
-        self._attr_name = "SK Spot In Bottom 10 Cheap"
-        self._attr_unique_id = f"{entry.entry_id}_in_bottom_10_cheap"
+    def _transition_times(self):
+        """Změny ranku během dneška (společné pro všechna pásma)."""
+        analytics = self._analytics()
+        return analytics.rank_changes() if analytics is not None else ()
 
     @property
     def is_on(self) -> bool:
-        """Vrať True pokud jsme v bottom 10 nejlevnějších."""
-        rank = get_current_rank(self.coordinator)
-        if rank is None:
+        """Vrať True pokud je aktuální blok v pásmu."""
+        if self.coordinator.data is None:
             return False
-
-        # Bottom 10 = ranky 1-10
-        return rank <= 10
+        analytics = self._analytics()
+        if analytics is None:
+            return False
+        return self._now_index() in analytics.rank_band(*self._limits())
 
     @property
     def extra_state_attributes(self):
         """Atributy."""
-        rank = get_current_rank(self.coordinator)
+        rank = get_current_rank(self._analytics())
         if rank is None:
             return {}
 
-        today_prices = self.coordinator.data.get("today_prices", {})
-        total_blocks = len(today_prices)
-
-        return {
+        low, high = self._limits()
+        attributes = {
             "current_rank": rank,
-            "total_blocks": total_blocks,
-            "threshold_rank": 10,
+            "total_blocks": get_total_blocks(self._analytics()),
         }
+        if self._band[0] == RANK_BAND_TOP:
+            attributes["threshold_rank"] = low
+        elif self._band[0] == RANK_BAND_BOTTOM:
+            attributes["threshold_rank"] = high
+        else:
+            attributes["rank_from"] = low
+            attributes["rank_to"] = high
+        return attributes
 
     @property
     def icon(self):
         """Ikona."""
-        if self.is_on:
-            return "mdi:sale"
-        return "mdi:tag-outline"
+        kind = self._band[0]
+        if kind == RANK_BAND_TOP:
+            return "mdi:currency-eur-off" if self.is_on else "mdi:currency-eur"
+        if kind == RANK_BAND_BOTTOM:
+            return "mdi:sale" if self.is_on else "mdi:tag-outline"
+        return "mdi:percent-circle" if self.is_on else "mdi:percent-circle-outline"
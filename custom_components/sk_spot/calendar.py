@@ -0,0 +1,136 @@
+"""SK Spot kalendář cenových událostí."""
+from bisect import bisect_left, bisect_right
+import logging
+
+from homeassistant.components.calendar import CalendarEntity, CalendarEvent
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.util import dt as dt_util
+
+from .analytics import (
+    EVENT_CHEAPEST_BLOCK,
+    EVENT_RANK_BAND,
+    RANK_BAND_BOTTOM,
+    RANK_BAND_TOP,
+)
+from .entity import SKSpotEntity
+from .const import (
+    DOMAIN,
+    CONF_UNIT,
+    UNIT_MWH,
+    UNIT_KWH,
+    CONF_BLOCK_SIZES,
+    DEFAULT_BLOCK_SIZES,
+    CONF_RANK_BANDS,
+    DEFAULT_RANK_BANDS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Setup kalendáře."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities([SKSpotPriceCalendar(coordinator, entry)])
+
+
+def event_summary(event) -> str:
+    """Název události (odpovídá názvům binary sensorů)."""
+    if event.kind == EVENT_CHEAPEST_BLOCK:
+        return f"Cheapest {event.key} Block"
+    if event.kind == EVENT_RANK_BAND:
+        kind = event.key[0]
+        if kind == RANK_BAND_TOP:
+            return f"Top {event.key[1]} Expensive"
+        if kind == RANK_BAND_BOTTOM:
+            return f"Bottom {event.key[1]} Cheap"
+        return f"Price Percentile {event.key[1]}-{event.key[2]}"
+    return "Negative Price"
+
+
+class SKSpotPriceCalendar(SKSpotEntity, CalendarEntity):
+    """Kalendář nejlevnějších bloků, pásem ranku a záporných cen (dnes+zítra).
+
+    Stav se zapisuje jen s novou verzí dat, začátky a konce událostí
+    přepíná vestavěný časovač CalendarEntity.
+    """
+
+    _attr_name = "SK Spot Price Events"
+    _attr_icon = "mdi:calendar-clock"
+
+    def __init__(self, coordinator, entry: ConfigEntry) -> None:
+        """Init."""
+        super().__init__(coordinator, entry)
+        self._attr_unique_id = f"{entry.entry_id}_price_events"
+        self._block_sizes = entry.options.get(CONF_BLOCK_SIZES, DEFAULT_BLOCK_SIZES)
+        self._bands = entry.options.get(CONF_RANK_BANDS, DEFAULT_RANK_BANDS)
+        self._unit = entry.data.get(CONF_UNIT, UNIT_MWH)
+        self._events_key = None
+        # Události seřazené podle začátku, UTC začátky pro bisect a nejdelší trvání
+        self._events = []
+        self._starts = []
+        self._max_duration = None
+
+    def _calendar(self):
+        """Události aktuální verze dat (CalendarEvent se staví jednou za verzi)."""
+        analytics = self._analytics()
+        if analytics is None:
+            return [], [], None
+
+        version = analytics.version
+        if version != self._events_key:
+            price_events = analytics.price_events(self._block_sizes, self._bands)
+            divisor, unit = (1000, "EUR/kWh") if self._unit == UNIT_KWH else (1, "EUR/MWh")
+            self._events = []
+            for event in price_events:
+                summary = event_summary(event)
+                self._events.append(CalendarEvent(
+                    start=dt_util.as_local(event.start),
+                    end=dt_util.as_local(event.end),
+                    summary=summary,
+                    description=f"{round(event.average / divisor, 4)} {unit}",
+                    uid=f"{self._attr_unique_id}_{event.start.isoformat()}_{summary}",
+                ))
+            self._starts = [event.start for event in price_events]
+            self._max_duration = max(
+                (event.end - event.start for event in price_events), default=None
+            )
+            self._events_key = version
+        return self._events, self._starts, self._max_duration
+
+    def _between(self, start, end):
+        """Události, které zasahují do intervalu [start, end)."""
+        events, starts, max_duration = self._calendar()
+        if not events:
+            return []
+        # Událost začínající dřív než start - nejdelší trvání už do intervalu nezasahuje
+        lo = bisect_left(starts, start - max_duration)
+        hi = bisect_left(starts, end)
+        return [event for event in events[lo:hi] if event.end > start]
+
+    def _state_fingerprint(self):
+        """Mění se jen s verzí dat."""
+        return self._data_version()
+
+    @property
+    def event(self) -> CalendarEvent | None:
+        """Probíhající, jinak nejbližší příští událost."""
+        events, starts, max_duration = self._calendar()
+        if not events:
+            return None
+        now = dt_util.utcnow()
+        lo = bisect_left(starts, now - max_duration)
+        hi = bisect_right(starts, now)
+        for event in events[lo:hi]:
+            if event.end > now:
+                return event
+        return events[hi] if hi < len(events) else None
+
+    async def async_get_events(self, hass: HomeAssistant, start_date, end_date) -> list[CalendarEvent]:
+        """Události v rozsahu (jen z předpočítaného seznamu, bez přepočtu cen)."""
+        return self._between(dt_util.as_utc(start_date), dt_util.as_utc(end_date))
@@ -1,10 +1,197 @@
 """Config flow pro SK Spot."""
+from datetime import datetime
+
 import voluptuous as vol
 
 from homeassistant import config_entries
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 
-from .const import DOMAIN, CONF_UNIT, UNIT_MWH, UNIT_KWH
+from .const import (
+    DOMAIN,
+    CONF_UNIT,
+    UNIT_MWH,
+    UNIT_KWH,
+    CONF_BLOCK_SIZES,
+    DEFAULT_BLOCK_SIZES,
+    MAX_BLOCK_SIZE,
+    CONF_RANGE_FETCH,
+    DEFAULT_RANGE_FETCH,
+    CONF_PRICE_ATTRIBUTES,
+    DEFAULT_PRICE_ATTRIBUTES,
+    CONF_BASE_URL,
+    DEFAULT_BASE_URL,
+    CONF_METRIC_SENSORS,
+    DEFAULT_METRIC_SENSORS,
+    CONF_CHARGING_PLANS,
+    DEFAULT_CHARGING_PLANS,
+    CONF_RANK_BANDS,
+    DEFAULT_RANK_BANDS,
+    CONF_TARIFF_MARGIN,
+    CONF_TARIFF_DISTRIBUTION_HIGH,
+    CONF_TARIFF_DISTRIBUTION_LOW,
+    CONF_TARIFF_LOW_HOURS,
+    CONF_TARIFF_SYSTEM_CHARGES,
+    CONF_TARIFF_VAT,
+    DEFAULT_TARIFF_COMPONENT,
+    DEFAULT_TARIFF_LOW_HOURS,
+    CONF_FINAL_PRICE,
+    DEFAULT_FINAL_PRICE,
+    CONF_RESOLUTION,
+    DEFAULT_RESOLUTION,
+    RESOLUTIONS,
+    MAX_DAY_BLOCKS,
+    CONF_WINDOW_BLOCKS,
+    DEFAULT_WINDOW_BLOCKS,
+    CONF_BATTERY_CAPACITY,
+    CONF_BATTERY_POWER,
+    CONF_BATTERY_EFFICIENCY,
+    DEFAULT_BATTERY_CAPACITY,
+    DEFAULT_BATTERY_POWER,
+    DEFAULT_BATTERY_EFFICIENCY,
+    MAX_BATTERY_HOURS,
+)
+
+
+def parse_block_sizes(value):
+    """Převeď text "4, 8, 12" na seřazený seznam velikostí bloků."""
+    sizes = set()
+    for part in str(value).replace(";", ",").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            size = int(part)
+        except ValueError as err:
+            raise vol.Invalid(f"Neplatná velikost bloku: {part}") from err
+        if not 1 <= size <= MAX_BLOCK_SIZE:
+            raise vol.Invalid(f"Velikost bloku mimo rozsah 1-{MAX_BLOCK_SIZE}: {size}")
+        sizes.add(size)
+    return sorted(sizes)
+
+
+def parse_window_blocks(value):
+    """Převeď text "8@22:00-06:00, 4@08:00-17:00" na seznam [[počet, "HH:MM", "HH:MM"], ...]."""
+    blocks = []
+    for part in str(value).replace(";", ",").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        size, _, window = part.partition("@")
+        start, _, end = window.partition("-")
+        try:
+            size = int(size)
+            start = datetime.strptime(start.strip(), "%H:%M")
+            end = datetime.strptime(end.strip(), "%H:%M")
+        except ValueError as err:
+            raise vol.Invalid(f"Neplatný blok v okně: {part}") from err
+        if not 1 <= size <= MAX_BLOCK_SIZE:
+            raise vol.Invalid(f"Velikost bloku mimo rozsah 1-{MAX_BLOCK_SIZE}: {size}")
+        block = [size, start.strftime("%H:%M"), end.strftime("%H:%M")]
+        if block not in blocks:
+            blocks.append(block)
+    return blocks
+
+
+def format_window_blocks(blocks):
+    """Seznam bloků v okně zpět na text pro formulář."""
+    return ", ".join(f"{size}@{start}-{end}" for size, start, end in blocks)
+
+
+def parse_charging_plans(value):
+    """Převeď text "16@07:00, 8@18:30" na seznam [[počet slotů, "HH:MM"], ...]."""
+    plans = []
+    for part in str(value).replace(";", ",").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        count, _, deadline = part.partition("@")
+        try:
+            count = int(count)
+            deadline = datetime.strptime(deadline.strip(), "%H:%M")
+        except ValueError as err:
+            raise vol.Invalid(f"Neplatný nabíjecí plán: {part}") from err
+        if not 1 <= count <= MAX_BLOCK_SIZE:
+            raise vol.Invalid(f"Počet slotů mimo rozsah 1-{MAX_BLOCK_SIZE}: {count}")
+        plan = [count, deadline.strftime("%H:%M")]
+        if plan not in plans:
+            plans.append(plan)
+    return plans
+
+
+def format_charging_plans(plans):
+    """Seznam plánů zpět na text pro formulář."""
+    return ", ".join(f"{count}@{deadline}" for count, deadline in plans)
+
+
+def parse_rank_bands(value):
+    """Převeď text "top:5, bottom:10, pct:0-25" na seznam [["top", 5], ["pct", 0, 25], ...]."""
+    bands = []
+    for part in str(value).replace(";", ",").split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        kind, _, limits = part.partition(":")
+        kind = kind.strip()
+        try:
+            if kind == "pct":
+                low, _, high = limits.partition("-")
+                band = [kind, int(low), int(high)]
+                valid = 0 <= band[1] < band[2] <= 100
+            elif kind in ("top", "bottom"):
+                band = [kind, int(limits)]
+                valid = 1 <= band[1] <= MAX_DAY_BLOCKS
+            else:
+                valid = False
+        except ValueError as err:
+            raise vol.Invalid(f"Neplatné pásmo ranku: {part}") from err
+        if not valid:
+            raise vol.Invalid(f"Neplatné pásmo ranku: {part}")
+        if band not in bands:
+            bands.append(band)
+    return bands
+
+
+def format_rank_bands(bands):
+    """Seznam pásem zpět na text pro formulář."""
+    return ", ".join(
+        f"pct:{band[1]}-{band[2]}" if band[0] == "pct" else f"{band[0]}:{band[1]}"
+        for band in bands
+    )
+
+
+def parse_time_ranges(value):
+    """Převeď text "22:00-06:00, 13:00-15:00" na seznam [["HH:MM", "HH:MM"], ...]."""
+    ranges = []
+    for part in str(value).replace(";", ",").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, _, end = part.partition("-")
+        try:
+            start = datetime.strptime(start.strip(), "%H:%M")
+            end = datetime.strptime(end.strip(), "%H:%M")
+        except ValueError as err:
+            raise vol.Invalid(f"Neplatný časový rozsah: {part}") from err
+        time_range = [start.strftime("%H:%M"), end.strftime("%H:%M")]
+        if time_range not in ranges:
+            ranges.append(time_range)
+    return ranges
+
+
+def format_time_ranges(ranges):
+    """Seznam časových rozsahů zpět na text pro formulář."""
+    return ", ".join(f"{start}-{end}" for start, end in ranges)
+
+
+def parse_base_url(value):
+    """Ověř adresu reportu (http/https), prázdná hodnota = OKTE."""
+    url = str(value).strip().rstrip("?")
+    if not url:
+        return DEFAULT_BASE_URL
+    if not url.startswith(("http://", "https://")) or "?" in url:
+        raise vol.Invalid(f"Neplatná adresa: {value}")
+    return url
 
 
 class SKSpotConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -12,6 +199,12 @@ class SKSpotConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Vrať options flow."""
+        return SKSpotOptionsFlow(config_entry)
+
     async def async_step_user(self, user_input=None) -> FlowResult:
         """Handle user step."""
         if user_input is not None:
@@ -25,3 +218,162 @@ class SKSpotConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         })
 
         return self.async_show_form(step_id="user", data_schema=data_schema)
+
+
+class SKSpotOptionsFlow(config_entries.OptionsFlow):
+    """Options flow."""
+
+    def __init__(self, config_entry) -> None:
+        """Init."""
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input=None) -> FlowResult:
+        """Nastavení bloků a stahování."""
+        errors = {}
+
+        if user_input is not None:
+            try:
+                block_sizes = parse_block_sizes(user_input[CONF_BLOCK_SIZES])
+            except vol.Invalid:
+                errors[CONF_BLOCK_SIZES] = "invalid_block_sizes"
+            try:
+                window_blocks = parse_window_blocks(user_input.get(CONF_WINDOW_BLOCKS, ""))
+            except vol.Invalid:
+                errors[CONF_WINDOW_BLOCKS] = "invalid_window_blocks"
+            try:
+                charging_plans = parse_charging_plans(user_input.get(CONF_CHARGING_PLANS, ""))
+            except vol.Invalid:
+                errors[CONF_CHARGING_PLANS] = "invalid_charging_plans"
+            try:
+                rank_bands = parse_rank_bands(user_input.get(CONF_RANK_BANDS, ""))
+            except vol.Invalid:
+                errors[CONF_RANK_BANDS] = "invalid_rank_bands"
+            try:
+                low_hours = parse_time_ranges(user_input.get(CONF_TARIFF_LOW_HOURS, ""))
+            except vol.Invalid:
+                errors[CONF_TARIFF_LOW_HOURS] = "invalid_low_hours"
+            try:
+                base_url = parse_base_url(user_input[CONF_BASE_URL])
+            except vol.Invalid:
+                errors[CONF_BASE_URL] = "invalid_base_url"
+            if (
+                user_input[CONF_BATTERY_CAPACITY]
+                > user_input[CONF_BATTERY_POWER] * MAX_BATTERY_HOURS
+            ):
+                errors[CONF_BATTERY_CAPACITY] = "invalid_battery_ratio"
+            if not errors:
+                return self.async_create_entry(
+                    title="",
+                    data={
+                        **self._entry.options,
+                        CONF_BLOCK_SIZES: block_sizes,
+                        CONF_WINDOW_BLOCKS: window_blocks,
+                        CONF_CHARGING_PLANS: charging_plans,
+                        CONF_RANK_BANDS: rank_bands,
+                        CONF_BATTERY_CAPACITY: user_input[CONF_BATTERY_CAPACITY],
+                        CONF_BATTERY_POWER: user_input[CONF_BATTERY_POWER],
+                        CONF_BATTERY_EFFICIENCY: user_input[CONF_BATTERY_EFFICIENCY],
+                        CONF_TARIFF_MARGIN: user_input[CONF_TARIFF_MARGIN],
+                        CONF_TARIFF_DISTRIBUTION_HIGH: user_input[CONF_TARIFF_DISTRIBUTION_HIGH],
+                        CONF_TARIFF_DISTRIBUTION_LOW: user_input[CONF_TARIFF_DISTRIBUTION_LOW],
+                        CONF_TARIFF_LOW_HOURS: low_hours,
+                        CONF_TARIFF_SYSTEM_CHARGES: user_input[CONF_TARIFF_SYSTEM_CHARGES],
+                        CONF_TARIFF_VAT: user_input[CONF_TARIFF_VAT],
+                        CONF_FINAL_PRICE: user_input[CONF_FINAL_PRICE],
+                        CONF_RESOLUTION: user_input[CONF_RESOLUTION],
+                        CONF_RANGE_FETCH: user_input[CONF_RANGE_FETCH],
+                        CONF_PRICE_ATTRIBUTES: user_input[CONF_PRICE_ATTRIBUTES],
+                        CONF_BASE_URL: base_url,
+                        CONF_METRIC_SENSORS: user_input[CONF_METRIC_SENSORS],
+                    },
+                )
+
+        block_sizes = self._entry.options.get(CONF_BLOCK_SIZES, DEFAULT_BLOCK_SIZES)
+        data_schema = vol.Schema({
+            vol.Required(
+                CONF_BLOCK_SIZES,
+                default=", ".join(str(size) for size in block_sizes),
+            ): str,
+            vol.Optional(
+                CONF_WINDOW_BLOCKS,
+                default=format_window_blocks(
+                    self._entry.options.get(CONF_WINDOW_BLOCKS, DEFAULT_WINDOW_BLOCKS)
+                ),
+            ): str,
+            vol.Optional(
+                CONF_CHARGING_PLANS,
+                default=format_charging_plans(
+                    self._entry.options.get(CONF_CHARGING_PLANS, DEFAULT_CHARGING_PLANS)
+                ),
+            ): str,
+            vol.Optional(
+                CONF_RANK_BANDS,
+                default=format_rank_bands(
+                    self._entry.options.get(CONF_RANK_BANDS, DEFAULT_RANK_BANDS)
+                ),
+            ): str,
+            vol.Required(
+                CONF_BATTERY_CAPACITY,
+                default=self._entry.options.get(CONF_BATTERY_CAPACITY, DEFAULT_BATTERY_CAPACITY),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=1000)),
+            vol.Required(
+                CONF_BATTERY_POWER,
+                default=self._entry.options.get(CONF_BATTERY_POWER, DEFAULT_BATTERY_POWER),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0.1, max=1000)),
+            vol.Required(
+                CONF_BATTERY_EFFICIENCY,
+                default=self._entry.options.get(CONF_BATTERY_EFFICIENCY, DEFAULT_BATTERY_EFFICIENCY),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=100)),
+            vol.Required(
+                CONF_TARIFF_MARGIN,
+                default=self._entry.options.get(CONF_TARIFF_MARGIN, DEFAULT_TARIFF_COMPONENT),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=10000)),
+            vol.Required(
+                CONF_TARIFF_DISTRIBUTION_HIGH,
+                default=self._entry.options.get(CONF_TARIFF_DISTRIBUTION_HIGH, DEFAULT_TARIFF_COMPONENT),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=10000)),
+            vol.Required(
+                CONF_TARIFF_DISTRIBUTION_LOW,
+                default=self._entry.options.get(CONF_TARIFF_DISTRIBUTION_LOW, DEFAULT_TARIFF_COMPONENT),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=10000)),
+            vol.Optional(
+                CONF_TARIFF_LOW_HOURS,
+                default=format_time_ranges(
+                    self._entry.options.get(CONF_TARIFF_LOW_HOURS, DEFAULT_TARIFF_LOW_HOURS)
+                ),
+            ): str,
+            vol.Required(
+                CONF_TARIFF_SYSTEM_CHARGES,
+                default=self._entry.options.get(CONF_TARIFF_SYSTEM_CHARGES, DEFAULT_TARIFF_COMPONENT),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=10000)),
+            vol.Required(
+                CONF_TARIFF_VAT,
+                default=self._entry.options.get(CONF_TARIFF_VAT, DEFAULT_TARIFF_COMPONENT),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=100)),
+            vol.Required(
+                CONF_FINAL_PRICE,
+                default=self._entry.options.get(CONF_FINAL_PRICE, DEFAULT_FINAL_PRICE),
+            ): bool,
+            vol.Required(
+                CONF_RESOLUTION,
+                default=self._entry.options.get(CONF_RESOLUTION, DEFAULT_RESOLUTION),
+            ): vol.In({minutes: f"{minutes} min" for minutes in RESOLUTIONS}),
+            vol.Required(
+                CONF_RANGE_FETCH,
+                default=self._entry.options.get(CONF_RANGE_FETCH, DEFAULT_RANGE_FETCH),
+            ): bool,
+            vol.Required(
+                CONF_PRICE_ATTRIBUTES,
+                default=self._entry.options.get(CONF_PRICE_ATTRIBUTES, DEFAULT_PRICE_ATTRIBUTES),
+            ): bool,
+            vol.Required(
+                CONF_BASE_URL,
+                default=self._entry.options.get(CONF_BASE_URL, DEFAULT_BASE_URL),
+            ): str,
+            vol.Required(
+                CONF_METRIC_SENSORS,
+                default=self._entry.options.get(CONF_METRIC_SENSORS, DEFAULT_METRIC_SENSORS),
+            ): bool,
+        })
+
+        return self.async_show_form(step_id="init", data_schema=data_schema, errors=errors)
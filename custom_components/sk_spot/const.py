@@ -1,6 +1,84 @@
 """Konstanty pro SK Spot."""
 DOMAIN = "sk_spot"
 
+# Sdílený coordinator všech config entries v hass.data[DOMAIN]
+DATA_COORDINATOR = "coordinator"
+DATA_ENTRIES = "entries"
+DATA_LOCK = "lock"
+
 CONF_UNIT = "unit"
 UNIT_MWH = "mwh"
 UNIT_KWH = "kwh"
+
+CONF_BLOCK_SIZES = "block_sizes"
+# Výchozí bloky nejlevnějších oken: 1 hodina a 2 hodiny
+DEFAULT_BLOCK_SIZES = [4, 8]
+# Nejdelší okno = dnes + zítra (2 * 96 čtvrthodin)
+MAX_BLOCK_SIZE = 192
+
+# Bloky v časovém okně "N@HH:MM-HH:MM" (okno může přecházet přes půlnoc)
+CONF_WINDOW_BLOCKS = "window_blocks"
+DEFAULT_WINDOW_BLOCKS = []
+
+# Nabíjecí plány "K@HH:MM": K nejlevnějších 15min slotů (ne nutně sousedních) do termínu
+CONF_CHARGING_PLANS = "charging_plans"
+DEFAULT_CHARGING_PLANS = []
+
+# Pásma ranku "top:N", "bottom:N", "pct:OD-DO" (výchozí = dřívější pevné sensory top/bottom 5 a 10)
+CONF_RANK_BANDS = "rank_bands"
+DEFAULT_RANK_BANDS = [["top", 5], ["top", 10], ["bottom", 5], ["bottom", 10]]
+# Nejvíc bloků za den (den přechodu na zimní čas)
+MAX_DAY_BLOCKS = 100
+
+# Diagnostické sensory s metrikami stahování
+CONF_METRIC_SENSORS = "metric_sensors"
+DEFAULT_METRIC_SENSORS = False
+
+# Baterie pro optimalizaci arbitráže (kapacita 0 = vypnuto)
+CONF_BATTERY_CAPACITY = "battery_capacity"
+CONF_BATTERY_POWER = "battery_power"
+CONF_BATTERY_EFFICIENCY = "battery_efficiency"
+DEFAULT_BATTERY_CAPACITY = 0.0
+DEFAULT_BATTERY_POWER = 5.0
+# Účinnost nabití i vybití dohromady v %
+DEFAULT_BATTERY_EFFICIENCY = 90
+# Nejdelší doba plného nabití (kapacita / výkon v hodinách) - plán pak má nejvýš
+# 200 úrovní SoC i s jedním krokem za 15min slot
+MAX_BATTERY_HOURS = 50
+
+# Koncová cena: marže, distribuce (vysoké/nízké pásmo), systémové poplatky v EUR/MWh a DPH v %
+CONF_TARIFF_MARGIN = "tariff_margin"
+CONF_TARIFF_DISTRIBUTION_HIGH = "tariff_distribution_high"
+CONF_TARIFF_DISTRIBUTION_LOW = "tariff_distribution_low"
+# Hodiny nízkého tarifu distributora "HH:MM-HH:MM, ..."
+CONF_TARIFF_LOW_HOURS = "tariff_low_hours"
+CONF_TARIFF_SYSTEM_CHARGES = "tariff_system_charges"
+CONF_TARIFF_VAT = "tariff_vat"
+DEFAULT_TARIFF_COMPONENT = 0.0
+DEFAULT_TARIFF_LOW_HOURS = []
+# Sensory, ranky a bloky počítat z koncové ceny místo spotové
+CONF_FINAL_PRICE = "final_price"
+DEFAULT_FINAL_PRICE = False
+
+# Rozlišení cen pro entity v minutách (průměr po sobě jdoucích 15min slotů);
+# 30 a 60 dělí i dny přechodu času (92/100 slotů)
+CONF_RESOLUTION = "resolution"
+DEFAULT_RESOLUTION = 15
+RESOLUTIONS = (15, 30, 60)
+# Rozlišení hodinového sensoru
+HOURLY_RESOLUTION = 60
+
+# Stahovat dnes+zítra jedním requestem
+CONF_RANGE_FETCH = "range_fetch"
+DEFAULT_RANGE_FETCH = True
+
+# Klouzavé statistiky z archivu cen (počty dnů)
+ROLLING_STATS_DAYS = (7, 30, 365)
+
+# Časové řady cen a rankingů v atributech (do recorderu se neukládají)
+CONF_PRICE_ATTRIBUTES = "price_attributes"
+DEFAULT_PRICE_ATTRIBUTES = True
+
+# Adresa reportu OKTE (lze přesměrovat např. na lokální mock server)
+CONF_BASE_URL = "base_url"
+DEFAULT_BASE_URL = "https://isot.okte.sk/api/v1/dam/report/detailed"
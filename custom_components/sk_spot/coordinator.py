@@ -1,51 +1,249 @@
 """SK Spot coordinator."""
-from datetime import datetime, timedelta, time
-from random import randint
+from collections import deque
+from datetime import time, timedelta
 import logging
-import io
+from time import perf_counter
+import asyncio
 
-from openpyxl import load_workbook
 import aiohttp
+from aiohttp import hdrs
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import event
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
 )
 from homeassistant.util import dt as dt_util
 
+from .analytics import build_price_analytics
+from .archive import PriceArchive
+from .forecast import forecast_days, history_range
+from .const import DEFAULT_BASE_URL, DOMAIN, HOURLY_RESOLUTION, ROLLING_STATS_DAYS
+from .parser import parse_range_prices
+from .scheduler import PublicationScheduler
+from .timeline import DEFAULT_SLOTS, build_day_timeline, slot_count
+
 _LOGGER = logging.getLogger(__name__)
 
-# Čas, kdy by data měla být publikována (13:05 slovenského času)
-DATA_AVAILABLE_TIME = time(13, 5)
-# Náhodné zpoždění (0-120 sekund) pro prevenci synchronizace všech uživatelů
-JITTER_SECONDS = 120
+# Lokální cache stažených cen (klíč = den dodávky)
+STORAGE_KEY = f"{DOMAIN}_prices"
+STORAGE_VERSION = 1
+# Naučený čas zveřejnění zítřejších cen
+SCHEDULER_STORAGE_KEY = f"{DOMAIN}_scheduler"
+SCHEDULER_SAVE_DELAY = 10
+
+OKTE_TZ = "Europe/Bratislava"
+
+# Počet posledních stažení v diagnostice
+FETCH_HISTORY_SIZE = 20
+
+
+class ServerError(UpdateFailed):
+    """Chyba na straně serveru (5xx, timeout, spojení) - počítá se do circuit breakeru."""
 
 
 class SKSpotCoordinator(DataUpdateCoordinator):
     """Coordinator pro stahování dat."""
 
-    def __init__(self, hass: HomeAssistant) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        range_fetch: bool = True,
+        base_url: str = DEFAULT_BASE_URL,
+    ) -> None:
         """Init."""
         super().__init__(
             hass,
             _LOGGER,
+            # Coordinator sdílí všechny entries, nepatří žádné z nich
+            config_entry=None,
             name="SK Spot",
         )
         self._update_schedule = None  # Handle pro naplánovanou aktualizaci
+        self._quarter_hour_tick = None  # Handle pro čtvrthodinový tick
         self._last_download_date = None
         self._today_prices = {}
         self._tomorrow_prices = {}
         self._tomorrow_available = False
+        self._data_version = 0
+        self._analytics = None
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        # Append-only archiv všech stažených dnů
+        self._archive = PriceArchive(hass.config.path(".storage", f"{DOMAIN}_archive.bin"))
+        self._rolling_stats = {}
+        self._rolling_stats_key = None
+        # Odhad ještě nezveřejněných dnů z archivu {den: ForecastDay}
+        self._forecast = {}
+        self._forecast_key = None
+        # Časové osy slotů podle dne dodávky
+        self._timelines = {}
+        # Stahovat více dnů jedním requestem (deliverydayfrom/deliverydayto)
+        self._range_fetch = range_fetch
+        # Endpoint reportu (OKTE nebo lokální mock server)
+        self._base_url = base_url
+        # ETag/Last-Modified a naparsované ceny posledních odpovědí podle rozsahu dnů
+        self._http_cache = {}
+        # Naučený čas zveřejnění, backoff a circuit breaker
+        self._scheduler = PublicationScheduler()
+        self._scheduler_store = Store(hass, STORAGE_VERSION, SCHEDULER_STORAGE_KEY)
+        # Metriky stahování a výpočtu entit pro diagnostiku
+        self._fetch_history = deque(maxlen=FETCH_HISTORY_SIZE)
+        self._fetch_counts = {"fetches": 0, "failures": 0, "not_modified": 0}
+        self._last_success = None
+        self._next_update = None
+        self._entity_timings = {}
+
+    def configure(self, range_fetch: bool, base_url: str) -> None:
+        """Nastavení stahování (sdílené všemi entries, platí poslední nastavené)."""
+        if base_url != self._base_url:
+            self._http_cache.clear()
+        self._range_fetch = range_fetch
+        self._base_url = base_url
+
+    @property
+    def archive(self) -> PriceArchive:
+        """Archiv historických cen."""
+        return self._archive
+
+    @property
+    def fetch_metrics(self) -> dict:
+        """Souhrn metrik stahování (poslední stažení, pokusy, plán)."""
+        breaker_until = self._scheduler.breaker_until
+        return {
+            "last_fetch": self._fetch_history[-1] if self._fetch_history else None,
+            "last_success": self._last_success,
+            "next_update": self._next_update,
+            "retries": self._scheduler.attempts,
+            "publication_estimate": self._scheduler.publication_time.isoformat(),
+            "breaker_open_until": breaker_until.isoformat() if breaker_until else None,
+            **self._fetch_counts,
+        }
+
+    @property
+    def fetch_history(self) -> list:
+        """Záznamy posledních stažení."""
+        return list(self._fetch_history)
+
+    @property
+    def entity_timings(self) -> dict:
+        """Časy výpočtu stavu entit podle unique_id."""
+        return self._entity_timings
+
+    def record_entity_timing(self, unique_id, seconds, written) -> None:
+        """Zaznamenej čas zpracování aktualizace entity (otisk + případný zápis stavu)."""
+        timing = self._entity_timings.get(unique_id)
+        if timing is None:
+            timing = self._entity_timings[unique_id] = {
+                "updates": 0, "writes": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0,
+            }
+        elapsed_ms = seconds * 1000
+        timing["updates"] += 1
+        timing["writes"] += written
+        timing["total_ms"] += elapsed_ms
+        timing["last_ms"] = elapsed_ms
+        timing["max_ms"] = max(timing["max_ms"], elapsed_ms)
+
+    async def async_load_cache(self) -> bool:
+        """Obnov ceny z lokální cache. Vrať True pokud máme validní dnešní data."""
+        await self.hass.async_add_executor_job(self._archive.load)
+        self._scheduler = PublicationScheduler.from_dict(await self._scheduler_store.async_load())
+
+        stored = await self._store.async_load()
+        if not stored:
+            return False
+
+        days = stored.get("days", {})
+        today = dt_util.now().date()
+        tomorrow = today + timedelta(days=1)
+
+        # JSON ukládá klíče jako řetězce, indexy převedeme zpět na int
+        today_prices = {int(idx): price for idx, price in days.get(today.isoformat(), {}).items()}
+        tomorrow_prices = {int(idx): price for idx, price in days.get(tomorrow.isoformat(), {}).items()}
+
+        if not self._validate_price_data(today_prices, today):
+            _LOGGER.debug("Cache neobsahuje validní ceny pro %s", today)
+            return False
+
+        self._today_prices = today_prices
+        self._last_download_date = today
+        if self._validate_price_data(tomorrow_prices, tomorrow):
+            self._tomorrow_prices = tomorrow_prices
+            self._tomorrow_available = True
+        self._analytics = None
+
+        # Dny z cache, které ještě nejsou v archivu (např. po upgradu)
+        await self.hass.async_add_executor_job(
+            self._archive_days,
+            {day: prices for day, prices in ((today, today_prices), (tomorrow, self._tomorrow_prices))
+             if prices and day not in self._archive},
+        )
+
+        _LOGGER.info("Ceny obnoveny z cache: dnes %d, zítra %d záznamů",
+                     len(self._today_prices), len(self._tomorrow_prices))
+        return True
+
+    async def _async_save_cache(self, today):
+        """Ulož stažené ceny do lokální cache (starší dny se zahodí) a do archivu."""
+        days = {}
+        if self._validate_price_data(self._today_prices, today):
+            days[today] = self._today_prices
+        if self.has_tomorrow_data():
+            days[today + timedelta(days=1)] = self._tomorrow_prices
+        await self._store.async_save(
+            {"days": {day.isoformat(): prices for day, prices in days.items()}}
+        )
+        await self.hass.async_add_executor_job(self._archive_days, days)
+
+    def _archive_days(self, days):
+        """Připiš dny do archivu (běží v executoru)."""
+        for day, prices in days.items():
+            if self._archive.append_day(day, prices):
+                _LOGGER.debug("Archivováno %d cen pro %s", len(prices), day)
+
+    async def _async_update_rolling_stats(self, today):
+        """Přepočítej klouzavé statistiky jen při změně archivu nebo dne."""
+        key = (self._archive.generation, len(self._archive), today)
+        if key == self._rolling_stats_key:
+            return
+        self._rolling_stats = await self.hass.async_add_executor_job(
+            self._compute_rolling_stats, today
+        )
+        self._rolling_stats_key = key
 
-    def _validate_price_data(self, prices):
-        """Zkontroluj zda jsou data validní (máme všech 96 záznamů pro celý den)."""
+    def _compute_rolling_stats(self, today):
+        """Statistiky za posledních N dnů z archivu (běží v executoru)."""
+        return {days: self._archive.rolling_stats(today, days) for days in ROLLING_STATS_DAYS}
+
+    async def _async_update_forecast(self, today):
+        """Přepočítej odhad nezveřejněných dnů (zítřek bez cen, pozítří) při změně archivu."""
+        targets = tuple(
+            day for day in (today + timedelta(days=1), today + timedelta(days=2))
+            if day != today + timedelta(days=1) or not self.has_tomorrow_data()
+        )
+        key = (self._archive.generation, len(self._archive), targets)
+        if key == self._forecast_key:
+            return
+        timelines = {day: self.get_timeline(day) for day in targets}
+        self._forecast = await self.hass.async_add_executor_job(
+            self._compute_forecast, today, targets, timelines
+        )
+        self._forecast_key = key
+
+    def _compute_forecast(self, today, targets, timelines):
+        """Odhad cen z historie v archivu (běží v executoru)."""
+        return forecast_days(self._archive.get_range(*history_range(today)), targets, timelines)
+
+    def _validate_price_data(self, prices, day=None):
+        """Zkontroluj zda jsou data validní (máme záznamy pro celý den)."""
         if not prices:
             return False
-        # Měli bychom mít 96 záznamů (24 hodin * 4 čtvrthodiny)
-        # Kontrola, že máme alespoň 90 záznamů (95% úplnosti)
-        if len(prices) < 90:
+        # Běžný den má 96 záznamů, dny přechodu času 92 nebo 100
+        expected = slot_count(day) if day is not None else DEFAULT_SLOTS
+        # Tolerujeme nejvýše 6 chybějících záznamů a žádný index mimo den
+        if len(prices) < expected - 6 or max(prices) >= expected:
             return False
         return True
 
@@ -53,50 +251,89 @@ class SKSpotCoordinator(DataUpdateCoordinator):
         """Zkontroluj, zda máme data pro zítřek."""
         if not self._tomorrow_prices:
             return False
-        # Ověř, že máme validní data (alespoň 90 záznamů)
-        return self._validate_price_data(self._tomorrow_prices)
+        # Ověř, že máme validní data pro celý zítřejší den
+        return self._validate_price_data(self._tomorrow_prices, self._today_date() + timedelta(days=1))
+
+    def _today_date(self):
+        """Den dodávky, ke kterému patří dnešní ceny v paměti."""
+        return self._last_download_date or dt_util.now().date()
+
+    def get_timeline(self, day):
+        """Časová osa slotů dne (cache podle dne)."""
+        timeline = self._timelines.get(day)
+        if timeline is None:
+            if len(self._timelines) > 8:
+                self._timelines.clear()
+            timeline = build_day_timeline(day, dt_util.DEFAULT_TIME_ZONE)
+            self._timelines[day] = timeline
+        return timeline
+
+    def cancel_scheduled_update(self):
+        """Zruš naplánovanou aktualizaci (čtvrthodinový tick běží dál)."""
+        if self._update_schedule is not None:
+            self._update_schedule()
+            self._update_schedule = None
+
+    def cancel_quarter_hour_tick(self):
+        """Zruš čtvrthodinový tick (jen při zastavení coordinatoru)."""
+        if self._quarter_hour_tick is not None:
+            self._quarter_hour_tick()
+            self._quarter_hour_tick = None
+
+    async def async_shutdown(self) -> None:
+        """Zastav coordinator (po unloadu poslední entry)."""
+        self.cancel_scheduled_update()
+        self.cancel_quarter_hour_tick()
+        await super().async_shutdown()
+
+    def start_quarter_hour_tick(self):
+        """Každých 15 minut posuň aktuální slot z dat v paměti."""
+        if self._quarter_hour_tick is None:
+            self._quarter_hour_tick = event.async_track_time_change(
+                self.hass, self._on_quarter_hour, minute=(0, 15, 30, 45), second=0
+            )
+
+    @callback
+    def _on_quarter_hour(self, now):
+        """Tick na hranici 15min intervalu - bez stahování a plné aktualizace."""
+        if self.data is None:
+            return
+
+        if self._last_download_date is not None and self._last_download_date < now.date():
+            # Po půlnoci posune zítřejší ceny na dnešní plná aktualizace
+            # (stahuje jen pokud dnešní ceny chybí)
+            self.hass.async_create_task(self.async_request_refresh())
+            return
+
+        self.data = self.build_data()
+        self.async_update_listeners()
 
     def schedule_next_update(self):
         """Naplánuj další aktualizaci dat."""
-        from zoneinfo import ZoneInfo
-
         # Zruš předchozí naplánovanou aktualizaci, pokud existuje
-        if self._update_schedule is not None:
-            self._update_schedule()
-            self._update_schedule = None
+        self.cancel_scheduled_update()
 
-        utc = ZoneInfo("UTC")
-        bratislava_tz = ZoneInfo("Europe/Bratislava")
-        now_bratislava = dt_util.now(bratislava_tz)
+        now_bratislava = dt_util.now(dt_util.get_time_zone(OKTE_TZ))
+        have_tomorrow = self.has_tomorrow_data()
+        local_target = self._scheduler.next_update(now_bratislava, have_tomorrow)
 
-        if self.has_tomorrow_data():
-            # Už máme data pro zítřek, další update bude zítra po 13:05
-            local_target = datetime.combine(
-                (now_bratislava + timedelta(days=1)).date(),
-                DATA_AVAILABLE_TIME,
-                tzinfo=bratislava_tz,
-            )
-            local_target += timedelta(seconds=randint(1, JITTER_SECONDS))
+        if self._scheduler.breaker_open(now_bratislava):
+            _LOGGER.warning("Opakované chyby serveru, stahování pozastaveno do %s", local_target)
+        elif have_tomorrow:
             _LOGGER.info("Máme zítřejší data, další update: %s", local_target)
+        elif local_target.date() == now_bratislava.date() and self._scheduler.attempts:
+            _LOGGER.info("Nemáme zítřejší data, pokus %d, další za %s: %s",
+                         self._scheduler.attempts + 1, local_target - now_bratislava, local_target)
         else:
-            # Nemáme data pro zítřek
-            if DATA_AVAILABLE_TIME < now_bratislava.time():
-                # Čas 13:05 už uplynul dnes, ale nemáme zítřejší data
-                # Zkusíme to znovu za 5 minut
-                local_target = now_bratislava + timedelta(minutes=5)
-                _LOGGER.info("Nemáme zítřejší data, další pokus za 5 minut: %s", local_target)
-            else:
-                # Ještě není 13:05 dnes, naplánuj update na 13:05
-                local_target = datetime.combine(
-                    now_bratislava.date(),
-                    DATA_AVAILABLE_TIME,
-                    tzinfo=bratislava_tz,
-                )
-                local_target += timedelta(seconds=randint(1, JITTER_SECONDS))
-                _LOGGER.info("Další update dnes ve: %s", local_target)
+            _LOGGER.info("Další update ve: %s (odhad zveřejnění %s)",
+                         local_target, self._scheduler.publication_time)
 
         # Převeď na UTC (správně ošetří letní čas)
-        utc_time = local_target.astimezone(utc)
+        utc_time = dt_util.as_utc(local_target)
+        self._next_update = utc_time.isoformat()
+        if self.data is not None:
+            # Metrické sensory ukazují čas dalšího stažení
+            self.async_update_listeners()
 
         # Naplánuj aktualizaci
         self._update_schedule = event.async_track_point_in_utc_time(
@@ -114,8 +351,12 @@ class SKSpotCoordinator(DataUpdateCoordinator):
         # Naplánuj další update
         self.schedule_next_update()
 
+    def _tomorrow_expected(self) -> bool:
+        """Zítřejší data se zveřejňují až po (naučeném) čase zveřejnění."""
+        return self._scheduler.publication_expected(dt_util.now(dt_util.get_time_zone(OKTE_TZ)))
+
     async def _async_update_data(self):
-        """Stáhni data."""
+        """Stáhni chybějící data."""
         now = dt_util.now()
         today = now.date()
 
@@ -135,114 +376,292 @@ class SKSpotCoordinator(DataUpdateCoordinator):
             self._tomorrow_available = False
             # Nastav, že jsme ještě dnes nestahovali
             self._last_download_date = None
-
-        # Pokud ještě dnes nestahovali, stáhni data
-        should_download = (self._last_download_date != today)
-
-        if should_download:
+            self._analytics = None
+
+        # Stahuj jen dny, které nemáme v paměti ani v cache
+        missing_today = not self._validate_price_data(self._today_prices, today)
+        missing_tomorrow = not self.has_tomorrow_data() and self._tomorrow_expected()
+
+        if (missing_today or missing_tomorrow) and self._scheduler.breaker_open(
+            dt_util.now(dt_util.get_time_zone(OKTE_TZ))
+        ):
+            # Server opakovaně selhává, nezatěžujeme ho dalšími requesty
+            _LOGGER.debug("Circuit breaker otevřený do %s, stahování přeskočeno",
+                          self._scheduler.breaker_until)
+            if missing_today:
+                raise UpdateFailed("Server OKTE opakovaně selhává, stahování pozastaveno")
+        elif missing_today or missing_tomorrow:
             try:
                 await self._fetch_prices(today)
-                self._last_download_date = today
                 _LOGGER.info("Staženo nových cen pro dnes (%d) a zítra (%s)",
                            len(self._today_prices),
                            f"{len(self._tomorrow_prices)} - dostupné" if self.has_tomorrow_data() else "nedostupné")
             except Exception as err:
                 _LOGGER.error("Chyba při stahování: %s", err)
                 # Pokud nemáme vůbec žádná data, vyvolej chybu
-                if not self._validate_price_data(self._today_prices):
+                if not self._validate_price_data(self._today_prices, today):
                     raise UpdateFailed(f"Chyba: {err}") from err
                 # Jinak pokračuj se starými daty
                 _LOGGER.warning("Používám stará data")
 
-        # Určení aktuální ceny podle 15minutového intervalu
-        current_hour = now.hour
-        current_minute = now.minute
-        # Vypočítat index 15minutového intervalu (0-95)
-        quarter_index = (current_hour * 4) + (current_minute // 15)
+        if self._validate_price_data(self._today_prices, today):
+            self._last_download_date = today
+
+        await self._async_update_rolling_stats(today)
+        await self._async_update_forecast(today)
 
-        # Pokud je dnes a máme data
-        if self._today_prices:
-            current_price = self._today_prices.get(quarter_index)
+        return self.build_data()
+
+    def build_data(self):
+        """Sestav data pro entity z cen v paměti."""
+        now = dt_util.now()
+        tomorrow_available = self.has_tomorrow_data()
+        tomorrow_prices = self._tomorrow_prices if tomorrow_available else {}
+        analytics = self._get_analytics(tomorrow_prices)
+
+        # Index aktuálního 15min intervalu podle časové osy dne (92/96/100 slotů)
+        timeline_index = analytics.index_at(dt_util.as_utc(now))
+        if timeline_index is not None and timeline_index < analytics.tomorrow_offset:
+            quarter_index = timeline_index
+        else:
+            quarter_index = None
+
+        # Cena aktuálního slotu (po půlnoci před posunem dat už ze zítřejších cen)
+        if timeline_index is not None:
+            current_price = analytics.timeline.get(timeline_index)
         else:
             current_price = 0
 
         return {
             "current_price": current_price if current_price is not None else 0,
+            "current_index": quarter_index,
+            # Index ve sloučené ose dnes+zítra (i po půlnoci před posunem dat)
+            "timeline_index": timeline_index,
             "today_prices": self._today_prices,
-            "tomorrow_prices": self._tomorrow_prices if self.has_tomorrow_data() else {},
-            "tomorrow_available": self.has_tomorrow_data(),
+            "tomorrow_prices": tomorrow_prices,
+            "tomorrow_available": tomorrow_available,
+            # Zítřejší ceny se v atributech ukazují až po zveřejnění (13:00)
+            "tomorrow_published": tomorrow_available and now.time() >= time(13, 0),
             "last_update": now.isoformat(),
+            "analytics": analytics,
+            "rolling_stats": self._rolling_stats,
+            "forecast": self._forecast,
         }
 
+    def _get_analytics(self, tomorrow_prices):
+        """Vrať snapshot analýz, nový se staví jen při změně dat."""
+        if self._analytics is None:
+            today = self._today_date()
+            self._data_version += 1
+            self._analytics = build_price_analytics(
+                self._data_version,
+                self._today_prices,
+                tomorrow_prices,
+                self.get_timeline(today),
+                self.get_timeline(today + timedelta(days=1)),
+            )
+            # Hodinová agregace se staví hned se snapshotem (sdílí ji hodinový sensor i entity)
+            self._analytics.with_resolution(HOURLY_RESOLUTION)
+            _LOGGER.debug("Postaven snapshot analýz verze %d", self._data_version)
+        return self._analytics
+
     async def _fetch_prices(self, today):
-        """Stáhni a parsuj XLSX pro dnes a zítra."""
+        """Stáhni a parsuj XLSX pro dny, které ještě nemáme."""
         tomorrow = today + timedelta(days=1)
 
-        # Stáhnout dnešní ceny
-        try:
-            self._today_prices = await self._fetch_day_prices(today)
+        # Validátory starších dnů už nebudeme potřebovat
+        for date_range in [r for r in self._http_cache if r[1] < today]:
+            del self._http_cache[date_range]
+
+        fetch_today = not self._validate_price_data(self._today_prices, today)
+        fetch_tomorrow = not self.has_tomorrow_data() and self._tomorrow_expected()
+
+        now_bratislava = dt_util.now(dt_util.get_time_zone(OKTE_TZ))
+        if fetch_tomorrow:
+            self._scheduler.record_attempt(now_bratislava)
+
+        if fetch_today and fetch_tomorrow and self._range_fetch:
+            # Oba dny jedním requestem
+            try:
+                results = await self.async_fetch_range(today, tomorrow)
+            except Exception as err:
+                today_result = tomorrow_result = err
+            else:
+                today_result = results.get(today) or UpdateFailed(f"Žádná data pro {today}")
+                tomorrow_result = results.get(tomorrow) or UpdateFailed(f"Žádná data pro {tomorrow}")
+        else:
+            async def _skip():
+                return None
+
+            # Chybějící dny souběžně
+            today_result, tomorrow_result = await asyncio.gather(
+                self._fetch_day_prices(today) if fetch_today else _skip(),
+                self._fetch_day_prices(tomorrow) if fetch_tomorrow else _skip(),
+                return_exceptions=True,
+            )
+
+        self._record_fetch_outcome(
+            now_bratislava,
+            [result for result, fetched in ((today_result, fetch_today), (tomorrow_result, fetch_tomorrow))
+             if fetched],
+            tomorrow_result if fetch_tomorrow else None,
+            tomorrow,
+        )
+
+        # Zítřejší ceny
+        if fetch_tomorrow:
+            if isinstance(tomorrow_result, Exception):
+                _LOGGER.info("Zítřejší ceny ještě nejsou dostupné: %s", tomorrow_result)
+                self._tomorrow_prices = {}
+                self._tomorrow_available = False
+            else:
+                self._tomorrow_prices = tomorrow_result
+                self._tomorrow_available = True
+                _LOGGER.info("Zítřejší ceny úspěšně staženy: %d záznamů", len(self._tomorrow_prices))
+            # Snapshot se zahazuje až po přiřazení - tick během stahování by jinak
+            # uložil snapshot se starými cenami
+            self._analytics = None
+
+        # Dnešní ceny
+        if fetch_today:
+            if isinstance(today_result, Exception):
+                _LOGGER.warning("Nelze stáhnout dnešní ceny: %s", today_result)
+                self._today_prices = {}
+                self._analytics = None
+                raise today_result  # Propaguj chybu pokud ani dnes nejde stáhnout
+            self._today_prices = today_result
+            self._analytics = None
             _LOGGER.info("Dnešní ceny úspěšně staženy: %d záznamů", len(self._today_prices))
-        except Exception as err:
-            _LOGGER.warning("Nelze stáhnout dnešní ceny: %s", err)
-            self._today_prices = {}
-            raise  # Propaguj chybu pokud ani dnes nejde stáhnout
 
-        # Stáhnout zítřejší ceny
-        try:
-            self._tomorrow_prices = await self._fetch_day_prices(tomorrow)
-            self._tomorrow_available = True
-            _LOGGER.info("Zítřejší ceny úspěšně staženy: %d záznamů", len(self._tomorrow_prices))
-        except Exception as err:
-            _LOGGER.info("Zítřejší ceny ještě nejsou dostupné: %s", err)
-            self._tomorrow_prices = {}
-            self._tomorrow_available = False
+        await self._async_save_cache(today)
+
+    def _record_fetch_outcome(self, now, results, tomorrow_result, tomorrow):
+        """Předej výsledek stahování scheduleru a ulož naučený čas zveřejnění."""
+        if any(isinstance(result, ServerError) for result in results):
+            self._scheduler.record_server_error(now)
+        elif tomorrow_result is None:
+            self._scheduler.record_success()
+        elif isinstance(tomorrow_result, Exception) or not self._validate_price_data(
+            tomorrow_result, tomorrow
+        ):
+            # Neúplný den (report se teprve plní) se za zveřejnění nepočítá
+            self._scheduler.record_not_published(now)
+        else:
+            self._scheduler.record_published(now)
+            _LOGGER.debug("Odhad času zveřejnění: %s (%d pozorování)",
+                          self._scheduler.publication_time, self._scheduler.samples)
+            self._scheduler_store.async_delay_save(self._scheduler.as_dict, SCHEDULER_SAVE_DELAY)
 
     async def _fetch_day_prices(self, date):
         """Stáhni ceny pro konkrétní den."""
-        delivery_date = date.strftime("%Y-%m-%d")
+        prices = (await self.async_fetch_range(date, date)).get(date)
+
+        if not prices:
+            _LOGGER.error("XLSX pro %s neobsahuje žádná data", date)
+            raise UpdateFailed("Žádná data v XLSX")
+
+        return prices
+
+    async def async_fetch_range(self, date_from, date_to):
+        """Stáhni ceny pro rozsah dnů jedním requestem. Vrací {date: {index: cena}}."""
+        record = {
+            "started": dt_util.utcnow().isoformat(),
+            "date_from": date_from.isoformat(),
+            "date_to": date_to.isoformat(),
+            "status": None,
+            "http_ms": None,
+            "bytes": 0,
+            "parse_ms": None,
+            "rows": {},
+            "error": None,
+        }
+        try:
+            prices = await self._async_download_range(date_from, date_to, record)
+        except Exception as err:
+            record["error"] = str(err)
+            self._fetch_counts["failures"] += 1
+            raise
+        else:
+            record["rows"] = {day.isoformat(): len(day_prices) for day, day_prices in prices.items()}
+            self._last_success = dt_util.utcnow().isoformat()
+        finally:
+            self._fetch_counts["fetches"] += 1
+            self._fetch_history.append(record)
+        return prices
+
+    async def _async_download_range(self, date_from, date_to, record):
+        """Stažení a parsování rozsahu dnů, metriky se zapisují do record."""
+        day_from = date_from.strftime("%Y-%m-%d")
+        day_to = date_to.strftime("%Y-%m-%d")
 
         url = (
-            f"https://isot.okte.sk/api/v1/dam/report/detailed"
+            f"{self._base_url}"
             f"?lang=sk-SK"
-            f"&deliverydayfrom={delivery_date}"
-            f"&deliverydayto={delivery_date}"
+            f"&deliverydayfrom={day_from}"
+            f"&deliverydayto={day_to}"
             f"&format=xlsx"
         )
 
-        _LOGGER.debug("Stahuji data pro %s z: %s", delivery_date, url)
+        _LOGGER.debug("Stahuji data pro %s - %s z: %s", day_from, day_to, url)
 
+        # Podmíněný request - nezměněný report stojí jen HTTP 304
+        cache_key = (date_from, date_to)
+        cached = self._http_cache.get(cache_key)
+        headers = {}
+        if cached is not None:
+            if cached["etag"]:
+                headers[hdrs.IF_NONE_MATCH] = cached["etag"]
+            if cached["last_modified"]:
+                headers[hdrs.IF_MODIFIED_SINCE] = cached["last_modified"]
+
+        # Sdílená session HA (pool spojení, keep-alive)
+        session = async_get_clientsession(self.hass)
         timeout = aiohttp.ClientTimeout(total=60)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.get(url) as response:
+        request_start = perf_counter()
+        try:
+            async with session.get(url, headers=headers, timeout=timeout) as response:
+                record["status"] = response.status
+                if response.status == 304 and cached is not None:
+                    record["http_ms"] = round((perf_counter() - request_start) * 1000, 1)
+                    self._fetch_counts["not_modified"] += 1
+                    _LOGGER.debug("Report pro %s - %s se nezměnil (HTTP 304)", day_from, day_to)
+                    return cached["prices"]
                 if response.status != 200:
-                    _LOGGER.error("API vrátilo HTTP %d pro %s", response.status, delivery_date)
+                    _LOGGER.error("API vrátilo HTTP %d pro %s - %s", response.status, day_from, day_to)
+                    if response.status >= 500:
+                        raise ServerError(f"HTTP {response.status}")
                     raise UpdateFailed(f"HTTP {response.status}")
                 content = await response.read()
-                _LOGGER.debug("Staženo %d bytů pro %s", len(content), delivery_date)
-
-        # Parse XLSX
-        workbook = load_workbook(filename=io.BytesIO(content), data_only=True)
-        sheet = workbook.active
-
-        prices = {}
-
-        # Sloupec K = 11. sloupec (index 11)
-        # Data začínají od řádku 2
-        # Máme 96 řádků (24h * 4 čtvrthodiny)
-        for row_idx, row in enumerate(sheet.iter_rows(min_row=2, min_col=11, max_col=11), start=0):
-            cell = row[0]
-            if cell.value is not None and row_idx < 96:
-                try:
-                    price = float(cell.value)
-                    prices[row_idx] = round(price, 4)
-                except (ValueError, TypeError):
-                    _LOGGER.warning("Nelze parsovat cenu na řádku %d pro %s: %s",
-                                   row_idx + 2, delivery_date, cell.value)
-                    continue
-
-        if not prices:
-            _LOGGER.error("XLSX pro %s neobsahuje žádná data", delivery_date)
-            raise UpdateFailed("Žádná data v XLSX")
-
-        _LOGGER.debug("Naparsováno %d cen pro %s", len(prices), delivery_date)
+                record["http_ms"] = round((perf_counter() - request_start) * 1000, 1)
+                record["bytes"] = len(content)
+                etag = response.headers.get(hdrs.ETAG)
+                last_modified = response.headers.get(hdrs.LAST_MODIFIED)
+                _LOGGER.debug("Staženo %d bytů pro %s - %s", len(content), day_from, day_to)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            _LOGGER.error("Chyba spojení s API pro %s - %s: %s", day_from, day_to, err)
+            raise ServerError(f"Chyba spojení: {err}") from err
+
+        # Parsování XLSX je blokující, běží v executoru mimo event loop
+        parse_start = perf_counter()
+        try:
+            prices = await self.hass.async_add_executor_job(
+                parse_range_prices, content, date_from, date_to
+            )
+        except Exception as err:
+            # Useknutý nebo poškozený soubor se bere jako neúspěšné stažení
+            _LOGGER.error("Nelze naparsovat XLSX pro %s - %s: %s", day_from, day_to, err)
+            raise UpdateFailed(f"Neplatný XLSX: {err}") from err
+        record["parse_ms"] = round((perf_counter() - parse_start) * 1000, 1)
+        _LOGGER.debug("Parsování XLSX pro %s - %s trvalo %.1f ms (%d bytů)",
+                      day_from, day_to, record["parse_ms"], len(content))
+
+        if etag or last_modified:
+            self._http_cache[cache_key] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "prices": prices,
+            }
+
+        _LOGGER.debug("Naparsováno %s",
+                      ", ".join(f"{day}: {len(day_prices)} cen" for day, day_prices in prices.items()) or "0 cen")
         return prices
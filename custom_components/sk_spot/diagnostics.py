@@ -0,0 +1,52 @@
+"""Diagnostika SK Spot."""
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    """Stav coordinatoru, metriky stahování a časy výpočtu entit dané entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    data = coordinator.data or {}
+    analytics = data.get("analytics")
+
+    # Entity dané entry mají unique_id s prefixem entry_id
+    entity_timings = {
+        unique_id.removeprefix(f"{entry.entry_id}_"): {
+            **timing,
+            "avg_ms": round(timing["total_ms"] / timing["updates"], 3) if timing["updates"] else None,
+            "total_ms": round(timing["total_ms"], 3),
+            "max_ms": round(timing["max_ms"], 3),
+            "last_ms": round(timing["last_ms"], 3),
+        }
+        for unique_id, timing in coordinator.entity_timings.items()
+        if unique_id and unique_id.startswith(f"{entry.entry_id}_")
+    }
+
+    return {
+        "entry": {
+            "data": dict(entry.data),
+            "options": dict(entry.options),
+        },
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "last_exception": str(coordinator.last_exception) if coordinator.last_exception else None,
+            "data_version": analytics.version if analytics is not None else None,
+            "today_records": len(data.get("today_prices", {})),
+            "tomorrow_records": len(data.get("tomorrow_prices", {})),
+            "tomorrow_available": data.get("tomorrow_available", False),
+            "archive_days": len(coordinator.archive),
+        },
+        "forecast": {
+            day.isoformat(): {
+                "average": round(forecast.average, 2),
+                "typical_error": forecast.typical_error,
+                "history_days": forecast.history_days,
+            }
+            for day, forecast in data.get("forecast", {}).items()
+        },
+        "fetch": coordinator.fetch_metrics,
+        "fetch_history": coordinator.fetch_history,
+        "entity_timings": entity_timings,
+    }
@@ -0,0 +1,144 @@
+"""Společný základ entit SK Spot."""
+from bisect import bisect_right
+from time import perf_counter
+
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
+
+from .const import CONF_FINAL_PRICE, CONF_RESOLUTION, DEFAULT_FINAL_PRICE, DEFAULT_RESOLUTION
+from .tariff import tariff_from_options
+
+
+class SKSpotEntity(CoordinatorEntity):
+    """Entita, která zapisuje stav jen když se změnily hodnoty, na kterých závisí.
+
+    Coordinator notifikuje všechny entity i při čtvrthodinovém ticku,
+    většina z nich se ale mění jen s novou verzí dat.
+    """
+
+    _last_fingerprint = None
+
+    def __init__(self, coordinator, entry) -> None:
+        """Init."""
+        super().__init__(coordinator)
+        # Tarif koncové ceny, pokud mají entity počítat z koncové ceny
+        self._tariff = (
+            tariff_from_options(entry.options)
+            if entry.options.get(CONF_FINAL_PRICE, DEFAULT_FINAL_PRICE) else None
+        )
+        # Rozlišení cen v minutách (15 = původní sloty)
+        self._resolution = entry.options.get(CONF_RESOLUTION, DEFAULT_RESOLUTION)
+
+    def _state_fingerprint(self):
+        """Hodnoty, na kterých závisí stav a atributy entity."""
+        return None
+
+    def _analytics(self):
+        """Snapshot analýz v rozlišení entity nad spotovou, případně koncovou cenou.
+
+        Odvozené snapshoty jsou memoizované ve snapshotu coordinatoru, takže se
+        počítají jednou za verzi dat pro všechny entity se stejným nastavením.
+        """
+        if self.coordinator.data is None:
+            return None
+        analytics = self.coordinator.data.get("analytics")
+        if analytics is None:
+            return None
+        if self._tariff is not None:
+            analytics = analytics.with_tariff(self._tariff)
+        return analytics.with_resolution(self._resolution)
+
+    def _data_version(self):
+        """Verze snapshotu analýz (mění se jen s novými cenami)."""
+        if self.coordinator.data is None:
+            return None
+        analytics = self.coordinator.data.get("analytics")
+        return analytics.version if analytics is not None else None
+
+    def _now_index(self):
+        """Index aktuálního slotu ve sloučené ose dnes+zítra podle skutečného času."""
+        analytics = self._analytics()
+        if analytics is None:
+            return None
+        return analytics.index_at(dt_util.utcnow())
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Zapiš stav jen při změně (čas zpracování jde do diagnostiky)."""
+        start = perf_counter()
+        written = False
+        try:
+            if self.coordinator.data is None:
+                fingerprint = (self.available, None)
+            else:
+                fingerprint = (self.available, self._state_fingerprint())
+            if fingerprint[1] is not None and fingerprint == self._last_fingerprint:
+                return
+            self._last_fingerprint = fingerprint
+            self.async_write_ha_state()
+            written = True
+        finally:
+            self.coordinator.record_entity_timing(self.unique_id, perf_counter() - start, written)
+
+
+class SKSpotTransitionEntity(SKSpotEntity):
+    """Entita, která se přepíná v předem spočítaných okamžicích.
+
+    Okamžiky změn (začátky a konce bloků, hranice ranků) se spočítají jednou
+    za verzi dat a na nejbližší z nich se naplánuje callback. Čtvrthodinový
+    tick coordinatoru takovou entitu nechá být, aktuální slot se určuje
+    z času callbacku.
+    """
+
+    _transitions = ()
+    _transitions_key = None
+    _unsub_transition = None
+
+    def _transition_times(self):
+        """Seřazené UTC okamžiky, kdy se může změnit stav (pro aktuální verzi dat)."""
+        return ()
+
+    async def async_added_to_hass(self) -> None:
+        """Naplánuj první přechod."""
+        await super().async_added_to_hass()
+        self._reschedule()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Zruš naplánovaný přechod."""
+        self._cancel_transition()
+        await super().async_will_remove_from_hass()
+
+    def _cancel_transition(self):
+        """Zruš naplánovaný callback."""
+        if self._unsub_transition is not None:
+            self._unsub_transition()
+            self._unsub_transition = None
+
+    def _reschedule(self):
+        """Přepočítej okamžiky přechodů a naplánuj nejbližší budoucí."""
+        self._cancel_transition()
+        self._transitions = tuple(self._transition_times()) if self.coordinator.data else ()
+        self._transitions_key = (self.available, self._data_version())
+
+        position = bisect_right(self._transitions, dt_util.utcnow())
+        if position < len(self._transitions):
+            self._unsub_transition = async_track_point_in_utc_time(
+                self.hass, self._on_transition, self._transitions[position]
+            )
+
+    @callback
+    def _on_transition(self, _now) -> None:
+        """Okamžik přechodu - zapiš stav a naplánuj další."""
+        self._unsub_transition = None
+        self._reschedule()
+        super()._handle_coordinator_update()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Reaguj jen na novou verzi dat nebo změnu dostupnosti, tick ignoruj."""
+        if (self.available, self._data_version()) == self._transitions_key:
+            return
+        self._reschedule()
+        super()._handle_coordinator_update()
@@ -0,0 +1,174 @@
+"""Odhad ještě nezveřejněných cen z archivu.
+
+Model je záměrně jednoduchý a běží bez externích knihoven:
+
+- denní tvar: průměrná odchylka ceny čtvrthodiny od průměru dne,
+  zvlášť pro pracovní dny, soboty a neděle,
+- úroveň dne: lineární regrese průměrů dnů (očištěných o efekt typu dne)
+  přes poslední dny, trend se do budoucna tlumí.
+
+Čtvrthodiny se párují podle místního času Europe/Bratislava, takže odhad
+funguje i pro dny přechodu času (92/100 slotů). Dny přechodu se do historie
+nepočítají. Výsledek je odhad, ne zveřejněná cena.
+"""
+from dataclasses import dataclass
+from datetime import timedelta
+import math
+from zoneinfo import ZoneInfo
+
+from .timeline import DEFAULT_SLOTS, OKTE_TIME_ZONE, slot_count
+
+# Kolik dnů historie se použije pro tvar dne a pro trend
+HISTORY_DAYS = 28
+TREND_DAYS = 14
+# Bez dostatku historie se nic neodhaduje
+MIN_HISTORY_DAYS = 7
+# Den s víc chybějícími sloty se do historie nepočítá
+MAX_MISSING_SLOTS = 8
+# Útlum trendu (0 = jen průměr, 1 = plná extrapolace)
+TREND_DAMPING = 0.5
+
+# Typy dnů: pracovní den, sobota, neděle
+WORKDAY, SATURDAY, SUNDAY = 0, 1, 2
+
+_TZ = ZoneInfo(OKTE_TIME_ZONE)
+
+
+@dataclass(frozen=True)
+class ForecastDay:
+    """Odhad cen jednoho dne."""
+
+    day: object
+    # {index slotu dne: odhadovaná cena EUR/MWh}
+    prices: dict
+    # Počet dnů historie, ze kterých je odhad spočítaný
+    history_days: int
+    # Průměrná absolutní odchylka modelu na historii (EUR/MWh)
+    typical_error: float
+
+    @property
+    def average(self) -> float:
+        """Průměr odhadu dne."""
+        return sum(self.prices.values()) / len(self.prices)
+
+
+def day_type(day) -> int:
+    """Typ dne pro denní tvar (státní svátky se neřeší)."""
+    if day.weekday() == 5:
+        return SATURDAY
+    if day.weekday() == 6:
+        return SUNDAY
+    return WORKDAY
+
+
+def _mean(values):
+    """Průměr neprázdné posloupnosti."""
+    return sum(values) / len(values)
+
+
+def _history(archive_days):
+    """{den: 96 cen} běžných dnů s dostatkem dat (chybějící sloty = NaN)."""
+    history = {}
+    for day, values in archive_days.items():
+        if slot_count(day) != DEFAULT_SLOTS:
+            continue
+        prices = list(values[:DEFAULT_SLOTS])
+        if sum(1 for price in prices if price != price) > MAX_MISSING_SLOTS:
+            continue
+        history[day] = prices
+    return history
+
+
+def _profiles(history, means):
+    """Denní tvar {typ dne: 96 odchylek} a tvar ze všech dnů pro typy bez historie."""
+    sums = {}
+    counts = {}
+    for day, prices in history.items():
+        for key in (day_type(day), None):
+            total = sums.setdefault(key, [0.0] * DEFAULT_SLOTS)
+            count = counts.setdefault(key, [0] * DEFAULT_SLOTS)
+            for quarter, price in enumerate(prices):
+                if price == price:
+                    total[quarter] += price - means[day]
+                    count[quarter] += 1
+    return {
+        key: [total / count if count else 0.0 for total, count in zip(sums[key], counts[key])]
+        for key in sums
+    }
+
+
+def _level_model(history, means):
+    """Efekt typu dne a tlumený lineární trend průměrů dnů."""
+    overall = _mean(list(means.values()))
+    by_type = {}
+    for day, mean in means.items():
+        by_type.setdefault(day_type(day), []).append(mean - overall)
+    effects = {key: _mean(values) for key, values in by_type.items()}
+
+    # Regrese přes poslední dny na průměrech očištěných o efekt typu dne
+    recent = sorted(history)[-TREND_DAYS:]
+    xs = [day.toordinal() for day in recent]
+    ys = [means[day] - effects[day_type(day)] for day in recent]
+    x_mean = _mean(xs)
+    y_mean = _mean(ys)
+    variance = sum((x - x_mean) ** 2 for x in xs)
+    slope = (
+        sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys)) / variance if variance else 0.0
+    )
+
+    def level(day):
+        trend = slope * (day.toordinal() - x_mean) * TREND_DAMPING
+        return y_mean + trend + effects.get(day_type(day), 0.0)
+
+    return level
+
+
+def forecast_days(archive_days, targets, timelines) -> dict:
+    """
+    Odhadni ceny cílových dnů z historie.
+
+    Args:
+        archive_days: {den: ceny dne po slotech (NaN = chybí)} z archivu
+        targets: dny k odhadu
+        timelines: {den: DayTimeline} cílových dnů
+
+    Returns:
+        {den: ForecastDay}; prázdné, pokud je historie kratší než MIN_HISTORY_DAYS
+    """
+    history = _history(archive_days)
+    if len(history) < MIN_HISTORY_DAYS:
+        return {}
+
+    means = {
+        day: _mean([price for price in prices if price == price]) for day, prices in history.items()
+    }
+    profiles = _profiles(history, means)
+    level = _level_model(history, means)
+
+    # Chyba modelu na historii (jak daleko je typický den od svého odhadu)
+    errors = []
+    for day, prices in history.items():
+        profile = profiles.get(day_type(day), profiles[None])
+        base = level(day)
+        errors.extend(
+            abs(price - base - profile[quarter])
+            for quarter, price in enumerate(prices) if price == price
+        )
+    typical_error = _mean(errors) if errors else math.nan
+
+    result = {}
+    for day in targets:
+        timeline = timelines[day]
+        profile = profiles.get(day_type(day), profiles[None])
+        base = level(day)
+        prices = {}
+        for idx, start in enumerate(timeline.starts):
+            local = start.astimezone(_TZ)
+            prices[idx] = round(base + profile[local.hour * 4 + local.minute // 15], 2)
+        result[day] = ForecastDay(day, prices, len(history), round(typical_error, 2))
+    return result
+
+
+def history_range(today):
+    """První a poslední den historie pro odhad."""
+    return today - timedelta(days=HISTORY_DAYS - 1), today + timedelta(days=1)
@@ -0,0 +1,102 @@
+"""Parsování XLSX reportů OKTE.
+
+Funkce jsou synchronní a blokující, coordinator je volá v executoru.
+"""
+from datetime import date, datetime, timedelta
+import io
+import logging
+
+from openpyxl import load_workbook
+
+from .timeline import slot_count
+
+_LOGGER = logging.getLogger(__name__)
+
+# Sloupec A = den dodávky, sloupec K = 11. sloupec s cenou
+DAY_COLUMN = 1
+PRICE_COLUMN = 11
+# Data začínají od řádku 2
+FIRST_DATA_ROW = 2
+
+_DATE_FORMATS = ("%d.%m.%Y", "%Y-%m-%d", "%d/%m/%Y")
+
+
+def _parse_delivery_day(value):
+    """Převeď hodnotu buňky se dnem dodávky na date, jinak None."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        text = value.strip()[:10]
+        for date_format in _DATE_FORMATS:
+            try:
+                return datetime.strptime(text, date_format).date()
+            except ValueError:
+                continue
+    return None
+
+
+def _assign_days(day_values, date_from, date_to):
+    """
+    Urči den dodávky pro každý řádek.
+
+    Pokud sloupec se dnem obsahuje data z požadovaného rozsahu, použije se.
+    Jinak se řádky rozdělí postupně podle počtu slotů dnů (92/96/100) od date_from.
+    """
+    days = [_parse_delivery_day(value) for value in day_values]
+    if days and all(day is not None and date_from <= day <= date_to for day in days):
+        return days
+
+    days = []
+    day = date_from
+    while len(days) < len(day_values):
+        days.extend([day] * slot_count(day))
+        day += timedelta(days=1)
+    return days[:len(day_values)]
+
+
+def parse_range_prices(content, date_from, date_to):
+    """
+    Naparsuj ceny z XLSX s jedním nebo více dny dodávky.
+
+    Returns:
+        dict: {date: {index: cena}} - jen dny, pro které report obsahuje ceny
+    """
+    # read_only streamuje řádky bez stavění celého modelu sešitu
+    workbook = load_workbook(filename=io.BytesIO(content), read_only=True, data_only=True)
+    try:
+        sheet = workbook.active
+        rows = [
+            (row[DAY_COLUMN - 1], row[PRICE_COLUMN - 1])
+            for row in sheet.iter_rows(
+                min_row=FIRST_DATA_ROW,
+                min_col=DAY_COLUMN,
+                max_col=PRICE_COLUMN,
+                values_only=True,
+            )
+            if len(row) >= PRICE_COLUMN
+        ]
+    finally:
+        workbook.close()
+
+    days = _assign_days([day for day, _ in rows], date_from, date_to)
+
+    result = {}
+    row_counts = {}
+    for row_number, ((_, value), delivery_day) in enumerate(zip(rows, days)):
+        # Index v rámci dne odpovídá pořadí řádku daného dne
+        row_idx = row_counts.get(delivery_day, 0)
+        row_counts[delivery_day] = row_idx + 1
+
+        if value is None or row_idx >= slot_count(delivery_day):
+            continue
+        try:
+            price = float(value)
+        except (ValueError, TypeError):
+            _LOGGER.warning("Nelze parsovat cenu na řádku %d pro %s: %s",
+                           row_number + FIRST_DATA_ROW, delivery_day, value)
+            continue
+        result.setdefault(delivery_day, {})[row_idx] = round(price, 4)
+
+    return result
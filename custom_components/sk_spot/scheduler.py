@@ -0,0 +1,166 @@
+"""Plánování stahování zítřejších cen.
+
+Čas zveřejnění se učí z úspěšných stažení (klouzavý průměr), při zpoždění
+se pokusy opakují s exponenciálním backoffem a jitterem a při opakovaných
+chybách serveru se otevře circuit breaker. Modul nezávisí na Home Assistantu,
+pracuje s aware datetime v čase Europe/Bratislava.
+"""
+from datetime import datetime, time, timedelta
+import random
+
+# Výchozí odhad zveřejnění (dřívější pevný čas 13:05)
+DEFAULT_PUBLICATION = time(13, 5)
+# Odhad se drží v rozumném okně kolem obvyklého zveřejnění
+EARLIEST_PUBLICATION = time(12, 0)
+LATEST_PUBLICATION = time(16, 0)
+# Váha nového pozorování v klouzavém průměru
+LEARNING_RATE = 0.3
+# Při úspěchu na první pokus byla data zveřejněná dřív - příště zkusíme o kus dřív
+EARLY_PROBE = timedelta(minutes=5)
+
+# Backoff při zpoždění: 2, 4, 8, 16, 30, 30... minut
+BACKOFF_BASE = timedelta(minutes=2)
+BACKOFF_MAX = timedelta(minutes=30)
+# Náhodné zpoždění prvního pokusu (prevence synchronizace všech uživatelů)
+JITTER = timedelta(seconds=120)
+
+# Circuit breaker: po 3 chybách serveru pauza 15 min, při opakování až 2 h
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = timedelta(minutes=15)
+BREAKER_MAX_COOLDOWN = timedelta(hours=2)
+
+
+def _to_minutes(value: time) -> float:
+    """Čas dne na minuty od půlnoci."""
+    return value.hour * 60 + value.minute + value.second / 60
+
+
+def _from_minutes(minutes: float) -> time:
+    """Minuty od půlnoci na čas dne (zaokrouhleno na sekundy)."""
+    seconds = int(round(minutes * 60))
+    return time(seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+
+class PublicationScheduler:
+    """Odhad času zveřejnění, backoff a circuit breaker."""
+
+    def __init__(self, publication_minutes=None, samples=0, rng=None) -> None:
+        """Init."""
+        self.publication_minutes = (
+            publication_minutes if publication_minutes is not None
+            else _to_minutes(DEFAULT_PUBLICATION)
+        )
+        self.samples = samples
+        self._rng = rng or random.Random()
+        # Neúspěšné pokusy o zítřek v aktuálním dni
+        self.attempts = 0
+        self._attempt_day = None
+        self._last_failure = None
+        # Circuit breaker
+        self.server_errors = 0
+        self.breaker_opens = 0
+        self.breaker_until = None
+
+    @property
+    def publication_time(self) -> time:
+        """Aktuální odhad času zveřejnění."""
+        return _from_minutes(self.publication_minutes)
+
+    def publication_at(self, day, tzinfo) -> datetime:
+        """Odhadovaný okamžik zveřejnění cen na den následující po `day`."""
+        return datetime.combine(day, self.publication_time, tzinfo=tzinfo)
+
+    def publication_expected(self, now) -> bool:
+        """Mohou už být zítřejší ceny zveřejněné?"""
+        return now >= self.publication_at(now.date(), now.tzinfo)
+
+    def breaker_open(self, now) -> bool:
+        """Je circuit breaker otevřený (stahování pozastavené)?"""
+        return self.breaker_until is not None and now < self.breaker_until
+
+    def record_attempt(self, now) -> None:
+        """Začátek pokusu o zítřejší ceny."""
+        if self._attempt_day != now.date():
+            self._attempt_day = now.date()
+            self.attempts = 0
+            self._last_failure = None
+
+    def record_published(self, now) -> None:
+        """Zítřejší ceny staženy - uprav odhad času zveřejnění."""
+        if self._last_failure is not None and self._last_failure.date() == now.date():
+            # Zveřejněno mezi posledním neúspěšným pokusem a teď
+            observed = self._last_failure + (now - self._last_failure) / 2
+        else:
+            observed = now - EARLY_PROBE
+
+        sample = min(
+            max(_to_minutes(observed.time()), _to_minutes(EARLIEST_PUBLICATION)),
+            _to_minutes(LATEST_PUBLICATION),
+        )
+        if self.samples:
+            self.publication_minutes += LEARNING_RATE * (sample - self.publication_minutes)
+        else:
+            self.publication_minutes = sample
+        self.samples += 1
+
+        self.attempts = 0
+        self._last_failure = None
+        self.record_success()
+
+    def record_not_published(self, now) -> None:
+        """Server odpověděl, ale zítřejší ceny ještě nejsou."""
+        self.attempts += 1
+        self._last_failure = now
+        self.record_success()
+
+    def record_success(self) -> None:
+        """Server odpověděl - zavři circuit breaker."""
+        self.server_errors = 0
+        self.breaker_opens = 0
+        self.breaker_until = None
+
+    def record_server_error(self, now) -> None:
+        """Chyba serveru (5xx, timeout, spojení)."""
+        self.attempts += 1
+        self.server_errors += 1
+        # Po uplynutí pauzy stačí jedna chyba k novému otevření (half-open)
+        if self.server_errors >= BREAKER_THRESHOLD or self.breaker_opens:
+            cooldown = min(BREAKER_COOLDOWN * 2 ** self.breaker_opens, BREAKER_MAX_COOLDOWN)
+            self.breaker_opens += 1
+            self.breaker_until = now + cooldown
+            self.server_errors = 0
+
+    def backoff(self) -> timedelta:
+        """Zpoždění dalšího pokusu (polovina pevně, polovina náhodně)."""
+        delay = min(BACKOFF_BASE * 2 ** max(self.attempts - 1, 0), BACKOFF_MAX)
+        return delay / 2 + delay / 2 * self._rng.random()
+
+    def _jitter(self) -> timedelta:
+        """Náhodné zpoždění 1 s - JITTER."""
+        return timedelta(seconds=self._rng.randint(1, int(JITTER.total_seconds())))
+
+    def next_update(self, now, have_tomorrow) -> datetime:
+        """Okamžik další aktualizace."""
+        if have_tomorrow:
+            # Zítřek máme, další ceny budou zítra po zveřejnění
+            target = self.publication_at(now.date() + timedelta(days=1), now.tzinfo) + self._jitter()
+        else:
+            first = self.publication_at(now.date(), now.tzinfo)
+            if now < first:
+                target = first + self._jitter()
+            else:
+                target = now + self.backoff()
+
+        if self.breaker_open(now):
+            target = max(target, self.breaker_until + self._jitter())
+        return target
+
+    def as_dict(self) -> dict:
+        """Naučený stav pro uložení."""
+        return {"publication_minutes": self.publication_minutes, "samples": self.samples}
+
+    @classmethod
+    def from_dict(cls, data, rng=None):
+        """Obnov naučený stav."""
+        data = data or {}
+        return cls(data.get("publication_minutes"), data.get("samples", 0), rng)
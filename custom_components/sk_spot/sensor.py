@@ -1,15 +1,41 @@
 """SK Spot sensor."""
-from datetime import datetime, timedelta, time
+from datetime import timedelta
 import logging
 
-from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import MATCH_ALL, EntityCategory, UnitOfInformation, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN, CONF_UNIT, UNIT_MWH, UNIT_KWH
+from .analytics import price_attributes, ranking_attributes
+from .battery import ACTION_CHARGE, ACTION_DISCHARGE, ACTION_IDLE, BatteryParams
+from .entity import SKSpotEntity
+from .tariff import tariff_from_options
+from .const import (
+    DOMAIN,
+    CONF_UNIT,
+    UNIT_MWH,
+    UNIT_KWH,
+    ROLLING_STATS_DAYS,
+    CONF_PRICE_ATTRIBUTES,
+    DEFAULT_PRICE_ATTRIBUTES,
+    CONF_BATTERY_CAPACITY,
+    CONF_BATTERY_POWER,
+    CONF_BATTERY_EFFICIENCY,
+    DEFAULT_BATTERY_CAPACITY,
+    DEFAULT_BATTERY_POWER,
+    DEFAULT_BATTERY_EFFICIENCY,
+    CONF_METRIC_SENSORS,
+    DEFAULT_METRIC_SENSORS,
+    DEFAULT_RESOLUTION,
+    HOURLY_RESOLUTION,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -21,27 +47,52 @@ async def async_setup_entry(
 ) -> None:
     """Setup senzoru."""
     coordinator = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities([
+    entities = [
         SKSpotSensor(coordinator, entry),
+        SKSpotHourlyPriceSensor(coordinator, entry),
         SKSpotCurrentRankSensor(coordinator, entry),
         SKSpotDailyMinSensor(coordinator, entry),
         SKSpotDailyMaxSensor(coordinator, entry),
         SKSpotDailyAverageSensor(coordinator, entry),
-    ])
-
-
-class SKSpotSensor(CoordinatorEntity, SensorEntity):
+    ]
+    # Klouzavé průměry z archivu cen
+    entities.extend(
+        SKSpotRollingAverageSensor(coordinator, entry, days) for days in ROLLING_STATS_DAYS
+    )
+    # Odhad nezveřejněných cen (zítřek do zveřejnění, pozítří)
+    entities.extend(
+        SKSpotForecastSensor(coordinator, entry, offset) for offset in FORECAST_OFFSETS
+    )
+    # Diagnostické metriky stahování
+    if entry.options.get(CONF_METRIC_SENSORS, DEFAULT_METRIC_SENSORS):
+        entities.extend(SKSpotMetricSensor(coordinator, entry, metric) for metric in METRICS)
+    # Koncová cena jen pokud je zadaný tarif
+    tariff = tariff_from_options(entry.options)
+    if tariff is not None:
+        entities.append(SKSpotFinalPriceSensor(coordinator, entry, tariff))
+    # Plán baterie jen pokud je zadaná kapacita
+    if entry.options.get(CONF_BATTERY_CAPACITY, DEFAULT_BATTERY_CAPACITY) > 0:
+        entities.append(SKSpotBatteryPlanSensor(coordinator, entry))
+    async_add_entities(entities)
+
+
+class SKSpotSensor(SKSpotEntity, SensorEntity):
     """SK Spot Price sensor."""
 
     _attr_name = "SK Spot Price"
     _attr_state_class = SensorStateClass.MEASUREMENT
+    # Časová řada cen (až 192 záznamů) se do recorderu neukládá
+    _unrecorded_attributes = frozenset({MATCH_ALL})
 
     def __init__(self, coordinator, entry: ConfigEntry) -> None:
         """Init."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, entry)
         self._attr_unique_id = f"{entry.entry_id}_price"
         self._entry = entry
         self._unit = entry.data.get(CONF_UNIT, UNIT_MWH)
+        self._price_attributes = entry.options.get(CONF_PRICE_ATTRIBUTES, DEFAULT_PRICE_ATTRIBUTES)
+        self._attributes_key = None
+        self._attributes = {}
 
     @property
     def native_unit_of_measurement(self):
@@ -50,13 +101,29 @@ class SKSpotSensor(CoordinatorEntity, SensorEntity):
             return "EUR/kWh"
         return "EUR/MWh"
 
+    def _state_fingerprint(self):
+        """Cena se mění po 15 minutách, atributy s verzí dat."""
+        return (
+            self._data_version(),
+            self._current_price(),
+            self.coordinator.data.get("tomorrow_published"),
+        )
+
+    def _current_price(self):
+        """Cena aktuálního intervalu (spotová z coordinatoru, případně koncová nebo agregovaná)."""
+        if self._tariff is None and self._resolution == DEFAULT_RESOLUTION:
+            return self.coordinator.data.get("current_price", 0)
+        analytics = self._analytics()
+        price = analytics.timeline.get(self._now_index()) if analytics else None
+        return price if price is not None else 0
+
     @property
     def native_value(self):
         """Aktuální cena."""
         if self.coordinator.data is None:
             return 0
 
-        price = self.coordinator.data.get("current_price", 0)
+        price = self._current_price()
 
         # Převod MWh -> kWh (dělit 1000)
         if self._unit == UNIT_KWH:
@@ -66,163 +133,251 @@ class SKSpotSensor(CoordinatorEntity, SensorEntity):
 
     @property
     def extra_state_attributes(self):
-        """Atributy."""
-        if self.coordinator.data is None:
+        """Atributy - postavené jednou za verzi dat."""
+        if self.coordinator.data is None or not self._price_attributes:
             return {}
 
-        today_prices = self.coordinator.data.get("today_prices", {})
-        tomorrow_prices = self.coordinator.data.get("tomorrow_prices", {})
-        tomorrow_available = self.coordinator.data.get("tomorrow_available", False)
+        analytics = self._analytics()
+        if analytics is None:
+            return {}
 
-        now = dt_util.now()
-        today_date = now.date()
-        tomorrow_date = today_date + timedelta(days=1)
+        key = (analytics.version, self.coordinator.data.get("tomorrow_published", False))
+        if key != self._attributes_key:
+            self._attributes = self._build_attributes(analytics, key[1])
+            self._attributes_key = key
+        return self._attributes
 
-        # Vytvoření jednoho slovníku pro dnes i zítra
-        all_prices = {}
+    def _build_attributes(self, analytics, tomorrow_published):
+        """Slovník čas -> cena pro dnes a (zveřejněný) zítřek."""
+        # Zítřejší ceny - POUZE pokud jsou skutečně dostupné A je po 13:00
+        # (Data se zveřejňují každý den ve 13:00)
+        all_prices = price_attributes(
+            analytics, tomorrow_published, 1000 if self._unit == UNIT_KWH else 1
+        )
 
-        # Přidat dnešní ceny
-        for idx in range(96):
-            hour = idx // 4
-            minute = (idx % 4) * 15
+        _LOGGER.debug("Atributy obsahují %d záznamů (zítra zveřejněno: %s)",
+                     len(all_prices), tomorrow_published)
+        return all_prices
 
-            if idx in today_prices:
-                dt = datetime.combine(today_date, time(hour, minute))
-                dt = dt_util.as_local(dt_util.as_utc(dt))
-                iso_time = dt.isoformat()
 
-                price = today_prices[idx]
-                if self._unit == UNIT_KWH:
-                    price = round(price / 1000, 2)
-                else:
-                    price = round(price, 2)
+class SKSpotHourlyPriceSensor(SKSpotEntity, SensorEntity):
+    """Sensor s hodinovým průměrem cen (agregace čtyř 15min slotů)."""
 
-                all_prices[iso_time] = price
+    _attr_name = "SK Spot Hourly Price"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:clock-time-four-outline"
+    # Hodinová časová řada se do recorderu neukládá
+    _unrecorded_attributes = frozenset({MATCH_ALL})
 
-        # Přidat zítřejší ceny - POUZE pokud jsou skutečně dostupné A je po 13:00
-        # (Data se zveřejňují každý den ve 13:00)
-        if tomorrow_available and tomorrow_prices and now.time() >= time(13, 0):
-            for idx in range(96):
-                hour = idx // 4
-                minute = (idx % 4) * 15
+    def __init__(self, coordinator, entry: ConfigEntry) -> None:
+        """Init."""
+        super().__init__(coordinator, entry)
+        self._attr_unique_id = f"{entry.entry_id}_hourly_price"
+        self._unit = entry.data.get(CONF_UNIT, UNIT_MWH)
+        self._price_attributes = entry.options.get(CONF_PRICE_ATTRIBUTES, DEFAULT_PRICE_ATTRIBUTES)
+        self._attributes_key = None
+        self._attributes = {}
+
+    @property
+    def native_unit_of_measurement(self):
+        """Jednotka měření."""
+        if self._unit == UNIT_KWH:
+            return "EUR/kWh"
+        return "EUR/MWh"
+
+    def _hourly_analytics(self):
+        """Hodinový snapshot (memoizovaný ve snapshotu coordinatoru)."""
+        if self.coordinator.data is None:
+            return None
+        analytics = self.coordinator.data.get("analytics")
+        if analytics is None:
+            return None
+        if self._tariff is not None:
+            analytics = analytics.with_tariff(self._tariff)
+        return analytics.with_resolution(HOURLY_RESOLUTION)
+
+    def _state_fingerprint(self):
+        """Cena se mění po hodině, atributy s verzí dat."""
+        return (
+            self._data_version(),
+            self.native_value,
+            self.coordinator.data.get("tomorrow_published"),
+        )
 
-                if idx in tomorrow_prices:
-                    price = tomorrow_prices[idx]
+    @property
+    def native_value(self):
+        """Průměrná cena aktuální hodiny."""
+        analytics = self._hourly_analytics()
+        if analytics is None:
+            return None
+        price = analytics.timeline.get(analytics.index_at(dt_util.utcnow()))
+        if price is None:
+            return None
+        if self._unit == UNIT_KWH:
+            return round(price / 1000, 6)
+        return round(price, 2)
 
-                    dt = datetime.combine(tomorrow_date, time(hour, minute))
-                    dt = dt_util.as_local(dt_util.as_utc(dt))
-                    iso_time = dt.isoformat()
+    @property
+    def extra_state_attributes(self):
+        """Hodinové ceny dnes a (zveřejněný) zítřek - jednou za verzi dat."""
+        if not self._price_attributes:
+            return {}
+        analytics = self._hourly_analytics()
+        if analytics is None:
+            return {}
 
-                    if self._unit == UNIT_KWH:
-                        price = round(price / 1000, 2)
-                    else:
-                        price = round(price, 2)
+        key = (analytics.version, self.coordinator.data.get("tomorrow_published", False))
+        if key != self._attributes_key:
+            self._attributes = price_attributes(
+                analytics, key[1], 1000 if self._unit == UNIT_KWH else 1
+            )
+            self._attributes_key = key
+        return self._attributes
 
-                    all_prices[iso_time] = price
 
-        _LOGGER.debug("Atributy obsahují %d záznamů (dnes: %d, zítra: %d, zítra dostupné: %s)",
-                     len(all_prices), len(today_prices), len(tomorrow_prices), tomorrow_available)
-        return all_prices
+class SKSpotFinalPriceSensor(SKSpotEntity, SensorEntity):
+    """Sensor s koncovou cenou aktuálního intervalu (spot + marže, distribuce, poplatky, DPH)."""
+
+    _attr_name = "SK Spot Final Price"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:cash-multiple"
+    # Časová řada koncových cen se do recorderu neukládá
+    _unrecorded_attributes = frozenset({MATCH_ALL})
+
+    def __init__(self, coordinator, entry: ConfigEntry, tariff) -> None:
+        """Init."""
+        super().__init__(coordinator, entry)
+        self._attr_unique_id = f"{entry.entry_id}_final_price"
+        self._params = tariff
+        self._unit = entry.data.get(CONF_UNIT, UNIT_MWH)
+        self._price_attributes = entry.options.get(CONF_PRICE_ATTRIBUTES, DEFAULT_PRICE_ATTRIBUTES)
+        self._attributes_key = None
+        self._attributes = {}
+
+    @property
+    def native_unit_of_measurement(self):
+        """Jednotka měření."""
+        if self._unit == UNIT_KWH:
+            return "EUR/kWh"
+        return "EUR/MWh"
+
+    def _final_analytics(self):
+        """Snapshot nad koncovými cenami (nezávisle na přepínači koncové ceny)."""
+        if self.coordinator.data is None:
+            return None
+        analytics = self.coordinator.data.get("analytics")
+        if analytics is None:
+            return None
+        return analytics.with_tariff(self._params).with_resolution(self._resolution)
+
+    def _state_fingerprint(self):
+        """Cena se mění po 15 minutách, atributy s verzí dat."""
+        return (
+            self._data_version(),
+            self.native_value,
+            self.coordinator.data.get("tomorrow_published"),
+        )
 
+    @property
+    def native_value(self):
+        """Koncová cena aktuálního intervalu."""
+        analytics = self._final_analytics()
+        if analytics is None:
+            return None
+        price = analytics.timeline.get(analytics.index_at(dt_util.utcnow()))
+        if price is None:
+            return None
+        if self._unit == UNIT_KWH:
+            return round(price / 1000, 6)
+        return round(price, 2)
 
-class SKSpotCurrentRankSensor(CoordinatorEntity, SensorEntity):
+    @property
+    def extra_state_attributes(self):
+        """Složky tarifu a časová řada koncových cen (jednou za verzi dat)."""
+        analytics = self._final_analytics()
+        if analytics is None:
+            return {}
+
+        key = (analytics.version, self.coordinator.data.get("tomorrow_published", False))
+        if key != self._attributes_key:
+            self._attributes = {
+                "margin": self._params.margin,
+                "distribution_high": self._params.distribution_high,
+                "distribution_low": self._params.distribution_low,
+                "low_tariff_hours": [f"{start}-{end}" for start, end in self._params.low_tariff],
+                "system_charges": self._params.system_charges,
+                "vat": self._params.vat,
+            }
+            if self._price_attributes:
+                self._attributes.update(price_attributes(
+                    analytics, key[1], 1000 if self._unit == UNIT_KWH else 1
+                ))
+            self._attributes_key = key
+        return self._attributes
+
+
+class SKSpotCurrentRankSensor(SKSpotEntity, SensorEntity):
     """Sensor zobrazující ranking aktuálního bloku (1=nejlevnější, 96=nejdražší)."""
 
     _attr_name = "SK Spot Current Rank"
     _attr_state_class = SensorStateClass.MEASUREMENT
     _attr_icon = "mdi:podium"
+    # Rankingy všech bloků se do recorderu neukládají
+    _unrecorded_attributes = frozenset({"today_rankings", "tomorrow_rankings"})
 
     def __init__(self, coordinator, entry: ConfigEntry) -> None:
         """Init."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, entry)
         self._attr_unique_id = f"{entry.entry_id}_current_rank"
         self._entry = entry
+        self._price_attributes = entry.options.get(CONF_PRICE_ATTRIBUTES, DEFAULT_PRICE_ATTRIBUTES)
+        self._attributes_key = None
+        self._attributes = {}
 
     @property
     def native_unit_of_measurement(self):
         """Jednotka měření."""
         return None
 
+    def _state_fingerprint(self):
+        """Rank se mění s aktuálním intervalem, atributy s verzí dat."""
+        return (
+            self._data_version(),
+            self.native_value,
+            self.coordinator.data.get("tomorrow_published"),
+        )
+
     @property
     def native_value(self):
         """Aktuální ranking (1-96)."""
         if self.coordinator.data is None:
             return None
 
-        today_prices = self.coordinator.data.get("today_prices", {})
-        if not today_prices:
+        analytics = self._analytics()
+        if analytics is None:
             return None
 
-        # Zjisti aktuální index
-        now = dt_util.now()
-        current_hour = now.hour
-        current_minute = now.minute
-        current_idx = (current_hour * 4) + (current_minute // 15)
-
-        if current_idx not in today_prices:
-            return None
-
-        current_price = today_prices[current_idx]
-
-        # Spočítej kolik bloků má nižší cenu (standard ranking)
-        # Pokud je více bloků se stejnou cenou, všechny mají stejný rank
-        lower_count = sum(1 for price in today_prices.values() if price < current_price)
-
-        # Rank je počet bloků s nižší cenou + 1
-        return lower_count + 1
+        # Standard ranking je předpočítaný v coordinatoru
+        return analytics.rank(self._now_index())
 
     @property
     def extra_state_attributes(self):
-        """Atributy s rankingy všech bloků."""
-        if self.coordinator.data is None:
+        """Atributy s rankingy všech bloků - postavené jednou za verzi dat."""
+        if self.coordinator.data is None or not self._price_attributes:
             return {}
 
-        today_prices = self.coordinator.data.get("today_prices", {})
-        tomorrow_prices = self.coordinator.data.get("tomorrow_prices", {})
-        tomorrow_available = self.coordinator.data.get("tomorrow_available", False)
-
-        now = dt_util.now()
-        today_date = now.date()
-        tomorrow_date = today_date + timedelta(days=1)
-
-        attrs = {}
-
-        # Rankingy pro dnes
-        if today_prices:
-            today_rankings = {}
-            for idx, price in today_prices.items():
-                # Standard ranking: spočítej kolik bloků má nižší cenu
-                rank = sum(1 for p in today_prices.values() if p < price) + 1
-
-                hour = idx // 4
-                minute = (idx % 4) * 15
-                dt = datetime.combine(today_date, time(hour, minute))
-                dt = dt_util.as_local(dt_util.as_utc(dt))
-                iso_time = dt.isoformat()
-                today_rankings[iso_time] = rank
-
-            attrs["today_rankings"] = today_rankings
-
-        # Rankingy pro zítra (pokud jsou dostupné)
-        if tomorrow_available and tomorrow_prices and now.time() >= time(13, 0):
-            tomorrow_rankings = {}
-            for idx, price in tomorrow_prices.items():
-                # Standard ranking: spočítej kolik bloků má nižší cenu
-                rank = sum(1 for p in tomorrow_prices.values() if p < price) + 1
-
-                hour = idx // 4
-                minute = (idx % 4) * 15
-                dt = datetime.combine(tomorrow_date, time(hour, minute))
-                dt = dt_util.as_local(dt_util.as_utc(dt))
-                iso_time = dt.isoformat()
-                tomorrow_rankings[iso_time] = rank
-
-            attrs["tomorrow_rankings"] = tomorrow_rankings
+        analytics = self._analytics()
+        if analytics is None:
+            return {}
 
-        return attrs
+        key = (analytics.version, self.coordinator.data.get("tomorrow_published", False))
+        if key != self._attributes_key:
+            self._attributes = ranking_attributes(analytics, key[1])
+            self._attributes_key = key
+        return self._attributes
 
 
-class SKSpotDailyMinSensor(CoordinatorEntity, SensorEntity):
+class SKSpotDailyMinSensor(SKSpotEntity, SensorEntity):
     """Sensor zobrazující minimální cenu dnes."""
 
     _attr_name = "SK Spot Daily Min"
@@ -231,7 +386,7 @@ class SKSpotDailyMinSensor(CoordinatorEntity, SensorEntity):
 
     def __init__(self, coordinator, entry: ConfigEntry) -> None:
         """Init."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, entry)
         self._attr_unique_id = f"{entry.entry_id}_daily_min"
         self._entry = entry
         self._unit = entry.data.get(CONF_UNIT, UNIT_MWH)
@@ -243,17 +398,21 @@ class SKSpotDailyMinSensor(CoordinatorEntity, SensorEntity):
             return "EUR/kWh"
         return "EUR/MWh"
 
+    def _state_fingerprint(self):
+        """Mění se jen s verzí dat."""
+        return (self._data_version(),)
+
     @property
     def native_value(self):
         """Minimální cena dnes."""
         if self.coordinator.data is None:
             return None
 
-        today_prices = self.coordinator.data.get("today_prices", {})
-        if not today_prices:
+        analytics = self._analytics()
+        if analytics is None or analytics.today is None:
             return None
 
-        min_price = min(today_prices.values())
+        min_price = analytics.today.min_price
 
         if self._unit == UNIT_KWH:
             return round(min_price / 1000, 6)
@@ -266,28 +425,19 @@ class SKSpotDailyMinSensor(CoordinatorEntity, SensorEntity):
         if self.coordinator.data is None:
             return {}
 
-        today_prices = self.coordinator.data.get("today_prices", {})
-        if not today_prices:
+        analytics = self._analytics()
+        if analytics is None or analytics.today is None:
             return {}
 
-        min_price = min(today_prices.values())
-        min_idx = [idx for idx, price in today_prices.items() if price == min_price][0]
-
-        now = dt_util.now()
-        today_date = now.date()
-
-        hour = min_idx // 4
-        minute = (min_idx % 4) * 15
-        dt = datetime.combine(today_date, time(hour, minute))
-        dt = dt_util.as_local(dt_util.as_utc(dt))
+        min_idx = analytics.today.min_index
 
         return {
-            "time": dt.isoformat(),
+            "time": analytics.today_timeline.iso_starts[min_idx],
             "interval_index": min_idx,
         }
 
 
-class SKSpotDailyMaxSensor(CoordinatorEntity, SensorEntity):
+class SKSpotDailyMaxSensor(SKSpotEntity, SensorEntity):
     """Sensor zobrazující maximální cenu dnes."""
 
     _attr_name = "SK Spot Daily Max"
@@ -296,7 +446,7 @@ class SKSpotDailyMaxSensor(CoordinatorEntity, SensorEntity):
 
     def __init__(self, coordinator, entry: ConfigEntry) -> None:
         """Init."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, entry)
         self._attr_unique_id = f"{entry.entry_id}_daily_max"
         self._entry = entry
         self._unit = entry.data.get(CONF_UNIT, UNIT_MWH)
@@ -308,17 +458,21 @@ class SKSpotDailyMaxSensor(CoordinatorEntity, SensorEntity):
             return "EUR/kWh"
         return "EUR/MWh"
 
+    def _state_fingerprint(self):
+        """Mění se jen s verzí dat."""
+        return (self._data_version(),)
+
     @property
     def native_value(self):
         """Maximální cena dnes."""
         if self.coordinator.data is None:
             return None
 
-        today_prices = self.coordinator.data.get("today_prices", {})
-        if not today_prices:
+        analytics = self._analytics()
+        if analytics is None or analytics.today is None:
             return None
 
-        max_price = max(today_prices.values())
+        max_price = analytics.today.max_price
 
         if self._unit == UNIT_KWH:
             return round(max_price / 1000, 6)
@@ -331,28 +485,19 @@ class SKSpotDailyMaxSensor(CoordinatorEntity, SensorEntity):
         if self.coordinator.data is None:
             return {}
 
-        today_prices = self.coordinator.data.get("today_prices", {})
-        if not today_prices:
+        analytics = self._analytics()
+        if analytics is None or analytics.today is None:
             return {}
 
-        max_price = max(today_prices.values())
-        max_idx = [idx for idx, price in today_prices.items() if price == max_price][0]
-
-        now = dt_util.now()
-        today_date = now.date()
-
-        hour = max_idx // 4
-        minute = (max_idx % 4) * 15
-        dt = datetime.combine(today_date, time(hour, minute))
-        dt = dt_util.as_local(dt_util.as_utc(dt))
+        max_idx = analytics.today.max_index
 
         return {
-            "time": dt.isoformat(),
+            "time": analytics.today_timeline.iso_starts[max_idx],
             "interval_index": max_idx,
         }
 
 
-class SKSpotDailyAverageSensor(CoordinatorEntity, SensorEntity):
+class SKSpotDailyAverageSensor(SKSpotEntity, SensorEntity):
     """Sensor zobrazující průměrnou cenu dnes."""
 
     _attr_name = "SK Spot Daily Average"
@@ -361,7 +506,7 @@ class SKSpotDailyAverageSensor(CoordinatorEntity, SensorEntity):
 
     def __init__(self, coordinator, entry: ConfigEntry) -> None:
         """Init."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, entry)
         self._attr_unique_id = f"{entry.entry_id}_daily_average"
         self._entry = entry
         self._unit = entry.data.get(CONF_UNIT, UNIT_MWH)
@@ -373,19 +518,377 @@ class SKSpotDailyAverageSensor(CoordinatorEntity, SensorEntity):
             return "EUR/kWh"
         return "EUR/MWh"
 
+    def _state_fingerprint(self):
+        """Mění se jen s verzí dat."""
+        return (self._data_version(),)
+
     @property
     def native_value(self):
         """Průměrná cena dnes."""
         if self.coordinator.data is None:
             return None
 
-        today_prices = self.coordinator.data.get("today_prices", {})
-        if not today_prices:
+        analytics = self._analytics()
+        if analytics is None or analytics.today is None:
             return None
 
-        avg_price = sum(today_prices.values()) / len(today_prices)
+        avg_price = analytics.today.avg_price
 
         if self._unit == UNIT_KWH:
             return round(avg_price / 1000, 6)
 
         return round(avg_price, 2)
+
+
+class SKSpotRollingAverageSensor(SKSpotEntity, SensorEntity):
+    """Sensor zobrazující průměrnou cenu za posledních N dnů z archivu."""
+
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:chart-timeline-variant"
+
+    def __init__(self, coordinator, entry: ConfigEntry, days: int) -> None:
+        """Init."""
+        super().__init__(coordinator, entry)
+        self._days = days
+        self._attr_name = f"SK Spot {days} Day Average"
+        self._attr_unique_id = f"{entry.entry_id}_rolling_{days}d_average"
+        self._entry = entry
+        self._unit = entry.data.get(CONF_UNIT, UNIT_MWH)
+
+    @property
+    def native_unit_of_measurement(self):
+        """Jednotka měření."""
+        if self._unit == UNIT_KWH:
+            return "EUR/kWh"
+        return "EUR/MWh"
+
+    def _state_fingerprint(self):
+        """Mění se jen s přepočtem statistik."""
+        return (self._stats(),)
+
+    def _stats(self):
+        """Statistiky z coordinatoru."""
+        if self.coordinator.data is None:
+            return None
+        return self.coordinator.data.get("rolling_stats", {}).get(self._days)
+
+    @property
+    def native_value(self):
+        """Průměrná cena za posledních N dnů."""
+        stats = self._stats()
+        if stats is None:
+            return None
+
+        if self._unit == UNIT_KWH:
+            return round(stats["average"] / 1000, 6)
+
+        return round(stats["average"], 2)
+
+    @property
+    def extra_state_attributes(self):
+        """Atributy."""
+        stats = self._stats()
+        if stats is None:
+            return {}
+
+        if self._unit == UNIT_KWH:
+            min_price = round(stats["min"] / 1000, 6)
+            max_price = round(stats["max"] / 1000, 6)
+        else:
+            min_price = round(stats["min"], 2)
+            max_price = round(stats["max"], 2)
+
+        return {
+            "min": min_price,
+            "max": max_price,
+            "days_available": stats["days"],
+            "records": stats["records"],
+        }
+
+
+# Posun dne odhadu oproti dnešku a název sensoru
+FORECAST_OFFSETS = {1: "Tomorrow", 2: "D+2"}
+
+
+class SKSpotForecastSensor(SKSpotEntity, SensorEntity):
+    """Sensor s odhadem průměrné ceny dne, který ještě není zveřejněný (odhad z archivu)."""
+
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:crystal-ball"
+    # Odhad po slotech se do recorderu neukládá
+    _unrecorded_attributes = frozenset({"forecast"})
+
+    def __init__(self, coordinator, entry: ConfigEntry, offset: int) -> None:
+        """Init."""
+        super().__init__(coordinator, entry)
+        self._offset = offset
+        self._attr_name = f"SK Spot Forecast {FORECAST_OFFSETS[offset]}"
+        self._attr_unique_id = f"{entry.entry_id}_forecast_d{offset}"
+        self._unit = entry.data.get(CONF_UNIT, UNIT_MWH)
+        self._attributes_key = None
+        self._attributes = {}
+
+    @property
+    def native_unit_of_measurement(self):
+        """Jednotka měření."""
+        if self._unit == UNIT_KWH:
+            return "EUR/kWh"
+        return "EUR/MWh"
+
+    def _price(self, price):
+        """Cena v jednotce entity."""
+        if self._unit == UNIT_KWH:
+            return round(price / 1000, 6)
+        return round(price, 2)
+
+    def _forecast(self):
+        """Odhad dne nebo None (nedostatek historie, den už zveřejněný)."""
+        if self.coordinator.data is None:
+            return None
+        analytics = self.coordinator.data.get("analytics")
+        if analytics is None or analytics.today_timeline is None:
+            return None
+        day = analytics.today_timeline.day + timedelta(days=self._offset)
+        return self.coordinator.data.get("forecast", {}).get(day)
+
+    def _state_fingerprint(self):
+        """Mění se jen s novým odhadem."""
+        forecast = self._forecast()
+        return (forecast.day, forecast.average) if forecast is not None else ()
+
+    @property
+    def native_value(self):
+        """Odhadovaná průměrná cena dne."""
+        forecast = self._forecast()
+        if forecast is None:
+            return None
+        return self._price(forecast.average)
+
+    @property
+    def extra_state_attributes(self):
+        """Atributy odhadu - postavené jednou za odhad."""
+        forecast = self._forecast()
+        if forecast is None:
+            return {"estimate": True}
+
+        if forecast is not self._attributes_key:
+            timeline = self.coordinator.get_timeline(forecast.day)
+            prices = forecast.prices
+            min_idx = min(prices, key=prices.get)
+            max_idx = max(prices, key=prices.get)
+            self._attributes = {
+                # Odhad z historie, ne zveřejněná cena OKTE
+                "estimate": True,
+                "day": forecast.day.isoformat(),
+                "min": self._price(prices[min_idx]),
+                "min_time": timeline.iso_starts[min_idx],
+                "max": self._price(prices[max_idx]),
+                "max_time": timeline.iso_starts[max_idx],
+                "typical_error": self._price(forecast.typical_error),
+                "history_days": forecast.history_days,
+                "forecast": {
+                    timeline.iso_starts[idx]: self._price(price) for idx, price in prices.items()
+                },
+            }
+            self._attributes_key = forecast
+        return self._attributes
+
+
+class SKSpotBatteryPlanSensor(SKSpotEntity, SensorEntity):
+    """Sensor s plánem nabíjení/vybíjení baterie pro aktuální interval."""
+
+    _attr_name = "SK Spot Battery Plan"
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_options = [ACTION_CHARGE, ACTION_DISCHARGE, ACTION_IDLE]
+    # Plán pro všechny sloty (až 192 záznamů) se do recorderu neukládá
+    _unrecorded_attributes = frozenset({"plan"})
+
+    def __init__(self, coordinator, entry: ConfigEntry) -> None:
+        """Init."""
+        super().__init__(coordinator, entry)
+        self._attr_unique_id = f"{entry.entry_id}_battery_plan"
+        self._params = BatteryParams(
+            capacity_kwh=float(entry.options.get(CONF_BATTERY_CAPACITY, DEFAULT_BATTERY_CAPACITY)),
+            power_kw=float(entry.options.get(CONF_BATTERY_POWER, DEFAULT_BATTERY_POWER)),
+            efficiency=entry.options.get(CONF_BATTERY_EFFICIENCY, DEFAULT_BATTERY_EFFICIENCY) / 100,
+        )
+        self._attributes_key = None
+        self._attributes = {}
+        # Snapshot, pro který se plán počítá/spočítal, a hotový plán
+        self._plan_source = None
+        self._plan_result = None
+        self._plan_task = None
+
+    async def async_added_to_hass(self) -> None:
+        """Spočítej plán i pro data, která coordinator už má."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._cancel_plan)
+        self._schedule_plan()
+
+    @callback
+    def _cancel_plan(self) -> None:
+        """Zruš rozpracovaný výpočet plánu."""
+        if self._plan_task is not None:
+            self._plan_task.cancel()
+            self._plan_task = None
+
+    @callback
+    def _schedule_plan(self) -> None:
+        """Pro novou verzi dat spusť výpočet plánu v executoru (DP nad 192 sloty blokuje)."""
+        analytics = self._analytics()
+        if analytics is None or analytics is self._plan_source:
+            return
+        self._cancel_plan()
+        self._plan_source = analytics
+        self._plan_result = None
+        self._plan_task = self.hass.async_create_task(self._async_compute_plan(analytics))
+
+    async def _async_compute_plan(self, analytics) -> None:
+        """Spočítej plán (memoizovaný ve snapshotu) a zapiš stav."""
+        plan = await self.hass.async_add_executor_job(analytics.battery_plan, self._params)
+        self._plan_task = None
+        if analytics is not self._plan_source:
+            return
+        self._plan_result = plan
+        super()._handle_coordinator_update()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """S novou verzí dat přepočítej plán, stav se zapíše po dokončení výpočtu."""
+        self._schedule_plan()
+        super()._handle_coordinator_update()
+
+    def _plan(self):
+        """Spočítaný plán pro aktuální verzi dat (do dokončení výpočtu None)."""
+        if self.coordinator.data is None:
+            return None
+        analytics = self._analytics()
+        if analytics is None or analytics is not self._plan_source:
+            return None
+        return self._plan_result
+
+    def _current_slot(self):
+        """(akce, výkon, SoC) aktuálního intervalu."""
+        plan = self._plan()
+        if plan is None:
+            return None
+        return plan.slots.get(self._now_index())
+
+    def _state_fingerprint(self):
+        """Plán se mění s verzí dat, stav s aktuálním intervalem."""
+        return (self._data_version(), self._current_slot())
+
+    @property
+    def native_value(self):
+        """Akce v aktuálním intervalu."""
+        slot = self._current_slot()
+        return slot[0] if slot is not None else None
+
+    @property
+    def extra_state_attributes(self):
+        """Atributy."""
+        plan = self._plan()
+        if plan is None:
+            return {}
+
+        version = self._data_version()
+        if version != self._attributes_key:
+            analytics = self._analytics()
+            self._attributes = {
+                "expected_profit": round(plan.profit, 2),
+                "charge_slots": sum(1 for slot in plan.slots.values() if slot[0] == ACTION_CHARGE),
+                "discharge_slots": sum(1 for slot in plan.slots.values() if slot[0] == ACTION_DISCHARGE),
+                "plan": {
+                    analytics.iso_start(idx): {"action": action, "power_kw": power, "soc_kwh": soc}
+                    for idx, (action, power, soc) in plan.slots.items()
+                },
+            }
+            self._attributes_key = version
+
+        slot = self._current_slot()
+        return {
+            **self._attributes,
+            "power_kw": slot[1] if slot is not None else None,
+            "soc_kwh": slot[2] if slot is not None else None,
+        }
+
+    @property
+    def icon(self):
+        """Ikona."""
+        value = self.native_value
+        if value == ACTION_CHARGE:
+            return "mdi:battery-arrow-up"
+        if value == ACTION_DISCHARGE:
+            return "mdi:battery-arrow-down"
+        return "mdi:battery"
+
+
+def _last_fetch_value(key):
+    """Hodnota z posledního stažení."""
+    def value(metrics):
+        last_fetch = metrics["last_fetch"]
+        return last_fetch[key] if last_fetch else None
+    return value
+
+
+def _timestamp_value(key):
+    """ISO čas z metrik jako datetime."""
+    def value(metrics):
+        return dt_util.parse_datetime(metrics[key]) if metrics[key] else None
+    return value
+
+
+# (klíč, název, jednotka, device class, ikona, hodnota z coordinator.fetch_metrics)
+METRICS = (
+    ("fetch_latency", "Fetch Latency", UnitOfTime.MILLISECONDS, SensorDeviceClass.DURATION,
+     "mdi:timer-outline", _last_fetch_value("http_ms")),
+    ("parse_time", "Parse Time", UnitOfTime.MILLISECONDS, SensorDeviceClass.DURATION,
+     "mdi:file-cog-outline", _last_fetch_value("parse_ms")),
+    ("fetch_size", "Fetch Size", UnitOfInformation.BYTES, SensorDeviceClass.DATA_SIZE,
+     "mdi:download", _last_fetch_value("bytes")),
+    ("fetch_retries", "Fetch Retries", None, None,
+     "mdi:restart", lambda metrics: metrics["retries"]),
+    ("last_fetch_success", "Last Fetch Success", None, SensorDeviceClass.TIMESTAMP,
+     "mdi:check-circle-outline", _timestamp_value("last_success")),
+    ("next_fetch", "Next Fetch", None, SensorDeviceClass.TIMESTAMP,
+     "mdi:clock-outline", _timestamp_value("next_update")),
+)
+
+
+class SKSpotMetricSensor(SKSpotEntity, SensorEntity):
+    """Diagnostický sensor s metrikou stahování."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, coordinator, entry: ConfigEntry, metric) -> None:
+        """Init."""
+        super().__init__(coordinator, entry)
+        key, name, unit, device_class, icon, self._value_fn = metric
+        self._attr_name = f"SK Spot {name}"
+        self._attr_unique_id = f"{entry.entry_id}_{key}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_device_class = device_class
+        self._attr_icon = icon
+
+    def _state_fingerprint(self):
+        """Mění se s hodnotou metriky."""
+        return (self.native_value,)
+
+    @property
+    def native_value(self):
+        """Hodnota metriky."""
+        return self._value_fn(self.coordinator.fetch_metrics)
+
+    @property
+    def extra_state_attributes(self):
+        """Poslední stažení v detailu."""
+        last_fetch = self.coordinator.fetch_metrics["last_fetch"]
+        if last_fetch is None:
+            return {}
+        return {
+            "date_from": last_fetch["date_from"],
+            "date_to": last_fetch["date_to"],
+            "status": last_fetch["status"],
+            "rows": last_fetch["rows"],
+            "error": last_fetch["error"],
+        }
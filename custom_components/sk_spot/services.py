@@ -0,0 +1,81 @@
+"""Služby SK Spot."""
+from datetime import datetime, timedelta
+import math
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, DATA_COORDINATOR, MAX_BLOCK_SIZE
+from .timeline import SLOT_DURATION
+
+SERVICE_FIND_CHEAPEST_WINDOW = "find_cheapest_window"
+
+ATTR_DURATION = "duration"
+ATTR_EARLIEST_START = "earliest_start"
+ATTR_DEADLINE = "deadline"
+
+FIND_CHEAPEST_WINDOW_SCHEMA = vol.Schema({
+    vol.Required(ATTR_DURATION): cv.positive_time_period,
+    vol.Optional(ATTR_EARLIEST_START): cv.datetime,
+    vol.Optional(ATTR_DEADLINE): cv.datetime,
+})
+
+
+def _as_local(value: datetime) -> datetime:
+    """Naivní čas ze služby ber jako místní čas HA."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    return value
+
+
+async def _async_find_cheapest_window(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Nejlevnější souvislé okno dané délky mezi earliest_start a deadline."""
+    coordinator = hass.data.get(DOMAIN, {}).get(DATA_COORDINATOR)
+    analytics = coordinator.data.get("analytics") if coordinator and coordinator.data else None
+    if analytics is None:
+        raise ServiceValidationError("SK Spot zatím nemá načtené ceny")
+
+    # Délka se zaokrouhlí nahoru na celé 15min sloty
+    block_size = math.ceil(call.data[ATTR_DURATION] / SLOT_DURATION)
+    if block_size > MAX_BLOCK_SIZE:
+        raise ServiceValidationError(f"Délka okna je nejvýše {MAX_BLOCK_SIZE} slotů (48 h)")
+
+    earliest_start = _as_local(call.data.get(ATTR_EARLIEST_START) or dt_util.now())
+    deadline = _as_local(call.data.get(ATTR_DEADLINE) or earliest_start + timedelta(days=2))
+    if deadline <= earliest_start:
+        raise ServiceValidationError("Termín musí být po nejdřívějším začátku")
+
+    first, last = analytics.window_bounds(earliest_start, deadline)
+    window = analytics.cheapest_window_between(block_size, first, last)
+    if window is None:
+        return {"found": False, "slots": block_size}
+
+    start_idx, end_idx, avg_price = window
+    return {
+        "found": True,
+        "start": analytics.iso_start(start_idx),
+        "end": analytics.iso_end(end_idx),
+        "slots": block_size,
+        "average_price": round(avg_price, 4),
+        "total_price": round(avg_price * block_size, 4),
+        "unit": "EUR/MWh",
+    }
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Zaregistruj služby integrace."""
+
+    async def handle_find_cheapest_window(call: ServiceCall) -> ServiceResponse:
+        return await _async_find_cheapest_window(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_FIND_CHEAPEST_WINDOW,
+        handle_find_cheapest_window,
+        schema=FIND_CHEAPEST_WINDOW_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -0,0 +1,98 @@
+"""Koncová cena elektřiny ze spotové ceny.
+
+Koncová cena = (spot + marže dodavatele + distribuce + systémové poplatky) * (1 + DPH).
+Distribuce má vysoké a nízké pásmo podle hodin nízkého tarifu distributora
+(v místním čase Europe/Bratislava). Všechny složky jsou v EUR/MWh jako spot,
+hodnoty se zadávají podle ceníku dodavatele a distributora.
+"""
+from dataclasses import dataclass
+from datetime import time
+from zoneinfo import ZoneInfo
+
+from .const import (
+    CONF_TARIFF_DISTRIBUTION_HIGH,
+    CONF_TARIFF_DISTRIBUTION_LOW,
+    CONF_TARIFF_LOW_HOURS,
+    CONF_TARIFF_MARGIN,
+    CONF_TARIFF_SYSTEM_CHARGES,
+    CONF_TARIFF_VAT,
+    DEFAULT_TARIFF_COMPONENT,
+    DEFAULT_TARIFF_LOW_HOURS,
+)
+from .timeline import OKTE_TIME_ZONE
+
+_TZ = ZoneInfo(OKTE_TIME_ZONE)
+
+
+@dataclass(frozen=True)
+class TariffParams:
+    """Složky koncové ceny (EUR/MWh, DPH v %)."""
+
+    margin: float
+    distribution_high: float
+    distribution_low: float
+    # Hodiny nízkého tarifu (("HH:MM", "HH:MM"), ...), okno může přecházet přes půlnoc
+    low_tariff: tuple
+    system_charges: float
+    vat: float
+
+    @property
+    def configured(self) -> bool:
+        """Je zadaná aspoň jedna složka?"""
+        return any((self.margin, self.distribution_high, self.distribution_low,
+                    self.system_charges, self.vat))
+
+
+def tariff_from_options(options) -> TariffParams | None:
+    """Tarif z nastavení integrace nebo None, pokud není zadaná žádná složka."""
+    params = TariffParams(
+        margin=float(options.get(CONF_TARIFF_MARGIN, DEFAULT_TARIFF_COMPONENT)),
+        distribution_high=float(options.get(CONF_TARIFF_DISTRIBUTION_HIGH, DEFAULT_TARIFF_COMPONENT)),
+        distribution_low=float(options.get(CONF_TARIFF_DISTRIBUTION_LOW, DEFAULT_TARIFF_COMPONENT)),
+        low_tariff=tuple(
+            tuple(hours) for hours in options.get(CONF_TARIFF_LOW_HOURS, DEFAULT_TARIFF_LOW_HOURS)
+        ),
+        system_charges=float(options.get(CONF_TARIFF_SYSTEM_CHARGES, DEFAULT_TARIFF_COMPONENT)),
+        vat=float(options.get(CONF_TARIFF_VAT, DEFAULT_TARIFF_COMPONENT)),
+    )
+    return params if params.configured else None
+
+
+def _in_range(moment: time, start: time, end: time) -> bool:
+    """Leží čas v intervalu [start, end) (přes půlnoc, stejné časy = celý den)?"""
+    if start < end:
+        return start <= moment < end
+    return moment >= start or moment < end
+
+
+def slot_fees(timeline, params) -> tuple:
+    """Poplatky bez DPH (EUR/MWh) pro každý slot dne podle pásma distribuce."""
+    ranges = [
+        (time.fromisoformat(start), time.fromisoformat(end)) for start, end in params.low_tariff
+    ]
+    fixed = params.margin + params.system_charges
+    high = fixed + params.distribution_high
+    low = fixed + params.distribution_low
+    return tuple(
+        low if any(_in_range(local.time(), start, end) for start, end in ranges) else high
+        for local in (start.astimezone(_TZ) for start in timeline.starts)
+    )
+
+
+def final_prices(prices, timeline, params) -> dict:
+    """
+    Koncové ceny dne jedním průchodem.
+
+    Args:
+        prices: {index slotu dne: spotová cena EUR/MWh}
+        timeline: DayTimeline dne (pro pásma distribuce)
+        params: TariffParams
+
+    Returns:
+        {index slotu dne: koncová cena EUR/MWh}
+    """
+    if not prices:
+        return {}
+    fees = slot_fees(timeline, params)
+    factor = 1 + params.vat / 100
+    return {idx: round((price + fees[idx]) * factor, 4) for idx, price in prices.items()}
@@ -0,0 +1,80 @@
+"""Časová osa 15min slotů dne dodávky s ohledem na letní čas.
+
+Den dodávky OKTE běží v čase Europe/Bratislava, takže má 96 slotů,
+při přechodu na letní čas 92 a při přechodu na zimní čas 100.
+"""
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+OKTE_TIME_ZONE = "Europe/Bratislava"
+SLOT_DURATION = timedelta(minutes=15)
+# Běžný den bez přechodu času
+DEFAULT_SLOTS = 96
+
+
+@lru_cache(maxsize=32)
+def slot_count(day, tz_name=OKTE_TIME_ZONE) -> int:
+    """Počet 15min slotů dne dodávky (92, 96 nebo 100)."""
+    tz = ZoneInfo(tz_name)
+    start = datetime.combine(day, time(0), tzinfo=tz).astimezone(timezone.utc)
+    end = datetime.combine(day + timedelta(days=1), time(0), tzinfo=tz).astimezone(timezone.utc)
+    return (end - start) // SLOT_DURATION
+
+
+@dataclass(frozen=True)
+class DayTimeline:
+    """Sloty jednoho dne: index <-> UTC začátek/konec a předrenderované ISO časy."""
+
+    day: object
+    starts: tuple
+    ends: tuple
+    iso_starts: tuple
+    iso_ends: tuple
+    # Délka slotu (15 min, u agregované osy násobek)
+    slot_duration: timedelta = SLOT_DURATION
+
+    @property
+    def slot_count(self) -> int:
+        """Počet slotů dne."""
+        return len(self.starts)
+
+    def index_at(self, moment):
+        """Index slotu obsahujícího daný okamžik (aware datetime) nebo None."""
+        if not self.starts:
+            return None
+        idx = (moment - self.starts[0]) // self.slot_duration
+        if 0 <= idx < len(self.starts):
+            return idx
+        return None
+
+
+def build_day_timeline(day, render_tz, tz_name=OKTE_TIME_ZONE) -> DayTimeline:
+    """Postav časovou osu dne; ISO časy se renderují v časové zóně render_tz."""
+    tz = ZoneInfo(tz_name)
+    first_start = datetime.combine(day, time(0), tzinfo=tz).astimezone(timezone.utc)
+    count = slot_count(day, tz_name)
+
+    starts = tuple(first_start + SLOT_DURATION * idx for idx in range(count))
+    ends = tuple(start + SLOT_DURATION for start in starts)
+
+    return DayTimeline(
+        day=day,
+        starts=starts,
+        ends=ends,
+        iso_starts=tuple(start.astimezone(render_tz).isoformat() for start in starts),
+        iso_ends=tuple(end.astimezone(render_tz).isoformat() for end in ends),
+    )
+
+
+def aggregate_timeline(timeline, group) -> DayTimeline:
+    """Časová osa se `group` po sobě jdoucími sloty sloučenými do jednoho (4 = hodiny)."""
+    return DayTimeline(
+        day=timeline.day,
+        starts=timeline.starts[::group],
+        ends=timeline.ends[group - 1::group],
+        iso_starts=timeline.iso_starts[::group],
+        iso_ends=timeline.iso_ends[group - 1::group],
+        slot_duration=timeline.slot_duration * group,
+    )
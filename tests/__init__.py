@@ -0,0 +1 @@
+"""Testy integrace SK Spot."""
@@ -0,0 +1,30 @@
+"""Testy plánování coordinatoru SK Spot.
+
+Spouští se s pytest-homeassistant-custom-component (fixture `hass`).
+"""
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.sk_spot.coordinator import SKSpotCoordinator
+
+
+@pytest.mark.asyncio
+async def test_scheduled_update_keeps_quarter_hour_tick(hass):
+    """Naplánovaná aktualizace přeplánuje další stažení, tick ale zůstane."""
+    coordinator = SKSpotCoordinator(hass)
+    coordinator.schedule_next_update()
+    coordinator.start_quarter_hour_tick()
+    tick = coordinator._quarter_hour_tick
+    assert tick is not None
+
+    with patch.object(coordinator, "async_request_refresh") as refresh:
+        await coordinator._on_schedule(None)
+
+    refresh.assert_awaited_once()
+    assert coordinator._quarter_hour_tick is tick
+    assert coordinator._update_schedule is not None
+
+    await coordinator.async_shutdown()
+    assert coordinator._quarter_hour_tick is None
+    assert coordinator._update_schedule is None
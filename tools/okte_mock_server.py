@@ -0,0 +1,246 @@
+"""Lokální náhrada API OKTE pro testy stahování bez sítě.
+
+Server vrací XLSX reporty ve tvaru OKTE (sloupec A = den dodávky, sloupec K = cena)
+s deterministickými cenami a umí simulovat chyby:
+
+    python tools/okte_mock_server.py --port 8099
+    python tools/okte_mock_server.py --latency 2 --error-rate 0.3 --seed 1
+    python tools/okte_mock_server.py --now 2025-10-15T12:30 --publish-at 13:20
+    python tools/okte_mock_server.py --partial-rows 80 --truncate-rate 0.2
+
+V nastavení integrace pak stačí zadat adresu
+http://127.0.0.1:8099/api/v1/dam/report/detailed
+
+Chyby lze měnit za běhu (např. z CI skriptu):
+    curl -X POST -d '{"error_rate": 1, "error_status": 502}' http://127.0.0.1:8099/_faults
+    curl http://127.0.0.1:8099/_stats
+Stav je v /_faults (GET), POST na /_reset vynuluje statistiky.
+"""
+import argparse
+from dataclasses import asdict, dataclass, fields
+from datetime import date, datetime, time, timedelta, timezone
+from email.utils import format_datetime
+import hashlib
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+from pathlib import Path
+import random
+import sys
+import threading
+from urllib.parse import parse_qs, urlsplit
+from zoneinfo import ZoneInfo
+
+# Ceny a XLSX sdílí mock s benchmarky (stejné dny přechodu času i denní profil)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from benchmarks.fixtures import synthetic_xlsx  # noqa: E402
+
+REPORT_PATH = "/api/v1/dam/report/detailed"
+OKTE_TIME_ZONE = ZoneInfo("Europe/Bratislava")
+# Zítřejší ceny OKTE zveřejňuje kolem 13:00
+DEFAULT_PUBLISH_AT = time(13, 0)
+
+
+@dataclass
+class Faults:
+    """Nastavení simulovaných chyb."""
+
+    latency: float = 0.0  # Zpoždění odpovědi v sekundách
+    latency_jitter: float = 0.0  # Náhodné zpoždění navíc 0..jitter
+    error_rate: float = 0.0  # Pravděpodobnost odpovědi 5xx
+    error_status: int = 503
+    fail_first: int = 0  # Prvních N requestů skončí 5xx
+    truncate_rate: float = 0.0  # Pravděpodobnost useknutého XLSX
+    partial_rows: int = 0  # Počet řádků na den (0 = celý den)
+    publish_at: str = DEFAULT_PUBLISH_AT.strftime("%H:%M")  # Zveřejnění zítřka (čas Bratislava)
+    now: str = ""  # Pevný "aktuální" čas ISO (prázdné = skutečný čas)
+    seed: int = 0
+
+    def update(self, values):
+        """Aktualizuj z JSON (neznámé klíče jsou chyba)."""
+        names = {field.name for field in fields(self)}
+        for key, value in values.items():
+            if key not in names:
+                raise ValueError(f"Neznámý parametr: {key}")
+            setattr(self, key, type(getattr(self, key))(value))
+
+
+class MockState:
+    """Sdílený stav serveru: chyby, RNG a statistiky."""
+
+    def __init__(self, faults):
+        """Init."""
+        self.faults = faults
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Vynuluj statistiky a RNG."""
+        self.rng = random.Random(self.faults.seed)
+        self.stats = {"requests": 0, "ok": 0, "not_modified": 0, "errors": 0, "truncated": 0, "unpublished": 0}
+
+    def now(self):
+        """Aktuální čas serveru v Bratislavě."""
+        if self.faults.now:
+            return datetime.fromisoformat(self.faults.now).replace(tzinfo=OKTE_TIME_ZONE)
+        return datetime.now(OKTE_TIME_ZONE)
+
+    def is_published(self, day):
+        """Je den dodávky už zveřejněný?"""
+        now = self.now()
+        if day <= now.date():
+            return True
+        publish_at = time.fromisoformat(self.faults.publish_at)
+        return day == now.date() + timedelta(days=1) and now.time() >= publish_at
+
+
+class ReportHandler(BaseHTTPRequestHandler):
+    """HTTP handler reportu a řídicích endpointů."""
+
+    server_version = "OKTEMock/1.0"
+    state = None  # MockState, nastaví se v make_server
+
+    def do_GET(self):
+        """Report nebo stav mocku."""
+        url = urlsplit(self.path)
+        if url.path == "/_faults":
+            self._send_json(asdict(self.state.faults))
+        elif url.path == "/_stats":
+            with self.state.lock:
+                self._send_json(dict(self.state.stats))
+        elif url.path == REPORT_PATH:
+            self._serve_report(parse_qs(url.query))
+        else:
+            self.send_error(HTTPStatus.NOT_FOUND)
+
+    def do_POST(self):
+        """Změna chyb za běhu."""
+        url = urlsplit(self.path)
+        if url.path == "/_reset":
+            with self.state.lock:
+                self.state.reset()
+            self._send_json({"reset": True})
+            return
+        if url.path != "/_faults":
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        try:
+            values = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            with self.state.lock:
+                self.state.faults.update(values)
+        except (ValueError, TypeError) as err:
+            self.send_error(HTTPStatus.BAD_REQUEST, str(err))
+            return
+        self._send_json(asdict(self.state.faults))
+
+    def _serve_report(self, query):
+        """Vrať XLSX report s případnými simulovanými chybami."""
+        try:
+            date_from = date.fromisoformat(query["deliverydayfrom"][0])
+            date_to = date.fromisoformat(query.get("deliverydayto", query["deliverydayfrom"])[0])
+        except (KeyError, ValueError):
+            self.send_error(HTTPStatus.BAD_REQUEST, "deliverydayfrom/deliverydayto")
+            return
+
+        state = self.state
+        with state.lock:
+            faults = Faults(**asdict(state.faults))
+            state.stats["requests"] += 1
+            request_number = state.stats["requests"]
+            delay = faults.latency + state.rng.uniform(0, faults.latency_jitter)
+            fail = request_number <= faults.fail_first or state.rng.random() < faults.error_rate
+            truncate = state.rng.random() < faults.truncate_rate
+
+        if delay:
+            threading.Event().wait(delay)
+
+        if fail:
+            with state.lock:
+                state.stats["errors"] += 1
+            self.send_error(faults.error_status)
+            return
+
+        # Nezveřejněné dny chybí v reportu jako u OKTE
+        days = []
+        day = date_from
+        while day <= date_to:
+            if state.is_published(day):
+                days.append(day)
+            day += timedelta(days=1)
+
+        # openpyxl zapisuje do souboru čas uložení, ETag se proto odvozuje z obsahu reportu
+        etag = '"' + hashlib.sha1(repr((days, faults.partial_rows)).encode()).hexdigest() + '"'
+        with state.lock:
+            state.stats["unpublished"] += (date_to - date_from).days + 1 - len(days)
+
+        if self.headers.get("If-None-Match") == etag and not truncate:
+            with state.lock:
+                state.stats["not_modified"] += 1
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        content = synthetic_xlsx(days, faults.partial_rows)
+        if truncate:
+            content = content[: len(content) // 2]
+        with state.lock:
+            state.stats["truncated" if truncate else "ok"] += 1
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+        self.send_header("Content-Length", str(len(content)))
+        if not truncate:
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", format_datetime(state.now().astimezone(timezone.utc), usegmt=True))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _send_json(self, payload):
+        """Odpověď JSON."""
+        body = json.dumps(payload).encode()
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # noqa: A002 - signatura BaseHTTPRequestHandler
+        """Logování jen s --verbose."""
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(host="127.0.0.1", port=8099, faults=None, verbose=False):
+    """Vytvoř server (port 0 = náhodný volný port, viz server.server_address)."""
+    handler = type("BoundReportHandler", (ReportHandler,), {"state": MockState(faults or Faults())})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.verbose = verbose
+    return server
+
+
+def main():
+    """Spusť mock server."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--verbose", action="store_true", help="loguj každý request")
+    for field in fields(Faults):
+        default = getattr(Faults, field.name)
+        parser.add_argument(f"--{field.name.replace('_', '-')}", type=type(default), default=default)
+    args = parser.parse_args()
+
+    faults = Faults(**{field.name: getattr(args, field.name) for field in fields(Faults)})
+    server = make_server(args.host, args.port, faults, args.verbose)
+    host, port = server.server_address[:2]
+    print(f"OKTE mock: http://{host}:{port}{REPORT_PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()